@@ -0,0 +1,319 @@
+"""
+Headless rerun benchmark of every page.
+
+Each page script runs in a fresh process under Streamlit's testing harness
+(streamlit.testing AppTest), against the real ./data or a copy scaled by
+benchmarks/scale_data.py. For every page and dataset it records
+
+- cold load: the first run of the page in a new process (the Parquet copies
+  are built beforehand, so this is reading them plus the first render),
+- warm reruns: p50 / p95 of the reruns triggered by a scripted round of
+  widget interactions, once every state of the round has been seen,
+- peak memory: the maximum resident set size of the process,
+
+and writes them to a JSON file. ``--compare`` checks a run against an
+earlier file and exits with status 1 when a page got slower. With
+``--synthetic`` the datasets are generated by olympics.synthetic instead,
+which reaches millions of rows.
+
+    python benchmarks/pages.py --scales 1 10 100 --output bench.json
+    python benchmarks/pages.py --compare bench.json
+    python benchmarks/pages.py --synthetic --scales 100 --output synthetic.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+PAGES = [
+    "🥇 Dashboard.py",
+    "pages/🗺️  Global Analysis.py",
+    "pages/👤 Athlete Performance.py",
+    "pages/🏟️ Sports Events.py",
+]
+
+
+def _first(widget):
+    return widget.options[:1]
+
+
+def _none(widget):
+    return []
+
+
+def _three_days(widget):
+    return (widget.value[0], widget.value[0] + timedelta(days=2))
+
+
+def _one_day(widget):
+    return (widget.value[0], widget.value[0])
+
+
+# page -> (widget kind, label, values): every round sets each widget to its
+# next value, so the states repeat from the third round on; a value can be
+# a function of the widget. With "All" ticked, a multiselect picks the
+# values to leave out.
+INTERACTIONS = {
+    "🥇 Dashboard.py": [
+        ("multiselect", "🏆 Country (NOC code)", [_first, _none]),
+        ("multiselect", "⚽ Sport / Discipline", [_first, _none]),
+    ],
+    "pages/🗺️  Global Analysis.py": [
+        ("multiselect", "🌎 Continent", [_first, _none]),
+        ("multiselect", "Select medal types", [["Bronze"], []]),
+    ],
+    "pages/👤 Athlete Performance.py": [
+        ("text_input", "Search athletes", ["mar", ""]),
+        ("radio", "Plot type", ["Box", "Violin"]),
+        ("selectbox", "Group age by", ["Gender", "Sport"]),
+        ("radio", "Scope", ["Country", "Continent"]),
+        ("multiselect", "🥇 Medal Types", [["Bronze"], []]),
+    ],
+    "pages/🏟️ Sports Events.py": [
+        ("multiselect", "🏅 Sport", [_first, _none]),
+        ("select_slider", "Days", [_three_days, _one_day]),
+        ("selectbox", "Discipline", [lambda w: w.options[0], lambda w: w.options[1]]),
+        ("multiselect", "🥇 Medal type", [["Bronze"], []]),
+    ],
+}
+
+
+def _percentile(values, q):
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _peak_rss_mb():
+    # VmHWM starts afresh at exec; on Linux ru_maxrss keeps the peak of the
+    # parent process that forked this one
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _widget(at, kind, label):
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def _set(widget, kind, value):
+    if callable(value):
+        value = value(widget)
+    return widget.input(value) if kind == "text_input" else widget.set_value(value)
+
+
+def prepare():
+    """Build the Parquet copies of the current OLYMPICS_DATA_DIR up front."""
+    from olympics.data import TABLES, convert_table
+    from olympics.results import ingest_results
+
+    for name in TABLES:
+        try:
+            convert_table(name)
+        except FileNotFoundError:
+            pass
+    ingest_results()
+
+
+def run_page(page, rounds):
+    """Cold load and interaction reruns of one page, in this process."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(ROOT / page), default_timeout=600)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    interactions = INTERACTIONS.get(page, [])
+    timings = {label: [] for _, label, _ in interactions}
+    timings["rerun"] = []
+    for i in range(rounds):
+        for kind, label, values in interactions:
+            widget = _set(_widget(at, kind, label), kind, values[i % len(values)])
+            start = time.perf_counter()
+            at = widget.run()
+            timings[label].append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(f"{label}: {at.exception[0].value}")
+        start = time.perf_counter()
+        at.run()
+        timings["rerun"].append(time.perf_counter() - start)
+
+    # the first two rounds visit each state once; the rest are warm
+    warm = {label: times[2:] or times for label, times in timings.items()}
+    every = [t for times in warm.values() for t in times]
+    return {
+        "page": page,
+        "cold_load_ms": cold * 1000,
+        "rerun_p50_ms": statistics.median(every) * 1000,
+        "rerun_p95_ms": _percentile(every, 95) * 1000,
+        "peak_rss_mb": _peak_rss_mb(),
+        "interactions": {
+            label: {
+                "p50_ms": statistics.median(times) * 1000,
+                "p95_ms": _percentile(times, 95) * 1000 if len(times) > 1 else None,
+            }
+            for label, times in warm.items()
+        },
+    }
+
+
+def _worker(args, data_dir):
+    """Run this script again in a fresh process for one step; returns its JSON."""
+    env = dict(os.environ, OLYMPICS_DATA_DIR=str(data_dir))
+    proc = subprocess.run(
+        [sys.executable, __file__, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def dataset(scale, work_dir, synthetic=False):
+    """Directory of the dataset at ``scale``, created if missing.
+
+    Scale 1 is ./data unless ``synthetic``; other scales are copies of it
+    (benchmarks/scale_data.py) or generated tables (olympics.synthetic).
+    """
+    if scale == 1 and not synthetic:
+        return ROOT / "data"
+    target = work_dir / f"{'synthetic-' if synthetic else ''}x{scale}"
+    if not (target / ".complete").exists():
+        print(f"writing the x{scale} dataset to {target} ...", flush=True)
+        if synthetic:
+            from olympics.synthetic import generate
+
+            generate(target, scale)
+        else:
+            from benchmarks.scale_data import scale_dataset
+
+            scale_dataset(scale, target)
+        (target / ".complete").touch()
+    return target
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Print per-page changes against ``baseline``; True when none regressed."""
+    before = {(r["page"], r["scale"]): r for r in baseline["results"]}
+    ok = True
+    for result in report["results"]:
+        old = before.get((result["page"], result["scale"]))
+        if old is None:
+            continue
+        for metric in ("cold_load_ms", "rerun_p50_ms", "rerun_p95_ms"):
+            ratio = result[metric] / old[metric]
+            slower = ratio > 1 + tolerance
+            ok &= not slower
+            print(
+                f"{'SLOWER' if slower else 'ok':6s}  x{result['scale']:<4d} "
+                f"{result['page']:34s} {metric:13s} "
+                f"{old[metric]:9.1f} -> {result[metric]:9.1f} ms ({ratio:.2f}x)"
+            )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--pages", nargs="+", default=PAGES)
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="generate the datasets (olympics.synthetic) instead of copying ./data",
+    )
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=Path("bench.json"))
+    parser.add_argument("--compare", type=Path, help="earlier --output file")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "olympics-bench",
+        help="where the scaled datasets are kept between runs",
+    )
+    # internal: one step in a fresh process
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--page", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    if args.prepare:
+        prepare()
+        print(json.dumps({}))
+        return 0
+    if args.page:
+        print(json.dumps(run_page(args.page, args.rounds)))
+        return 0
+
+    import pandas
+    import streamlit
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "pandas": pandas.__version__,
+        "rounds": args.rounds,
+        "synthetic": args.synthetic,
+        "results": [],
+    }
+    for scale in args.scales:
+        data_dir = dataset(scale, args.work_dir, args.synthetic)
+        _worker(["--prepare"], data_dir)
+        for page in args.pages:
+            result = _worker(["--page", page, "--rounds", str(args.rounds)], data_dir)
+            result["scale"] = scale
+            report["results"].append(result)
+            print(
+                f"x{scale:<4d} {page:34s} cold {result['cold_load_ms']:8.0f} ms  "
+                f"rerun p50 {result['rerun_p50_ms']:7.1f} / "
+                f"p95 {result['rerun_p95_ms']:7.1f} ms  "
+                f"peak {result['peak_rss_mb'] or float('nan'):6.0f} MB",
+                flush=True,
+            )
+
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"results written to {args.output}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        return 0 if compare(report, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
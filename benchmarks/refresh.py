@@ -0,0 +1,116 @@
+"""
+Cost of picking up updated data files without a restart (olympics.refresh).
+
+A copy of the data directory (./data, or one made by
+benchmarks/scale_data.py) is loaded the way the pages load it — the results
+dataset, the results of a few disciplines, the tables and the athlete
+master — and then changed one file at a time. For each case it reports the
+time of ``refresh_data()`` and of the reload that follows, next to a full
+re-ingest of the results, the cost of the files changing before incremental
+refresh:
+
+- no change: the periodic check (a stat per file),
+- touched: a results file rewritten with the same content (hashed, kept),
+- results file: one discipline's results changed,
+- table: medals.csv changed (the medal cube is rebuilt from it).
+
+    python benchmarks/refresh.py
+    python benchmarks/refresh.py --data-dir /tmp/olympics-x10 --repeat 5
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# disciplines held in results_cache() while the files change
+CACHED = ["ATH", "SWM", "ARC", "FEN"]
+
+
+def _ms(func):
+    started = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - started) * 1000, result
+
+
+def _rewrite(path, drop_last):
+    """Rewrite ``path``, without its last line when ``drop_last``."""
+    lines = path.read_text(encoding="utf-8").splitlines(True)
+    if drop_last and len(lines) > 2:
+        lines = lines[:-1]
+    path.write_text("".join(lines), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data-dir", type=Path, default=ROOT / "data")
+    parser.add_argument("--results-file", default="Athletics.csv")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="olympics-refresh-"))
+    data_dir = work / "data"
+    shutil.copytree(args.data_dir, data_dir, ignore=shutil.ignore_patterns(".parquet"))
+    # read by olympics.data at import
+    os.environ["OLYMPICS_DATA_DIR"] = str(data_dir)
+    os.environ["OLYMPICS_REFRESH_SECONDS"] = "0"
+    sys.path.insert(0, str(ROOT))
+    from olympics.athletes import load_athlete_master
+    from olympics.cube import load_medal_cube
+    from olympics.refresh import refresh_data
+    from olympics.results import ingest_results, results_cache
+
+    try:
+        refresh_data()
+        cold, _ = _ms(load_athlete_master)
+        for code in CACHED:
+            results_cache().get(code)
+        load_medal_cube()
+        print(f"{args.data_dir}: cold load {cold:,.0f} ms\n")
+
+        results_file = data_dir / "results" / args.results_file
+        cases = {
+            "no change": (None, lambda: None),
+            "touched": (lambda: _rewrite(results_file, False), lambda: None),
+            "results file": (
+                lambda: _rewrite(results_file, True),
+                lambda: results_cache().load(CACHED),
+            ),
+            "table": (
+                lambda: _rewrite(data_dir / "medals.csv", True),
+                load_medal_cube,
+            ),
+        }
+        print(f"{'case':14s} {'refresh ms':>11s} {'reload ms':>10s}  refreshed")
+        for case, (change, reload) in cases.items():
+            timings = []
+            for _ in range(args.repeat):
+                if change:
+                    change()
+                refresh_ms, summary = _ms(lambda: refresh_data(force=True))
+                reload_ms, _ = _ms(reload)
+                timings.append((refresh_ms, reload_ms))
+            refreshed = (summary or {}).get("tables", []) + (summary or {}).get(
+                "results", []
+            )
+            print(
+                f"{case:14s} {statistics.median(t[0] for t in timings):11.1f} "
+                f"{statistics.median(t[1] for t in timings):10.1f}  "
+                f"{', '.join(refreshed) or '-'}"
+            )
+
+        full_ms, _ = _ms(lambda: ingest_results(force=True))
+        print(f"\nfull results re-ingest: {full_ms:,.0f} ms")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
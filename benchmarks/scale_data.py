@@ -0,0 +1,103 @@
+"""
+Scaled copies of the ./data CSVs for benchmarking.
+
+Every table with per-athlete (or per-team) rows is repeated ``factor`` times;
+copy ``i > 0`` gets ``i`` appended to its codes and names, so the copies are
+distinct athletes of the same countries, disciplines and events and every
+join between tables still matches. Reference tables (NOCs, events, venues,
+schedules, ...) are copied unchanged.
+
+    python benchmarks/scale_data.py 10 /tmp/olympics-x10
+"""
+
+import argparse
+import ast
+import shutil
+import sys
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "data"
+
+# file (relative to data/) -> columns suffixed per copy: codes, names and
+# stringified lists of codes / names
+SCALED = {
+    "athletes.csv": {"codes": ["code"], "names": ["name"]},
+    "coaches.csv": {"codes": ["code"], "names": ["name"]},
+    "medallists.csv": {"codes": ["code_athlete", "code_team"], "names": ["name"]},
+    "medals.csv": {"codes": ["code"], "names": ["name"]},
+    "teams.csv": {"codes": ["code"], "lists": ["athletes_codes", "athletes"]},
+    "results/*.csv": {"codes": ["participant_code"], "names": ["participant_name"]},
+}
+
+
+def _suffixed(column, suffix):
+    """``column`` with ``suffix`` appended to every non-null value."""
+    return column.where(column.isna(), column + suffix)
+
+
+def _suffixed_list(value, suffix):
+    """A stringified list with ``suffix`` appended to every item."""
+    return str([f"{item}{suffix}" for item in ast.literal_eval(value)])
+
+
+def scale_frame(frame, factor, codes=(), names=(), lists=()):
+    """``frame`` repeated ``factor`` times with the copies made distinct."""
+    width = len(str(factor - 1))
+    copies = [frame]
+    for i in range(1, factor):
+        copy = frame.copy()
+        for col in codes:
+            if col in copy:
+                copy[col] = _suffixed(copy[col], f"{i:0{width}d}")
+        for col in names:
+            if col in copy:
+                copy[col] = _suffixed(copy[col], f" {i}")
+        for col in lists:
+            if col in copy:
+                # "['a', 'b']" -> "['a 7', 'b 7']" (codes get no space)
+                sep = "" if col.endswith("codes") else " "
+                copy[col] = copy[col].map(
+                    partial(_suffixed_list, suffix=f"{sep}{i:0{width}d}"),
+                    na_action="ignore",
+                )
+        copies.append(copy)
+    out = pd.concat(copies, ignore_index=True)
+    # interleave the copies, as if the extra athletes had been entered alongside
+    order = np.arange(len(out)).reshape(factor, len(frame)).T.ravel()
+    return out.iloc[order]
+
+
+def scale_dataset(factor, target, source=SOURCE):
+    """Write the ``factor``-times dataset to ``target``; returns its path."""
+    target = Path(target)
+    target.mkdir(parents=True, exist_ok=True)
+    (target / "results").mkdir(exist_ok=True)
+    scaled = {
+        path: spec for pattern, spec in SCALED.items() for path in source.glob(pattern)
+    }
+    for path in sorted(source.glob("*.csv")) + sorted(source.glob("results/*.csv")):
+        dst = target / path.relative_to(source)
+        if path not in scaled or factor == 1:
+            shutil.copyfile(path, dst)
+            continue
+        # read everything as text so codes and numbers are written back as is
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+        scale_frame(frame, factor, **scaled[path]).to_csv(dst, index=False)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("factor", type=int)
+    parser.add_argument("target", type=Path)
+    args = parser.parse_args()
+    print(scale_dataset(args.factor, args.target))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
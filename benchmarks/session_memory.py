@@ -0,0 +1,94 @@
+"""
+Memory held per session by the Dashboard, over many simulated sessions.
+
+Each session is a headless run of the Dashboard (streamlit.testing AppTest)
+with its own random country / sport selection, and every session is kept
+alive until the end. Two numbers are reported:
+
+- the pickled size of each session's ``st.session_state``
+- the Python heap growth per additional live session (tracemalloc)
+
+Exits with status 1 when a session's state exceeds ``--max-state-kb``,
+i.e. when sessions start holding copies of the data again.
+tests/test_session_memory.py asserts both numbers on every test run.
+
+    python benchmarks/session_memory.py --sessions 50
+"""
+
+import argparse
+import gc
+import logging
+import os
+import pickle
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+DASHBOARD = ROOT / "🥇 Dashboard.py"
+
+
+def state_bytes(at):
+    """Pickled size of everything the session stored in st.session_state."""
+    return len(pickle.dumps(at.session_state.to_dict(), pickle.HIGHEST_PROTOCOL))
+
+
+def multiselect(at, label):
+    return next(widget for widget in at.multiselect if widget.label == label)
+
+
+def simulate_session(rng):
+    at = AppTest.from_file(str(DASHBOARD), default_timeout=300).run()
+    nocs = multiselect(at, "🏆 Country (NOC code)")
+    sports = multiselect(at, "⚽ Sport / Discipline")
+    nocs.set_value(rng.sample(nocs.options, rng.randint(1, len(nocs.options))))
+    sports.set_value(rng.sample(sports.options, rng.randint(1, len(sports.options))))
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--max-state-kb", type=float, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    logging.disable(logging.WARNING)
+    rng = random.Random(args.seed)
+
+    # warm the process-wide caches so they do not count against session 1
+    simulate_session(rng)
+
+    sessions, sizes, heap = [], [], []
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(args.sessions):
+        sessions.append(simulate_session(rng))
+        sizes.append(state_bytes(sessions[-1]))
+        gc.collect()
+        heap.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+
+    elapsed = time.perf_counter() - started
+    per_session = (heap[-1] - heap[0]) / max(len(heap) - 1, 1)
+    mean_kb, max_kb = statistics.mean(sizes) / 1024, max(sizes) / 1024
+    print(f"sessions simulated:       {args.sessions} ({elapsed:.1f} s)")
+    print(f"session_state size:       mean {mean_kb:.1f} KB, max {max_kb:.1f} KB")
+    print(f"heap growth per session:  {per_session / 1024:.1f} KB")
+    if max(sizes) > args.max_state_kb * 1024:
+        print(f"FAIL: a session stored more than {args.max_state_kb:g} KB of state")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
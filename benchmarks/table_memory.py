@@ -0,0 +1,115 @@
+"""
+Memory of every table: read naively versus with the app's compact dtypes.
+
+For each table it prints the rows and the deep memory of
+
+- naive: ``pd.read_csv`` with default dtypes (for a data directory without
+  CSVs, such as an olympics.synthetic one, a plain read of the Parquet copy),
+- compact: ``olympics.data.read_table`` (``olympics.results.load_results``
+  for the results), as the pages load them,
+
+and the ratio between them. With ``--object-strings`` the naive read stores
+text as Python objects, the default before pandas 3. The data directory is
+OLYMPICS_DATA_DIR, as for the app.
+
+    python benchmarks/table_memory.py
+    OLYMPICS_DATA_DIR=/tmp/olympics-x100 python benchmarks/table_memory.py
+    python benchmarks/table_memory.py --object-strings --columns medallists
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _mb(frame):
+    return frame.memory_usage(deep=True, index=False).sum() / 2**20
+
+
+def naive_and_compact(name, object_strings=False):
+    """(naive, compact) frames of one table, or of the results."""
+    from olympics.data import convert_table, csv_path, read_table
+    from olympics.results import load_results, results_dataset
+
+    if name == "results":
+        naive = results_dataset().to_table().to_pandas()
+    elif csv_path(name).exists():
+        naive = pd.read_csv(csv_path(name), low_memory=False)
+    else:
+        naive = pd.read_parquet(convert_table(name))
+    if object_strings:
+        naive = naive.astype(dict.fromkeys(naive.select_dtypes("str").columns, object))
+    compact = load_results() if name == "results" else read_table(name)
+    return naive, compact
+
+
+def column_report(naive, compact):
+    """Per-column dtype and MB of both frames, largest saving first."""
+    frame = pd.DataFrame(
+        {
+            "naive_dtype": naive.dtypes.astype(str),
+            "naive_mb": naive.memory_usage(deep=True, index=False) / 2**20,
+            "compact_dtype": compact.dtypes.astype(str),
+            "compact_mb": compact.memory_usage(deep=True, index=False) / 2**20,
+        }
+    )
+    saved = frame["naive_mb"] - frame["compact_mb"]
+    return frame.loc[saved.sort_values(ascending=False).index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--columns", nargs="*", default=[], help="tables to break down per column"
+    )
+    parser.add_argument(
+        "--object-strings",
+        action="store_true",
+        help="naive text columns as Python objects (pandas < 3)",
+    )
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    from olympics.data import DATA_DIR, TABLES
+
+    rows = []
+    print(f"{DATA_DIR}\n")
+    print(f"{'table':20s} {'rows':>10s} {'naive MB':>10s} {'compact MB':>11s} ratio")
+    for name in [*TABLES, "results"]:
+        try:
+            naive, compact = naive_and_compact(name, args.object_strings)
+        except FileNotFoundError:
+            continue
+        row = {
+            "table": name,
+            "rows": len(compact),
+            "naive_mb": _mb(naive),
+            "compact_mb": _mb(compact),
+        }
+        rows.append(row)
+        print(
+            f"{name:20s} {row['rows']:10,d} {row['naive_mb']:10.2f} "
+            f"{row['compact_mb']:11.2f} {row['naive_mb'] / row['compact_mb']:5.1f}x"
+        )
+        if name in args.columns:
+            print(column_report(naive, compact).round(3).to_string(), "\n")
+
+    naive_mb = sum(row["naive_mb"] for row in rows)
+    compact_mb = sum(row["compact_mb"] for row in rows)
+    print(
+        f"{'total':20s} {'':10s} {naive_mb:10.2f} {compact_mb:11.2f} "
+        f"{naive_mb / compact_mb:5.1f}x"
+    )
+    if args.json:
+        args.json.write_text(json.dumps({"data_dir": str(DATA_DIR), "tables": rows}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Shared helpers for the Paris 2024 Olympics dashboard pages.
+"""
@@ -0,0 +1,221 @@
+"""
+Athlete master table keyed by athlete code.
+
+Every source that names individual athletes — athletes.csv (when present),
+medallists (``code_athlete``), medals (``code``), results
+(``participant_code``) and teams (``athletes_codes``) — is joined once into
+one row per athlete, with medal counts, teams and result counts attached.
+
+Lookups go through hash indexes instead of frame scans: by code, and by a
+normalised name that ignores case, accents and word order, so
+"Remco EVENEPOEL" (medals.csv) and "EVENEPOEL Remco" (medallists.csv) find
+the same athlete.
+"""
+
+import ast
+import re
+import unicodedata
+
+import pandas as pd
+
+import pyarrow.dataset as ds
+
+from olympics.data import REFERENCE_DATE, _shared, continent_of, load_table
+from olympics.results import results_dataset
+
+# identity columns taken from the first source that has them, in this order:
+# athletes.csv, medallists, medals, results, teams
+IDENTITY = ["code", "name", "gender", "country_code", "birth_date"]
+
+# results / medals use gender codes, athletes.csv and medallists full words
+GENDERS = {"M": "Male", "W": "Female"}
+
+MEDALS = {"Gold Medal": "gold", "Silver Medal": "silver", "Bronze Medal": "bronze"}
+
+
+def normalize_name(name):
+    """Case-, accent- and order-insensitive key for an athlete name."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = text.encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(sorted(re.findall(r"[a-z0-9]+", text)))
+
+
+def _identity(frame, **columns):
+    """``frame`` reduced to the IDENTITY columns (renamed from ``columns``)."""
+    sources = {col: columns.get(col, col) for col in IDENTITY}
+    out = pd.DataFrame(
+        {col: frame[src] for col, src in sources.items() if src in frame.columns}
+    )
+    out["code"] = out["code"].astype("str")
+    if "gender" in out:
+        # categorical in the shared frames: replace on plain strings; other
+        # codes ("O" for the open events in results) say nothing of the
+        # athlete, and are left for another source to fill in
+        gender = out["gender"].astype("str").replace(GENDERS)
+        out["gender"] = gender.where(gender.isin(list(GENDERS.values())))
+    return out.dropna(subset=["code"])
+
+
+def _team_members(teams):
+    """One (team, code, name) row per athlete listed in teams.csv."""
+    teams = teams.dropna(subset=["athletes_codes"])
+    codes = teams["athletes_codes"].map(ast.literal_eval)
+    names = teams["athletes"].fillna("[]").map(ast.literal_eval)
+    # teams with fewer names than codes leave the missing names null
+    names = [n + [None] * (len(c) - len(n)) for c, n in zip(codes, names)]
+    return pd.DataFrame(
+        {
+            "team": (
+                teams["discipline"].astype("str") + " " + teams["events"].astype("str")
+            ).to_numpy(),
+            "code": codes.to_numpy(),
+            "name": names,
+            "country_code": teams["country_code"].to_numpy(),
+            "discipline": teams["discipline"].to_numpy(),
+        }
+    ).explode(["code", "name"], ignore_index=True)
+
+
+def _person_results():
+    columns = [
+        "participant_code",
+        "participant_name",
+        "participant_country_code",
+        "gender",
+        "discipline_name",
+    ]
+    table = results_dataset().to_table(
+        columns=columns, filter=ds.field("participant_type") == "Person"
+    )
+    return table.to_pandas()
+
+
+def _joined(key, values):
+    """``values`` grouped by ``key`` as sorted, "; "-joined distinct strings."""
+    pairs = pd.DataFrame({"key": key, "value": values}).dropna().drop_duplicates()
+    pairs = pairs.sort_values(["key", "value"])
+    # one pass over the sorted pairs; a groupby with a Python join per group
+    # is two orders of magnitude slower here
+    joined = {}
+    for k, value in zip(pairs["key"], pairs["value"]):
+        joined.setdefault(k, []).append(value)
+    return pd.Series({k: "; ".join(v) for k, v in joined.items()}, dtype="str")
+
+
+class AthleteMaster:
+    """One row per athlete code with hash lookups by code and by name."""
+
+    def __init__(self, frame, name_pairs):
+        self.frame = frame.reset_index(drop=True)
+        self._columns = {col: self.frame[col].to_numpy() for col in self.frame.columns}
+        self._by_code = {code: i for i, code in enumerate(self._columns["code"])}
+        self._by_name = {}
+        for name, code in name_pairs:
+            codes = self._by_name.setdefault(normalize_name(name), [])
+            if code not in codes:
+                codes.append(code)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _record(self, i):
+        return {col: values[i] for col, values in self._columns.items()}
+
+    def get(self, code):
+        """The athlete's row as a dict, or None for an unknown code."""
+        i = self._by_code.get(str(code))
+        return None if i is None else self._record(i)
+
+    def codes_for(self, name):
+        """Codes of every athlete known under ``name`` (in any source's spelling)."""
+        return list(self._by_name.get(normalize_name(name), []))
+
+    def find(self, name):
+        """Rows (dicts) of every athlete matching ``name``."""
+        return [self.get(code) for code in self.codes_for(name)]
+
+
+def build_athlete_master():
+    medallists, medals, teams, nocs = (
+        load_table(name) for name in ("medallists", "medals", "teams", "nocs")
+    )
+    try:
+        athletes = load_table("athletes")
+    except FileNotFoundError:
+        athletes = pd.DataFrame(columns=IDENTITY)
+    results = _person_results()
+    members = _team_members(teams)
+    # medals.csv also lists team medals under the team's code; keep athletes
+    medallist_codes = medallists["code_athlete"].astype("str")
+    person_medals = medals[medals["code"].astype("str").isin(medallist_codes)]
+
+    sources = [
+        athletes.assign(code=athletes["code"].astype("str")),
+        _identity(medallists, code="code_athlete"),
+        _identity(person_medals),
+        _identity(
+            results,
+            code="participant_code",
+            name="participant_name",
+            country_code="participant_country_code",
+        ),
+        _identity(members),
+    ]
+    # first non-null value per column, in source order
+    master = pd.concat(sources, ignore_index=True).groupby("code", sort=False).first()
+    # plain strings instead of the tables' categoricals, so that columns can
+    # be filled in from other sources below
+    categorical = master.select_dtypes("category").columns
+    master = master.astype(dict.fromkeys(categorical, "str"))
+
+    disciplines = pd.concat(
+        [
+            pd.Series(medallists["discipline"].to_numpy(), index=medallist_codes),
+            pd.Series(
+                results["discipline_name"].to_numpy(), index=results["participant_code"]
+            ),
+            pd.Series(members["discipline"].to_numpy(), index=members["code"]),
+        ]
+    )
+    if "disciplines" in athletes.columns:
+        # athletes.csv stores them as a stringified list: "['Tennis']"
+        listed = athletes["disciplines"].str.findall(r"'([^']*)'")
+        listed.index = athletes["code"].astype("str")
+        disciplines = pd.concat([disciplines, listed.explode()])
+    master["disciplines"] = _joined(disciplines.index, disciplines.to_numpy())
+    master["teams"] = _joined(members["code"], members["team"])
+
+    won = medallists[medallists["is_medallist"].fillna(True).astype(bool)]
+    counts = pd.crosstab(
+        won["code_athlete"].astype("str"), won["medal_type"].map(MEDALS)
+    )
+    for medal in MEDALS.values():
+        column = counts[medal] if medal in counts else pd.Series(dtype="int64")
+        master[medal] = column.reindex(master.index, fill_value=0).astype("int64")
+    master["total_medals"] = master[list(MEDALS.values())].sum(axis=1)
+    master["n_results"] = (
+        results["participant_code"].value_counts().reindex(master.index, fill_value=0)
+    )
+
+    by_noc = nocs.drop_duplicates("code").set_index("code")
+    codes = master["country_code"]
+    country = codes.map(by_noc["country"]).fillna(codes)
+    if "country" in master.columns:
+        country = master["country"].fillna(country)
+    master["country"] = country
+    master["country_long"] = codes.map(by_noc["country_long"]).fillna(country)
+    master["continent"] = continent_of(codes)
+    master["birth_date"] = pd.to_datetime(master["birth_date"])
+    master["age"] = (REFERENCE_DATE - master["birth_date"]).dt.days // 365
+
+    name_pairs = pd.concat(
+        [source[["name", "code"]] for source in sources], ignore_index=True
+    ).dropna()
+    return AthleteMaster(
+        master.reset_index(), zip(name_pairs["name"], name_pairs["code"])
+    )
+
+
+def load_athlete_master():
+    """The process-wide AthleteMaster, built once."""
+    return _shared("athlete_master", build_athlete_master)
@@ -0,0 +1,220 @@
+"""
+Pre-aggregated medal count cube for the medal charts and tables.
+
+Medal rows are counted once into a dense country x sport x medal-type array
+(each country also carries its continent). Medal tables, KPIs, the sunburst,
+treemap, continent bars and top-N country charts are then answered by
+slicing and summing that array for the current selection instead of
+filtering and grouping raw rows, so every country / sport / medal-type
+selection costs microseconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+from olympics.data import _shared, continent_of, load_table
+from olympics.filters import excluded
+
+OTHER = "Other"
+
+# medal types in table order
+MEDAL_TYPES = ["Gold", "Silver", "Bronze"]
+
+
+def _contenders(totals, n):
+    """Positions of the ``totals`` that rank in the top ``n``, ties included.
+
+    Only the total is compared, so every value tied with the ``n``-th largest
+    is kept: the caller breaks the ties and cuts the ranking down to ``n``.
+    """
+    if len(totals) <= n:
+        return np.arange(len(totals))
+    nth = np.partition(totals, len(totals) - n)[len(totals) - n]
+    return np.flatnonzero(totals >= nth)
+
+
+class MedalCube:
+    """Dense medal counts by country, sport and medal type."""
+
+    def __init__(
+        self,
+        medals,
+        country_col="country",
+        sport_col="sport",
+        medal_col="medal_type",
+        continent_col="continent",
+    ):
+        c_codes, countries = pd.factorize(medals[country_col], sort=True)
+        s_codes, sports = pd.factorize(medals[sport_col], sort=True)
+        m_codes, medal_types = pd.factorize(medals[medal_col], sort=True)
+        self.countries = np.asarray(countries, dtype=object)
+        self.sports = np.asarray(sports, dtype=object)
+        self.medal_types = np.asarray(medal_types, dtype=object)
+        # label -> position along each axis, for resolving selections
+        self._positions = [
+            {label: i for i, label in enumerate(labels)}
+            for labels in (self.countries, self.sports, self.medal_types)
+        ]
+
+        shape = (len(countries), len(sports), len(medal_types))
+        ok = (c_codes >= 0) & (s_codes >= 0) & (m_codes >= 0)
+        flat = np.ravel_multi_index((c_codes[ok], s_codes[ok], m_codes[ok]), shape)
+        self.counts = np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
+
+        # one continent per country (first seen); NaN when unknown
+        if continent_col in medals.columns:
+            first = (
+                pd.Series(medals[continent_col].to_numpy(), index=c_codes)
+                .loc[lambda s: s.index >= 0]
+                .groupby(level=0)
+                .first()
+            )
+            self.continents = first.reindex(range(len(countries))).to_numpy(object)
+        else:
+            self.continents = np.full(len(countries), np.nan, dtype=object)
+
+    @classmethod
+    def from_medals(cls, medals):
+        """Cube over medals.csv rows: NOC code x discipline x medal type."""
+        return cls(
+            medals.assign(
+                medal_type=medals["medal_type"].str.replace(" Medal", "", regex=False),
+                continent=continent_of(medals["country_code"]),
+            ),
+            country_col="country_code",
+            sport_col="discipline",
+        )
+
+    def _axis(self, axis, selected):
+        """Positions along ``axis`` kept by a selection (see ``olympics.filters``)."""
+        positions = self._positions[axis]
+        if selected is None:
+            return np.arange(len(positions))
+        keep = np.zeros(len(positions), dtype=bool)
+        dropped = excluded(selected)
+        if dropped is not None:
+            keep[:] = True
+            keep[[positions[v] for v in dropped if v in positions]] = False
+        else:
+            keep[[positions[v] for v in selected if v in positions]] = True
+        return np.flatnonzero(keep)
+
+    def select(self, countries=None, sports=None, medal_types=None):
+        """Sub-cube for the selection plus its country / sport / medal labels."""
+        sub = self.counts
+        picked = []
+        for axis, selected in enumerate((countries, sports, medal_types)):
+            idx = self._axis(axis, selected)
+            if selected is not None:
+                # only filtered axes are gathered; "All" keeps the axis as is
+                sub = sub.take(idx, axis=axis)
+            picked.append(idx)
+        ci, si, mi = picked
+        return sub, ci, self.sports[si], self.medal_types[mi]
+
+    def total(self, **selection):
+        return int(self.select(**selection)[0].sum())
+
+    def country_totals(self, **selection):
+        """Series of medal counts per country (countries with medals only)."""
+        sub, ci, _, _ = self.select(**selection)
+        totals = sub.sum(axis=(1, 2))
+        keep = totals > 0
+        return pd.Series(totals[keep], index=self.countries[ci][keep], name="count")
+
+    def top_countries(self, n, **selection):
+        """The ``n`` countries with most medals, in descending order (ties by name)."""
+        totals = self.country_totals(**selection)
+        totals = totals.iloc[_contenders(totals.to_numpy(), n)].sort_index()
+        return totals.sort_values(ascending=False, kind="stable").head(n)
+
+    def medal_table(self, n=None, **selection):
+        """Medals per country: one column per medal type plus "Total".
+
+        Only countries with medals in the selection are listed, ranked by
+        total, then gold, silver and bronze; with ``n`` only the top ``n``.
+        """
+        sub, ci, _, medal_types = self.select(**selection)
+        per_country = sub.sum(axis=1)
+        totals = per_country.sum(axis=1)
+        rows = np.flatnonzero(totals > 0)
+        if n is not None:
+            rows = rows[_contenders(totals[rows], n)]
+
+        columns = [m for m in MEDAL_TYPES if m in medal_types]
+        columns += [m for m in medal_types if m not in columns]
+        counts = per_country[rows][:, [list(medal_types).index(m) for m in columns]]
+        names = self.countries[ci][rows]
+        # np.lexsort sorts by its last key first: total, then each medal type
+        order = np.lexsort(
+            [names.astype(str)]
+            + [-counts[:, j] for j in range(len(columns))][::-1]
+            + [-totals[rows]]
+        )[:n]
+        table = {m: counts[order, j] for j, m in enumerate(columns)}
+        table["Total"] = totals[rows][order]
+        return pd.DataFrame(table, index=pd.Index(names[order], name="country"))
+
+    def sport_totals(self, **selection):
+        """Series of medal counts per sport (sports with medals only)."""
+        sub, _, sports, _ = self.select(**selection)
+        totals = sub.sum(axis=(0, 2))
+        keep = totals > 0
+        return pd.Series(totals[keep], index=sports[keep], name="count")
+
+    def continent_medals(self, **selection):
+        """Continent x medal-type counts, one row per continent."""
+        sub, ci, _, medal_types = self.select(**selection)
+        per_country = sub.sum(axis=1)
+        continents = self.continents[ci]
+        known = pd.notna(continents)
+        frame = pd.DataFrame(
+            per_country[known], columns=medal_types, index=continents[known]
+        )
+        frame = frame.groupby(level=0).sum()
+        frame = frame.loc[frame.sum(axis=1) > 0]
+        return frame.rename_axis("continent").reset_index()
+
+    def hierarchy(self, top_n=None, **selection):
+        """Long-form continent / country / sport / medal_type counts.
+
+        With ``top_n`` only the ``top_n`` countries with most medals keep their
+        own nodes; the rest of each continent is collapsed into one "Other"
+        country so the figure size no longer grows with the number of countries.
+        """
+        sub, ci, sports, medal_types = self.select(**selection)
+        continents = self.continents[ci]
+        known = pd.notna(continents)
+        sub, ci, continents = sub[known], ci[known], continents[known]
+        names = self.countries[ci].copy()
+
+        collapse = top_n is not None and len(ci) > top_n
+        if collapse:
+            totals = sub.sum(axis=(1, 2))
+            # the top_n by total, ties by name (as in top_countries)
+            rows = _contenders(totals, top_n)
+            order = np.lexsort([names[rows].astype(str), -totals[rows]])
+            keep = np.zeros(len(ci), dtype=bool)
+            keep[rows[order[:top_n]]] = True
+            names[~keep] = OTHER
+
+        c_idx, s_idx, m_idx = np.nonzero(sub)
+        frame = pd.DataFrame(
+            {
+                "continent": continents[c_idx],
+                "country": names[c_idx],
+                "sport": sports[s_idx],
+                "medal_type": medal_types[m_idx],
+                "count": sub[c_idx, s_idx, m_idx],
+            }
+        )
+        if not collapse:
+            return frame
+        return frame.groupby(
+            ["continent", "country", "sport", "medal_type"], as_index=False
+        )["count"].sum()
+
+
+def load_medal_cube():
+    """The process-wide cube over medals.csv (see ``MedalCube.from_medals``)."""
+    return _shared("medal_cube", lambda: MedalCube.from_medals(load_table("medals")))
@@ -0,0 +1,384 @@
+"""
+Shared data layer for every dashboard page.
+
+Each CSV in ./data is converted once into a Parquet copy under data/.parquet/
+(with its date columns already parsed) and every table is read from that copy
+at most once per process, so all pages share the same typed frames instead of
+re-parsing the CSVs themselves. Frames are loaded with compact dtypes (see
+TABLES): repetitive text columns as categoricals and codes and measurements
+as the smallest integer type that holds them, which takes several times less
+memory per worker than the CSV reader's defaults
+(``python benchmarks/table_memory.py`` reports it per table).
+
+The returned frames are shared by every session: treat them as read-only and
+filter or ``assign`` into new frames instead of adding columns in place.
+
+Every shared value records the shared values it was built from, so when a
+file changes ``invalidate`` drops exactly the values derived from it, and
+``data_version`` tells the pages which of their own caches to rebuild (see
+``olympics.refresh``).
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+# OLYMPICS_DATA_DIR points the app at another copy of the CSVs (e.g. the
+# scaled datasets of benchmarks/pages.py)
+DATA_DIR = Path(os.environ.get("OLYMPICS_DATA_DIR", BASE_DIR / "data"))
+PARQUET_DIR = DATA_DIR / ".parquet"
+
+# text columns naming a country (athletes, coaches, medals, ...)
+COUNTRY = ["country_code", "country", "country_long"]
+
+# table name -> CSV file and columns parsed as datetimes during conversion, plus
+# the compact dtypes of the loaded frame: "categories" (repetitive text such as
+# country, discipline or medal names) are read as categoricals and "ints"
+# downcast to the given type when every value fits
+TABLES = {
+    "athletes": {
+        "file": "athletes.csv",
+        "dates": ["birth_date"],
+        "categories": ["gender", "function", "disciplines", *COUNTRY],
+        "ints": {"code": "int32", "height": "int16", "weight": "int16"},
+    },
+    "coaches": {
+        "file": "coaches.csv",
+        "dates": ["birth_date"],
+        "categories": [
+            "gender",
+            "function",
+            "category",
+            "disciplines",
+            "events",
+            *COUNTRY,
+        ],
+        "ints": {"code": "int32"},
+    },
+    "events": {"file": "events.csv", "dates": []},
+    "medallists": {
+        "file": "medallists.csv",
+        "dates": ["medal_date", "birth_date"],
+        "categories": [
+            "medal_type",
+            "gender",
+            "team",
+            "team_gender",
+            "discipline",
+            "event",
+            "event_type",
+            *COUNTRY,
+            "nationality_code",
+            "nationality",
+            "nationality_long",
+        ],
+        "ints": {"code_athlete": "int32"},
+    },
+    "medals": {
+        "file": "medals.csv",
+        "dates": ["medal_date"],
+        "categories": [
+            "medal_type",
+            "gender",
+            "discipline",
+            "event",
+            "event_type",
+            *COUNTRY,
+        ],
+    },
+    "medals_total": {"file": "medals_total.csv", "dates": []},
+    "nocs": {"file": "nocs.csv", "dates": []},
+    "schedules": {
+        "file": "schedules.csv",
+        "dates": ["start_date", "end_date"],
+        "categories": [
+            "day",
+            "status",
+            "discipline",
+            "discipline_code",
+            "event",
+            "phase",
+            "gender",
+            "event_type",
+            "venue",
+            "venue_code",
+            "location_description",
+            "location_code",
+        ],
+        "ints": {"event_medal": "int8"},
+    },
+    "teams": {
+        "file": "teams.csv",
+        "dates": [],
+        "categories": [
+            "team",
+            "team_gender",
+            "discipline",
+            "disciplines_code",
+            "events",
+            *COUNTRY,
+        ],
+    },
+    "technical_officials": {
+        "file": "technical_officials.csv",
+        "dates": [],
+        "categories": [
+            "gender",
+            "function",
+            "category",
+            "organisation_code",
+            "organisation",
+            "organisation_long",
+            "disciplines",
+        ],
+        "ints": {"code": "int32"},
+    },
+    "torch_route": {"file": "torch_route.csv", "dates": ["date_start", "date_end"]},
+    "venues": {"file": "venues.csv", "dates": ["date_start", "date_end"]},
+}
+
+# NOC code -> continent (historic and neutral delegations fall back to "Other")
+# fmt: off
+CONTINENT_NOCS = {
+    "Africa": [
+        "ALG", "ANG", "BDI", "BEN", "BOT", "BUR", "CAF", "CGO", "CHA", "CIV",
+        "CMR", "COD", "COM", "CPV", "DJI", "EGY", "ERI", "ETH", "GAB", "GAM",
+        "GBS", "GEQ", "GHA", "GUI", "KEN", "LBA", "LBR", "LES", "MAD", "MAR",
+        "MAW", "MLI", "MOZ", "MRI", "MTN", "NAM", "NGR", "NIG", "RSA", "RWA",
+        "SEN", "SEY", "SLE", "SOM", "SSD", "STP", "SUD", "SWZ", "TAN", "TOG",
+        "TUN", "UGA", "ZAM", "ZIM",
+    ],
+    "Americas": [
+        "AHO", "ANT", "ARG", "ARU", "BAH", "BAR", "BER", "BIZ", "BOL", "BRA",
+        "CAN", "CAY", "CHI", "COL", "CRC", "CUB", "DMA", "DOM", "ECU", "ESA",
+        "GRN", "GUA", "GUY", "HAI", "HON", "ISV", "IVB", "JAM", "LCA", "MEX",
+        "NCA", "PAN", "PAR", "PER", "PUR", "SKN", "SUR", "TTO", "URU", "USA",
+        "VEN", "VIN",
+    ],
+    "Asia": [
+        "AFG", "BAN", "BHU", "BRN", "BRU", "CAM", "CHN", "COR", "HKG", "INA",
+        "IND", "IRI", "IRQ", "JOR", "JPN", "KAZ", "KGZ", "KOR", "KSA", "KUW",
+        "LAO", "LBN", "MAS", "MDV", "MGL", "MYA", "NEP", "OMA", "PAK", "PHI",
+        "PLE", "PRK", "QAT", "SGP", "SRI", "SYR", "THA", "TJK", "TKM", "TLS",
+        "TPE", "UAE", "UZB", "VIE", "YEM",
+    ],
+    "Europe": [
+        "ALB", "AND", "ARM", "AUT", "AZE", "BEL", "BIH", "BLR", "BUL", "CIS",
+        "CRO", "CYP", "CZE", "DEN", "ESP", "EST", "EUN", "FIN", "FRA", "FRG",
+        "GBR", "GDR", "GEO", "GER", "GRE", "HUN", "IRL", "ISL", "ISR", "ITA",
+        "KOS", "LAT", "LIE", "LTU", "LUX", "MDA", "MKD", "MLT", "MNE", "MON",
+        "NED", "NOR", "OAR", "POL", "POR", "ROC", "ROU", "RUS", "SCG", "SLO",
+        "SMR", "SRB", "SUI", "SVK", "SWE", "TCH", "TUR", "UKR", "URS", "YUG",
+    ],
+    "Oceania": [
+        "ASA", "AUS", "COK", "FIJ", "FSM", "GUM", "KIR", "MHL", "NRU", "NZL",
+        "PLW", "PNG", "SAM", "SOL", "TGA", "TUV", "VAN",
+    ],
+}
+# fmt: on
+NOC_CONTINENT = {
+    noc: continent for continent, nocs in CONTINENT_NOCS.items() for noc in nocs
+}
+
+# Paris 2024 opening day, used as the reference date for athlete ages
+REFERENCE_DATE = pd.Timestamp("2024-07-26")
+
+# _lock guards the dicts below; a build holds only its own key's lock, so
+# lookups of values already built never wait for a build of another key
+_lock = threading.Lock()
+_build_locks = {}
+_frames = {}
+_MISSING = object()
+# key -> the keys (shared values or data sources) read while building it
+_inputs = {}
+# key -> number of times its value was dropped by invalidate()
+_generations = {}
+# keys of the shared values being built by this thread, innermost last
+_local = threading.local()
+
+
+def csv_path(name):
+    return DATA_DIR / TABLES[name]["file"]
+
+
+def parquet_path(name):
+    return PARQUET_DIR / f"{name}.parquet"
+
+
+def convert_table(name):
+    """Write the Parquet copy of a table if it is missing or older than its CSV."""
+    src = csv_path(name)
+    dst = parquet_path(name)
+    # a data directory may also hold only the Parquet copies (olympics.synthetic)
+    if dst.exists() and (
+        not src.exists() or dst.stat().st_mtime >= src.stat().st_mtime
+    ):
+        return dst
+
+    df = pd.read_csv(src, low_memory=False)
+    for col in TABLES[name]["dates"]:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    PARQUET_DIR.mkdir(exist_ok=True)
+    # write to a temp file first so other workers never read a partial file
+    tmp = dst.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, dst)
+    return dst
+
+
+def file_state(path, known=None, content=True):
+    """Size, mtime and (with ``content``) content hash of a file.
+
+    ``known`` (an earlier state) is returned as is while the size and mtime
+    still match it, so only files that were touched are read.
+    """
+    stat = path.stat()
+    state = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if known and all(known.get(k) == v for k, v in state.items()):
+        return dict(known)
+    if not content:
+        return state
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    state["hash"] = digest.hexdigest()
+    return state
+
+
+def _depends_on(key):
+    """Record that the shared value being built (if any) reads ``key``."""
+    building = getattr(_local, "building", None)
+    if building:
+        with _lock:
+            _inputs.setdefault(building[-1], set()).add(key)
+
+
+def _shared(key, build):
+    _depends_on(key)
+    value = _frames.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    with _lock:
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+    with build_lock:
+        value = _frames.get(key, _MISSING)
+        if value is not _MISSING:  # built by another thread meanwhile
+            return value
+        generation = _generations.get(key, 0)
+        building = _local.__dict__.setdefault("building", [])
+        building.append(key)
+        try:
+            value = build()
+        finally:
+            building.pop()
+        with _lock:
+            # an input invalidated during the build: the value is already stale
+            if _generations.get(key, 0) == generation:
+                _frames[key] = value
+        return value
+
+
+def invalidate(keys):
+    """Drop the shared values of ``keys`` and every value built from them.
+
+    ``keys`` are shared-value keys (table names, "medal_cube", ...) or data
+    sources recorded with ``_depends_on``. Returns the keys dropped; they are
+    rebuilt by their next load.
+    """
+    with _lock:
+        dropped = set()
+        pending = list(keys)
+        while pending:
+            key = pending.pop()
+            if key not in dropped:
+                dropped.add(key)
+                pending.extend(k for k, inputs in _inputs.items() if key in inputs)
+        for key in dropped:
+            _frames.pop(key, None)
+            _inputs.pop(key, None)
+            _generations[key] = _generations.get(key, 0) + 1
+        return dropped
+
+
+def data_version(*keys):
+    """Token that changes whenever one of ``keys`` is invalidated.
+
+    Pages pass it to their ``st.cache_resource`` / ``st.cache_data`` functions
+    and cached figures, so those are rebuilt after a refresh of their data.
+    """
+    return tuple(_generations.get(key, 0) for key in keys)
+
+
+def downcast_ints(df, ints):
+    """Cast the ``{column: dtype}`` integer columns whose values all fit, in place."""
+    for col, dtype in ints.items():
+        if col not in df.columns or df[col].dtype.kind != "i" or df[col].empty:
+            continue
+        info = np.iinfo(dtype)
+        if info.min <= df[col].min() and df[col].max() <= info.max:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def sort_categories(df):
+    """Put the categories of every categorical column in sorted order, in place.
+
+    Parquet dictionaries list values in order of appearance; sorted categories
+    keep ``sort=True`` factorizing and grouping in value order, as for strings.
+    """
+    for col in df.select_dtypes("category").columns:
+        df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    return df
+
+
+def read_table(name):
+    """A table's Parquet copy as a DataFrame with the compact dtypes of TABLES."""
+    spec = TABLES[name]
+    # Parquet stores text dictionary-encoded, so the categoricals are read as
+    # codes plus one copy of each distinct value, never decoded per row
+    df = pd.read_parquet(
+        convert_table(name), read_dictionary=spec.get("categories", [])
+    )
+    return downcast_ints(sort_categories(df), spec.get("ints", {}))
+
+
+def load_table(name):
+    """Return the shared DataFrame for a table, reading it at most once per process."""
+    return _shared(name, lambda: read_table(name))
+
+
+def load_tables(*names):
+    return tuple(load_table(name) for name in names)
+
+
+def continent_of(noc_codes):
+    """Map a Series of NOC codes to continent names."""
+    return noc_codes.map(NOC_CONTINENT).fillna("Other")
+
+
+def load_athletes():
+    """athletes.csv with derived age, country and continent columns, built once."""
+    return _shared("athletes+derived", _build_athletes)
+
+
+def _build_athletes():
+    athletes = load_table("athletes")
+    nocs = load_table("nocs")
+
+    derived = {}
+    if "birth_date" in athletes.columns:
+        derived["age"] = (REFERENCE_DATE - athletes["birth_date"]).dt.days // 365
+    else:
+        derived["age"] = pd.Series(pd.NA, index=athletes.index, dtype="Int64")
+
+    codes = athletes.get("country_code", pd.Series("", index=athletes.index))
+    if "country" not in athletes.columns:
+        derived["country"] = codes.map(nocs.set_index("code")["country"]).fillna(codes)
+    derived["continent"] = continent_of(codes)
+    return athletes.assign(**derived)
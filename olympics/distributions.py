@@ -0,0 +1,147 @@
+"""
+Server-side summaries for the distribution (violin / box) charts.
+
+Instead of sending one marker per athlete to the browser, each group is
+reduced in numpy to its quartiles, Tukey whiskers, a KDE curve on a fixed
+grid and an evenly spaced sample of at most ``MAX_OUTLIERS`` outliers. The
+figures are drawn from those statistics, so their size depends on the
+number of groups, not on the number of athletes.
+"""
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# points on which each KDE curve is evaluated
+KDE_POINTS = 100
+# distinct values above this are binned before the KDE is evaluated
+KDE_BINS = 512
+# outliers drawn per group
+MAX_OUTLIERS = 50
+
+
+def _bandwidth(values, q1, q3):
+    """Silverman's rule of thumb (the default of plotly's violins)."""
+    spread = min(values.std(), (q3 - q1) / 1.34) or values.std() or 1.0
+    return 0.9 * spread * len(values) ** -0.2
+
+
+def _kde(values, bandwidth):
+    """Gaussian KDE on a grid spanning the data plus two bandwidths."""
+    points, weights = np.unique(values, return_counts=True)
+    if len(points) > KDE_BINS:
+        weights, edges = np.histogram(values, bins=KDE_BINS)
+        points = (edges[:-1] + edges[1:]) / 2
+    grid = np.linspace(
+        values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, KDE_POINTS
+    )
+    z = (grid[:, None] - points[None, :]) / bandwidth
+    density = np.exp(-0.5 * z**2) @ weights
+    return grid, density / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+
+
+def summarize(values):
+    """Box / violin statistics of one group of values (NaNs ignored)."""
+    values = np.asarray(values, dtype=float)
+    values = np.sort(values[~np.isnan(values)])
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lower, upper = inside[0], inside[-1]
+
+    outliers = values[(values < lower) | (values > upper)]
+    if len(outliers) > MAX_OUTLIERS:
+        # evenly spaced over the sorted outliers, so both extremes are kept
+        picks = np.linspace(0, len(outliers) - 1, MAX_OUTLIERS).round().astype(int)
+        outliers = outliers[picks]
+
+    grid, density = _kde(values, _bandwidth(values, q1, q3))
+    return {
+        "n": len(values),
+        "mean": float(values.mean()),
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "lower": float(lower),
+        "upper": float(upper),
+        "outliers": outliers,
+        "grid": grid,
+        "density": density,
+    }
+
+
+def group_summaries(frame, value_col, group_col=None):
+    """``[(group, summary), ...]`` for ``value_col``, one entry per group."""
+    if group_col is None:
+        groups = [(None, frame[value_col].to_numpy())]
+    else:
+        groups = [
+            (name, group.to_numpy())
+            for name, group in frame.groupby(group_col, sort=False)[value_col]
+        ]
+    summaries = [(name, summarize(values)) for name, values in groups]
+    return [(name, s) for name, s in summaries if s is not None]
+
+
+def summary_figure(summaries, kind="Violin", height=500):
+    """Violin or box figure drawn from ``group_summaries`` output."""
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (name, s) in enumerate(summaries):
+        color = colors[i % len(colors)]
+        label = "All athletes" if name is None else str(name)
+        if kind == "Violin":
+            half = s["density"] / s["density"].max() * 0.4
+            fig.add_trace(
+                go.Scatter(
+                    x=np.concatenate([i - half, (i + half)[::-1]]),
+                    y=np.concatenate([s["grid"], s["grid"][::-1]]),
+                    fill="toself",
+                    mode="lines",
+                    line=dict(color=color, width=1),
+                    name=label,
+                    legendgroup=label,
+                    hoverinfo="skip",
+                )
+            )
+        fig.add_trace(
+            go.Box(
+                x=[i],
+                q1=[s["q1"]],
+                median=[s["median"]],
+                q3=[s["q3"]],
+                lowerfence=[s["lower"]],
+                upperfence=[s["upper"]],
+                mean=[s["mean"]],
+                width=0.1 if kind == "Violin" else 0.6,
+                marker_color=color,
+                name=label,
+                legendgroup=label,
+                showlegend=kind != "Violin",
+                hovertext=f"{label} (n={s['n']})",
+            )
+        )
+        if len(s["outliers"]):
+            fig.add_trace(
+                go.Scatter(
+                    x=np.full(len(s["outliers"]), i),
+                    y=s["outliers"],
+                    mode="markers",
+                    marker=dict(color=color, size=4),
+                    name=label,
+                    legendgroup=label,
+                    showlegend=False,
+                )
+            )
+    fig.update_layout(
+        height=height,
+        xaxis=dict(
+            tickmode="array",
+            tickvals=list(range(len(summaries))),
+            ticktext=["" if name is None else str(name) for name, _ in summaries],
+        ),
+        showlegend=len(summaries) > 1,
+    )
+    return fig
@@ -0,0 +1,105 @@
+"""
+Process-wide cache of rendered Plotly figures.
+
+Each chart is keyed by a canonical hash of its name and the inputs it
+depends on (filter selections and chart options; selections are compared
+as sorted sets, and "everything selected" is the same key as no filter).
+The cache holds the figure's JSON within a byte budget shared by all
+sessions, evicting the least recently used figures, so a selection that was
+already rendered once is served without re-running pandas or Plotly Express.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from olympics.data import _shared
+from olympics.filters import canonical_value
+from olympics.profiling import span
+
+# memory budget (MB) for the figure JSON held by figure_cache()
+FIGURE_BUDGET_MB = float(os.environ.get("OLYMPICS_FIGURE_BUDGET_MB", "32"))
+
+
+def figure_key(chart, **inputs):
+    """Stable hash of a chart name and the inputs its figure depends on."""
+    payload = json.dumps([chart, canonical_value(inputs)], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class FigureCache:
+    """Figure JSON by key, kept within ``budget_bytes`` with LRU eviction."""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._specs:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(key)
+            self.hits += 1
+            return self._specs[key]
+
+    def put(self, key, spec):
+        size = len(spec)
+        if size > self.budget_bytes:
+            return
+        with self._lock:
+            if key in self._specs:
+                return
+            self._specs[key] = spec
+            self.bytes_used += size
+            while self.bytes_used > self.budget_bytes:
+                _, evicted = self._specs.popitem(last=False)
+                self.bytes_used -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "figures": len(self._specs),
+                "bytes_used": self.bytes_used,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+def figure_cache():
+    """The process-wide FigureCache (budget: OLYMPICS_FIGURE_BUDGET_MB)."""
+    return _shared("figure_cache", lambda: FigureCache(int(FIGURE_BUDGET_MB * 2**20)))
+
+
+def cached_figure(chart, build, **inputs):
+    """The figure ``build()`` returns for ``inputs``, built once per key.
+
+    ``build`` must derive the figure only from state named in ``inputs``:
+    pages pass the ``filter_key`` of their filters and the ``data_version``
+    of the values they read, so a refresh of that data rebuilds the figure.
+    """
+    cache = figure_cache()
+    key = figure_key(chart, **inputs)
+    spec = cache.get(key)
+    if spec is None:
+        with span("figure.build"):
+            fig = build()
+        with span("figure.serialize"):
+            cache.put(key, pio.to_json(fig, validate=False))
+        return fig
+    # the JSON came out of Plotly itself, so skip validating it again
+    with span("figure.decode"):
+        return go.Figure(json.loads(spec), _validate=False)
@@ -0,0 +1,256 @@
+"""
+Stage timings of each page run.
+
+Pages wrap their load, filter, aggregate and render steps in ``span(name)``
+blocks ("load", "filter", "aggregate.medal_table", "render.medal_pie", ...;
+the part before the first dot is the stage). While profiling is on, every
+span that finishes is recorded
+
+- in the trace of the current run, which ``profiler_panel()`` shows in the
+  sidebar,
+- in a rolling window per page and span shared by all sessions, for
+  percentiles across sessions (``span_stats()``),
+- as one JSON line appended to OLYMPICS_PROFILE_LOG, when set, for offline
+  analysis of production latency.
+
+Profiling is on for every run when OLYMPICS_PROFILE=1, and otherwise for the
+runs of sessions that switched the sidebar panel on. While it is off
+``span`` returns one shared no-op context manager, so an instrumented block
+costs a thread-local lookup.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from olympics.data import _shared
+
+# profile every run of every session, not only those with the panel on
+PROFILE_ALL = os.environ.get("OLYMPICS_PROFILE") == "1"
+# JSON-lines file the spans are appended to (unset: no export)
+PROFILE_LOG = os.environ.get("OLYMPICS_PROFILE_LOG")
+# durations kept per page and span for the rolling percentiles
+PROFILE_WINDOW = int(os.environ.get("OLYMPICS_PROFILE_WINDOW", "1000"))
+
+PROFILER_KEY = "profiler_on"
+
+_local = threading.local()
+_NO_SPAN = contextlib.nullcontext()
+
+
+class Trace:
+    """The spans of one run of a page, in the order they finished."""
+
+    def __init__(self, page, session=None):
+        self.page = page
+        self.session = session
+        self.run = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        # (name, depth, start offset, total, self) in seconds
+        self.spans = []
+        # time spent in the children of each open span
+        self._children = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def frame(self):
+        """The spans in start order, in milliseconds."""
+        spans = sorted(self.spans, key=lambda s: s[2])
+        frame = pd.DataFrame(
+            spans, columns=["span", "depth", "start_ms", "total_ms", "self_ms"]
+        )
+        frame[["start_ms", "total_ms", "self_ms"]] *= 1000
+        return frame
+
+    def stages(self):
+        """Milliseconds per stage, from the outermost spans."""
+        totals = {}
+        for name, depth, _, total, _ in self.spans:
+            if depth == 0:
+                stage = name.partition(".")[0]
+                totals[stage] = totals.get(stage, 0.0) + total * 1000
+        return totals
+
+
+class _Span:
+    __slots__ = ("trace", "name", "depth", "start")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.depth = len(self.trace._children)
+        self.trace._children.append(0.0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        total = time.perf_counter() - self.start
+        trace = self.trace
+        children = trace._children.pop()
+        if trace._children:
+            trace._children[-1] += total
+        offset = self.start - trace.started
+        trace.spans.append((self.name, self.depth, offset, total, total - children))
+        span_stats().add(trace.page, self.name, total)
+        if PROFILE_LOG:
+            span_log().write(
+                {
+                    "ts": round(time.time() - total, 6),
+                    "page": trace.page,
+                    "session": trace.session,
+                    "run": trace.run,
+                    "span": self.name,
+                    "stage": self.name.partition(".")[0],
+                    "depth": self.depth,
+                    "ms": round(total * 1000, 3),
+                    "self_ms": round((total - children) * 1000, 3),
+                }
+            )
+        return False
+
+
+def span(name):
+    """Context manager timing the block as ``name`` while profiling is on."""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+def start_run(page):
+    """Start the trace of this run of ``page``; None when profiling is off.
+
+    Call it at the top of the page, before any span.
+    """
+    if PROFILE_ALL or st.session_state.get(PROFILER_KEY, False):
+        ctx = get_script_run_ctx()
+        _local.trace = Trace(page, ctx.session_id if ctx else None)
+    else:
+        _local.trace = None
+    return _local.trace
+
+
+def start_fragment_run(page):
+    """``start_run`` for the top of an ``st.fragment``.
+
+    A rerun of only the fragment gets a trace of its own (its spans go to the
+    rolling stats and the log; the panel shows full runs); within a full run
+    the fragment's spans stay in the run's trace.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        return start_run(page)
+    return current_trace()
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+class SpanStats:
+    """The latest ``window`` durations of each (page, span), across sessions."""
+
+    def __init__(self, window):
+        self.window = window
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def add(self, page, name, seconds):
+        with self._lock:
+            durations = self._durations.get((page, name))
+            if durations is None:
+                durations = self._durations[page, name] = deque(maxlen=self.window)
+            durations.append(seconds)
+
+    def summary(self, page=None):
+        """Count and p50 / p95 / p99 milliseconds per span (of one page)."""
+        with self._lock:
+            items = [
+                (key, np.fromiter(durations, float))
+                for key, durations in self._durations.items()
+                if page is None or key[0] == page
+            ]
+        rows = [
+            (p, name, len(values), *np.percentile(values * 1000, [50, 95, 99]))
+            for (p, name), values in items
+        ]
+        return pd.DataFrame(
+            rows, columns=["page", "span", "n", "p50_ms", "p95_ms", "p99_ms"]
+        )
+
+
+def span_stats():
+    """The process-wide SpanStats (window: OLYMPICS_PROFILE_WINDOW)."""
+    return _shared("span_stats", lambda: SpanStats(PROFILE_WINDOW))
+
+
+class SpanLog:
+    """Appends one JSON object per line to ``path``, from any thread."""
+
+    def __init__(self, path):
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+
+def span_log():
+    """The process-wide SpanLog writing to OLYMPICS_PROFILE_LOG."""
+    return _shared("span_log", lambda: SpanLog(PROFILE_LOG))
+
+
+def profiler_panel(container=None):
+    """Sidebar switch and, when on, the timings of this run and across sessions.
+
+    Call it last on the page (and before any ``st.stop()``), so the trace is
+    complete.
+    """
+    container = container or st.sidebar
+    container.markdown("---")
+    if not container.toggle("⏱️ Profiler", key=PROFILER_KEY):
+        return
+    trace = current_trace()
+    if trace is None:  # switched on during this run: timings start with the next
+        container.caption("Timings start with the next rerun.")
+        return
+
+    container.caption(f"This run: **{trace.elapsed() * 1000:,.1f} ms**")
+    stages = trace.stages()
+    if stages:
+        container.dataframe(
+            pd.Series(stages, name="ms").round(1).rename_axis("stage"),
+            use_container_width=True,
+        )
+    spans = trace.frame()
+    spans["span"] = [
+        " " * depth + name for name, depth in zip(spans["span"], spans["depth"])
+    ]
+    container.dataframe(
+        spans[["span", "total_ms", "self_ms"]].round(1),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    summary = span_stats().summary(trace.page)
+    if len(summary):
+        container.caption("All sessions (latest runs)")
+        container.dataframe(
+            summary.drop(columns="page").round(1),
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -0,0 +1,174 @@
+"""
+Incremental refresh of the data while the app runs.
+
+Updated CSVs may be dropped into data/ and data/results/ during the Games.
+``refresh_data()``, called at the top of every page, checks the files at most
+once every OLYMPICS_REFRESH_SECONDS per process: by size and mtime, and by
+content hash for the files that were touched since the last check. For each
+file whose content changed
+
+- a table: its Parquet copy is dropped, so the next load converts the new
+  CSV, and the shared frame and every value built from it are invalidated
+  (``olympics.data.invalidate``),
+- a results file: the partitions of its disciplines are rewritten
+  (``olympics.results.update_results``), only those disciplines are dropped
+  from ``results_cache()``, and the values built from the whole dataset are
+  invalidated.
+
+A new process first brings an existing results dataset up to date with the
+files changed before it started.
+
+Nothing else is dropped: the other tables and disciplines, the figure cache
+and the sessions are kept. Pages pass ``data_version`` of the values they use
+to their own caches, so those rebuild when, and only when, their data did.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from olympics.data import (
+    DATA_DIR,
+    TABLES,
+    _shared,
+    file_state,
+    invalidate,
+    parquet_path,
+)
+from olympics.results import (
+    RESULTS_DATASET,
+    RESULTS_KEY,
+    read_manifest,
+    result_files,
+    results_cache,
+    update_results,
+)
+
+# seconds between two checks of the data files (0: every page run)
+REFRESH_SECONDS = float(os.environ.get("OLYMPICS_REFRESH_SECONDS", "10"))
+
+
+class DataWatcher:
+    """Content states of the data files, as this process last loaded them."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.checks = 0
+        # summaries of the latest refreshes
+        self.refreshes = deque(maxlen=100)
+        self._tables = {spec["file"]: name for name, spec in TABLES.items()}
+        # a dataset built before this process started is brought up to date
+        # with the files changed since (while the app was down, say)
+        if (RESULTS_DATASET / "_SUCCESS").exists():
+            update_results()
+        # discipline codes of each results file, for the results_cache() entries
+        self._codes = self._result_codes()
+        # the files are only hashed once touched (hashing all of them here
+        # would read the whole data directory in every new worker), except
+        # the results files still as the dataset's manifest recorded them
+        self._states = self._scan(self._manifest(), content=False)
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _scan(self, known, content=True):
+        """file_state() of every data file, by path relative to DATA_DIR."""
+        paths = [DATA_DIR / file for file in self._tables] + result_files()
+        states = {}
+        for path in paths:
+            key = path.relative_to(DATA_DIR).as_posix()
+            try:
+                states[key] = file_state(path, known.get(key), content)
+            except FileNotFoundError:  # missing, or removed while scanning
+                pass
+        return states
+
+    def _manifest(self):
+        """The results dataset's manifest, by path relative to DATA_DIR."""
+        return {f"results/{name}": entry for name, entry in read_manifest().items()}
+
+    def _result_codes(self):
+        return {key: entry["codes"] for key, entry in self._manifest().items()}
+
+    def check(self, force=False):
+        """Refresh whatever changed since the last check.
+
+        Returns a summary of the refresh, or None when it was not time to
+        check yet, another thread was checking or no file changed.
+        """
+        if not force and time.monotonic() - self._checked < self.interval:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked = time.monotonic()
+            self.checks += 1
+            return self._refresh()
+        finally:
+            self._lock.release()
+
+    def _refresh(self):
+        started = time.perf_counter()
+        states = self._scan(self._states)
+        hashes = {key: state.get("hash") for key, state in self._states.items()}
+        if any(hashes.get(key) is None for key in states if key not in self._tables):
+            # results files that had no dataset yet when this process started:
+            # it was built since, from the content the manifest hashed
+            for key, entry in self._manifest().items():
+                hashes[key] = hashes.get(key) or entry.get("hash")
+        # touched files (new states) whose content differs, or whose earlier
+        # content is unknown
+        changed = {
+            key
+            for key, state in states.items()
+            if state != self._states.get(key) and state["hash"] != hashes.get(key)
+        }
+        changed.update(key for key in self._states if key not in states)
+        self._states = states
+        if not changed:
+            return None
+
+        tables = sorted(self._tables[key] for key in changed if key in self._tables)
+        for name in tables:
+            parquet_path(name).unlink(missing_ok=True)
+        files = sorted(key for key in changed if key not in self._tables)
+        codes = set()
+        if files:
+            # the files' codes before the update: as this process loaded them,
+            # or from the manifest (the dataset may have been built since)
+            previous = {**self._result_codes(), **self._codes}
+            # (a dataset not built yet is built from the new files on first read)
+            if (RESULTS_DATASET / "_SUCCESS").exists():
+                codes = update_results()
+            # another worker may have rewritten the partitions already
+            self._codes = self._result_codes()
+            for key in files:
+                codes.update(previous.get(key, []), self._codes.get(key, []))
+            cache = results_cache()
+            unknown = any(key not in previous for key in files)
+            cache.discard(cache.stats()["cached"] if unknown else codes)
+
+        dropped = invalidate(tables + ([RESULTS_KEY] if files else []))
+        summary = {
+            "tables": tables,
+            "results": sorted(codes),
+            "dropped": sorted(dropped),
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        self.refreshes.append(summary)
+        return summary
+
+
+def data_watcher():
+    """The process-wide DataWatcher (interval: OLYMPICS_REFRESH_SECONDS)."""
+    return _shared("data_watcher", lambda: DataWatcher(REFRESH_SECONDS))
+
+
+def refresh_data(force=False):
+    """Check the data files and refresh what changed (see ``DataWatcher``).
+
+    Pages call it at the top of every run, then key their own caches and
+    figures by the ``data_version`` of the values they read, so those are
+    rebuilt when, and only when, that data changed.
+    """
+    return data_watcher().check(force)
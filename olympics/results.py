@@ -0,0 +1,475 @@
+"""
+Results warehouse built from the per-discipline files in data/results/.
+
+The CSVs are parsed concurrently (Arrow's CSV reader releases the GIL, so a
+thread pool scales with cores), normalised onto one typed schema — columns a
+discipline does not have are filled with nulls — and written once as a
+Parquet dataset partitioned by ``discipline_code`` under
+data/.parquet/results/. Later loads are a single columnar read.
+
+The dataset keeps a manifest of the CSVs it was built from (size, mtime and
+content hash, and the discipline codes of each). When files change only
+their partitions are rewritten, so an updated results file is picked up in
+milliseconds without re-reading the others.
+
+Ingestion also parses the free-text ``result`` column into a numeric
+``result_value`` plus ``result_unit`` (see ``parse_result_values``), so the
+parsed values are stored alongside the raw strings.
+
+Pages read results lazily through ``results_cache()``: a discipline's
+partition is only read when it is asked for, and the frames kept in memory
+stay within a configurable budget with least-recently-used eviction.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+from olympics.data import (
+    DATA_DIR,
+    PARQUET_DIR,
+    _depends_on,
+    _shared,
+    file_state,
+    load_table,
+    sort_categories,
+)
+
+RESULTS_DIR = DATA_DIR / "results"
+RESULTS_DATASET = PARQUET_DIR / "results"
+# file name -> file_state() plus the discipline codes of the file
+RESULTS_MANIFEST = "_MANIFEST.json"
+# the source key of the shared values built from the dataset (olympics.data)
+RESULTS_KEY = "results_dataset"
+
+# held while the dataset or its manifest is written (one writer per process)
+_write_lock = threading.Lock()
+
+# memory budget (MB) for the per-discipline frames held by results_cache()
+RESULTS_BUDGET_MB = float(os.environ.get("OLYMPICS_RESULTS_BUDGET_MB", "64"))
+
+# union of the columns found across all discipline files
+RESULTS_SCHEMA = pa.schema(
+    [
+        ("date", pa.timestamp("us", tz="UTC")),
+        ("stage_code", pa.string()),
+        ("event_code", pa.string()),
+        ("event_name", pa.string()),
+        ("event_stage", pa.string()),
+        ("stage", pa.string()),
+        ("gender", pa.string()),
+        ("discipline_name", pa.string()),
+        ("discipline_code", pa.string()),
+        ("venue", pa.string()),
+        ("participant_code", pa.string()),
+        ("participant_name", pa.string()),
+        ("participant_type", pa.string()),
+        ("participant_country_code", pa.string()),
+        ("participant_country", pa.string()),
+        ("rank", pa.float64()),
+        ("result", pa.string()),
+        ("result_type", pa.string()),
+        ("result_IRM", pa.string()),
+        ("result_WLT", pa.string()),
+        ("result_diff", pa.string()),
+        ("qualification_mark", pa.string()),
+        ("start_order", pa.string()),
+        ("bib", pa.string()),
+    ]
+)
+# columns added by parse_result_values()
+PARSED_FIELDS = [
+    pa.field("result_value", pa.float64()),
+    pa.field("result_unit", pa.string()),
+]
+
+# repetitive text columns, loaded as categoricals (see olympics.data.TABLES)
+RESULTS_CATEGORIES = [
+    "stage_code",
+    "event_code",
+    "event_name",
+    "event_stage",
+    "stage",
+    "gender",
+    "discipline_name",
+    "discipline_code",
+    "venue",
+    "participant_type",
+    "participant_country_code",
+    "participant_country",
+    "result_type",
+    "result_IRM",
+    "result_WLT",
+    "qualification_mark",
+    "start_order",
+    "result_unit",
+]
+
+# result_type -> unit of result_value; types missing here carry no number
+# (FAULT, RANK, NO_SCORE, RM, IRM, IRM_TIME, IRM_RANK)
+RESULT_UNITS = {
+    "TIME": "seconds",
+    "DISTANCE": "metres",
+    "POINTS": "points",
+    "IRM_POINTS": "points",
+    "SCORE": "points",
+    "SETS": "sets",
+    "STROKES": "strokes",
+    "WEIGHT": "kg",
+    "PERCENT": "percent",
+}
+# files without a result_type column (Wrestling) report points
+DEFAULT_RESULT_TYPE = "POINTS"
+# result types that keep their value when an IRM code (DNF, DSQ, ...) is set,
+# e.g. sailing scores a DNF as fleet size + 1 points
+IRM_SCORED_TYPES = ["IRM_POINTS"]
+
+NUMBER_RE = r"^-?\d+(\.\d+)?$"
+CLOCK_RE = r"^(?:(?P<h>\d+):)?(?P<m>\d+):(?P<s>\d+(?:\.\d+)?)$"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("discipline_code", pa.string())]), flavor="hive"
+)
+
+
+def result_files():
+    return sorted(RESULTS_DIR.glob("*.csv"))
+
+
+def read_result_file(path):
+    """Parse one discipline CSV straight onto RESULTS_SCHEMA."""
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=False),
+        convert_options=pacsv.ConvertOptions(
+            column_types={field.name: field.type for field in RESULTS_SCHEMA},
+            strings_can_be_null=True,
+        ),
+    )
+    columns = [
+        (
+            table.column(field.name)
+            if field.name in table.column_names
+            else pa.nulls(table.num_rows, field.type)
+        )
+        for field in RESULTS_SCHEMA
+    ]
+    return pa.Table.from_arrays(columns, schema=RESULTS_SCHEMA)
+
+
+def _to_float(strings):
+    """Cast numeric strings to float64; empty strings become null."""
+    return pc.cast(pc.if_else(pc.equal(strings, ""), None, strings), pa.float64())
+
+
+def parse_result_values(result, result_type, result_irm):
+    """Numeric value and unit for each raw result, fully vectorised.
+
+    Times ("47.28", "1:59.82", "2:50:31") become seconds, distances metres,
+    and scores their plain number. Rows with an IRM code (DNS, DNF, DSQ, ...)
+    get no value unless their type still scores them (IRM_POINTS).
+    Returns ``(result_value, result_unit)`` Arrow arrays.
+    """
+    result_type = pc.fill_null(result_type, DEFAULT_RESULT_TYPE)
+
+    is_number = pc.fill_null(pc.match_substring_regex(result, NUMBER_RE), False)
+    number = pc.cast(pc.if_else(is_number, result, None), pa.float64())
+
+    clock = pc.extract_regex(result, CLOCK_RE)
+    seconds = pc.add(
+        pc.add(
+            pc.multiply(pc.fill_null(_to_float(pc.struct_field(clock, "h")), 0), 3600),
+            pc.multiply(_to_float(pc.struct_field(clock, "m")), 60),
+        ),
+        _to_float(pc.struct_field(clock, "s")),
+    )
+    is_time = pc.equal(result_type, "TIME")
+    value = pc.if_else(is_time, pc.coalesce(seconds, number), number)
+
+    units = pa.array(list(RESULT_UNITS.values()))
+    unit = pc.take(units, pc.index_in(result_type, pa.array(list(RESULT_UNITS))))
+    invalid = pc.and_(
+        pc.is_valid(result_irm),
+        pc.invert(pc.is_in(result_type, pa.array(IRM_SCORED_TYPES))),
+    )
+    value = pc.if_else(pc.or_(invalid, pc.is_null(unit)), None, value)
+    return value, unit
+
+
+def with_parsed_values(table):
+    """``table`` with result_value / result_unit appended."""
+    value, unit = parse_result_values(
+        table.column("result"), table.column("result_type"), table.column("result_IRM")
+    )
+    table = table.append_column(PARSED_FIELDS[0], value)
+    return table.append_column(PARSED_FIELDS[1], unit)
+
+
+def _read_files(paths, workers=None):
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(read_result_file, paths))
+
+
+def _codes(table):
+    return sorted(pc.unique(table.column("discipline_code")).drop_null().to_pylist())
+
+
+def read_manifest(dataset=RESULTS_DATASET):
+    """The manifest of the dataset ({} when it has none)."""
+    try:
+        return json.loads((dataset / RESULTS_MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest, dataset):
+    tmp = dataset / f"{RESULTS_MANIFEST}.{uuid.uuid4().hex}.tmp"
+    tmp.write_text(json.dumps(manifest, sort_keys=True))
+    os.replace(tmp, dataset / RESULTS_MANIFEST)
+
+
+def ingest_results(workers=None, force=False):
+    """Build the partitioned results dataset if missing; returns its path.
+
+    A dataset that already exists is kept as it is: changed files are
+    picked up by ``update_results`` (called by ``olympics.refresh``), not on
+    every read.
+    """
+    if not force and (RESULTS_DATASET / "_SUCCESS").exists():
+        return RESULTS_DATASET
+    with _write_lock:
+        # another thread may have built it while this one waited
+        if not force and (RESULTS_DATASET / "_SUCCESS").exists():
+            return RESULTS_DATASET
+        return _build_results(workers)
+
+
+def _build_results(workers=None):
+    files = result_files()
+    tables = _read_files(files, workers)
+    manifest = {
+        path.name: dict(file_state(path), codes=_codes(table))
+        for path, table in zip(files, tables)
+    }
+    table = pa.concat_tables(tables) if tables else RESULTS_SCHEMA.empty_table()
+    return write_results(with_parsed_values(table), manifest=manifest)
+
+
+def update_results(workers=None):
+    """Rewrite the partitions of the result files changed since the last build.
+
+    Files are compared with the manifest by size and mtime, and by content
+    hash when those differ, so a file that was only touched is not re-read.
+    Each partition is rebuilt from every file with rows in it and swapped in
+    on its own. Returns the discipline codes whose partition was rewritten.
+    """
+    with _write_lock:
+        return _update_results(workers)
+
+
+def _update_results(workers=None):
+    manifest = read_manifest()
+    paths = {path.name: path for path in result_files()}
+    states = {name: file_state(paths[name], manifest.get(name)) for name in paths}
+    changed = []
+    for name, state in states.items():
+        known = manifest.get(name, {})
+        if state["hash"] == known.get("hash"):
+            state["codes"] = known["codes"]  # only touched, or unchanged
+        else:
+            changed.append(name)
+    removed = [name for name in manifest if name not in paths]
+    if not changed and not removed:
+        if any(state != manifest.get(name) for name, state in states.items()):
+            _write_manifest(states, RESULTS_DATASET)  # only touched: new mtimes
+        return set()
+
+    tables = dict(zip(changed, _read_files([paths[name] for name in changed], workers)))
+    codes = {code for name in tables for code in _codes(tables[name])}
+    for name in changed + removed:
+        codes.update(manifest.get(name, {}).get("codes", []))
+    # the unchanged files with rows in those partitions are read again with them
+    others = [
+        name
+        for name in paths
+        if name not in tables and codes & set(manifest.get(name, {}).get("codes", []))
+    ]
+    tables.update(zip(others, _read_files([paths[name] for name in others], workers)))
+
+    for name, table in tables.items():
+        states[name]["codes"] = _codes(table)
+    table = pa.concat_tables([RESULTS_SCHEMA.empty_table(), *tables.values()])
+    # only the partitions of ``codes`` are replaced
+    in_codes = pc.is_in(table.column("discipline_code"), pa.array(sorted(codes)))
+    table = table.filter(in_codes)
+    _write_partitions(with_parsed_values(table), codes)
+    _write_manifest(states, RESULTS_DATASET)
+    return codes
+
+
+def _partition(dataset, code):
+    return dataset / f"discipline_code={quote(code, safe='')}"
+
+
+def _write_partitions(table, codes, parquet_dir=PARQUET_DIR):
+    """Replace the partitions of ``codes`` in the dataset with ``table``'s rows."""
+    dataset = parquet_dir / "results"
+    tmp = parquet_dir / f"results.{uuid.uuid4().hex}.tmp"
+    old = parquet_dir / f"results.{uuid.uuid4().hex}.old"
+    ds.write_dataset(table, tmp, format="parquet", partitioning=PARTITIONING)
+    old.mkdir()
+    # swapped one partition at a time; the old copies are moved out of the
+    # dataset directory first, so readers never see a partition twice
+    for code in codes:
+        target = _partition(dataset, code)
+        if target.exists():
+            os.replace(target, _partition(old, code))
+        if _partition(tmp, code).exists():
+            os.replace(_partition(tmp, code), target)
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def write_results(table, parquet_dir=PARQUET_DIR, manifest=None):
+    """Write ``table`` as the partitioned results dataset under ``parquet_dir``.
+
+    ``manifest`` describes the files it was read from (see ``update_results``).
+    """
+    dataset = parquet_dir / "results"
+    # build next to the live dataset and swap it in, so readers never see a
+    # half-written directory
+    parquet_dir.mkdir(parents=True, exist_ok=True)
+    tmp = parquet_dir / f"results.{uuid.uuid4().hex}.tmp"
+    ds.write_dataset(
+        table,
+        tmp,
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    if manifest is not None:
+        _write_manifest(manifest, tmp)
+    (tmp / "_SUCCESS").touch()
+    old = parquet_dir / f"results.{uuid.uuid4().hex}.old"
+    if dataset.exists():
+        os.replace(dataset, old)
+    os.replace(tmp, dataset)
+    shutil.rmtree(old, ignore_errors=True)
+    return dataset
+
+
+def results_dataset():
+    """Arrow dataset over the warehouse, ingesting the CSVs first if needed."""
+    _depends_on(RESULTS_KEY)
+    return ds.dataset(
+        ingest_results(),
+        format="parquet",
+        partitioning=PARTITIONING,
+        exclude_invalid_files=True,
+    )
+
+
+def load_results():
+    """All results as one DataFrame, read at most once per process."""
+    return _shared(
+        "results",
+        lambda: sort_categories(
+            results_dataset().to_table().to_pandas(categories=RESULTS_CATEGORIES)
+        ),
+    )
+
+
+def discipline_codes():
+    """Sport / discipline name -> results partition code (from events.csv)."""
+    events = load_table("events")
+    return dict(zip(events["sport"], events["sport_code"]))
+
+
+class ResultsCache:
+    """Per-discipline results read on demand and kept within a memory budget.
+
+    Once the cached frames exceed ``budget_bytes`` the least recently used
+    disciplines are evicted (the one just read is always kept).
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        """Results of one discipline (by ``discipline_code``)."""
+        with self._lock:
+            if code in self._frames:
+                self._frames.move_to_end(code)
+                self.hits += 1
+                return self._frames[code][0]
+            self.misses += 1
+
+        table = results_dataset().to_table(filter=ds.field("discipline_code") == code)
+        frame = sort_categories(table.to_pandas(categories=RESULTS_CATEGORIES))
+        size = int(frame.memory_usage(deep=True).sum())
+
+        with self._lock:
+            if code in self._frames:  # another session read it meanwhile
+                return self._frames[code][0]
+            self._frames[code] = (frame, size)
+            self.bytes_used += size
+            while self.bytes_used > self.budget_bytes and len(self._frames) > 1:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.bytes_used -= evicted
+                self.evictions += 1
+        return frame
+
+    def discard(self, codes):
+        """Forget the frames of ``codes`` (their partitions were rewritten)."""
+        with self._lock:
+            for code in codes:
+                if code in self._frames:
+                    self.bytes_used -= self._frames.pop(code)[1]
+
+    def load(self, codes):
+        """Results of several disciplines as one frame."""
+        frames = [self.get(code) for code in codes]
+        if not frames:
+            return results_dataset().schema.empty_table().to_pandas()
+        return pd.concat(frames, ignore_index=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "cached": list(self._frames),
+                "bytes_used": self.bytes_used,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+def results_cache():
+    """The process-wide ResultsCache (budget: OLYMPICS_RESULTS_BUDGET_MB)."""
+    return _shared(
+        "results_cache", lambda: ResultsCache(int(RESULTS_BUDGET_MB * 2**20))
+    )
+
+
+if __name__ == "__main__":
+    # pre-build the warehouse at deploy time: python -m olympics.results
+    print(ingest_results(force=True))
@@ -0,0 +1,285 @@
+"""
+Session schedule of the Games with interval indexes per venue and discipline.
+
+schedules.csv lists every timed session (venue, discipline, phase, medal
+flag). The sessions are sorted by start once, and each venue and each
+discipline — plus the whole Games — gets an interval index: its sessions'
+starts in order and the running maximum of their ends. The sessions
+overlapping a window [t0, t1) are then the slice between two binary searches
+(the first session whose running end passes t0, the first starting at t1),
+so "what is on at venue V / in sport S between t0 and t1" and "the next
+medal sessions after t" cost O(log n + k) instead of a scan of every
+session.
+
+``Schedule.venue_load`` measures how busy the venues are across the Games
+(``VenueLoad``): sessions per venue and hour, concurrency over time and idle
+gaps, from a sweep line over the sorted session endpoints — numpy sorts,
+cumulative sums and bin counts, with no loop over sessions.
+"""
+
+import numpy as np
+import pandas as pd
+
+from olympics.data import _shared, load_table
+
+_NO_ROWS = np.empty(0, dtype=np.int64)
+
+
+def _micros(stamps):
+    """Datetime Series as int64 microseconds since the epoch (UTC)."""
+    return stamps.dt.as_unit("us").array.asi8
+
+
+class Intervals:
+    """Sessions sorted by start, with the running maximum of their ends."""
+
+    def __init__(self, starts, ends, rows):
+        order = np.argsort(starts, kind="stable")
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.rows = rows[order]
+        # running maximum of the ends: nondecreasing, so searchable
+        self.reach = np.maximum.accumulate(self.ends) if len(order) else self.ends
+
+    def __len__(self):
+        return len(self.rows)
+
+    def overlapping(self, t0, t1):
+        """Rows of the sessions overlapping [t0, t1), in start order."""
+        # sessions before lo all ended by t0; those from hi on start at t1 or later
+        lo = np.searchsorted(self.reach, t0, side="right")
+        hi = np.searchsorted(self.starts, t1, side="left")
+        return self.rows[lo:hi][self.ends[lo:hi] > t0]
+
+    def starting_from(self, t, n):
+        """Rows of the first ``n`` sessions starting at or after ``t``."""
+        i = np.searchsorted(self.starts, t, side="left")
+        return self.rows[i : i + n]
+
+
+def _grouped(keys, starts, ends, rows):
+    """One Intervals per distinct key (rows with a missing key are left out)."""
+    codes, values = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+    groups = {}
+    for i, value in enumerate(values):
+        idx = order[bounds[i] : bounds[i + 1]]
+        groups[value] = Intervals(starts[idx], ends[idx], rows[idx])
+    return groups
+
+
+def sweep(keys, starts, ends):
+    """Concurrency steps of the sessions of each key (a sweep line).
+
+    Returns the start / end points sorted by key and time as ``(keys, times,
+    levels)``, ``levels`` being the number of the key's sessions running
+    just after each point. At the same instant ends come before starts, so
+    back-to-back sessions do not overlap. Every key's starts and ends cancel
+    out, so one cumulative sum serves all keys.
+    """
+    n = len(starts)
+    keys = np.concatenate([keys, keys])
+    times = np.concatenate([starts, ends])
+    steps = np.concatenate([np.ones(n, np.int64), np.full(n, -1, np.int64)])
+    # np.lexsort sorts by its last key first: key, then time, then ends first
+    order = np.lexsort([steps, times, keys])
+    return keys[order], times[order], np.cumsum(steps[order])
+
+
+class VenueLoad:
+    """How busy each venue is across the Games, in time bins of ``width``.
+
+    - ``matrix``: venues x bins, the sessions running at some point of the bin,
+    - ``concurrency``: per bin, the most sessions running at once (all venues),
+    - ``stats``: per venue, sessions, busy and idle hours between its first
+      and last session, longest idle gap and peak concurrency.
+    """
+
+    def __init__(self, venues, codes, starts, ends, origin, width, tz=None):
+        n_venues = len(venues)
+        n_bins = max(int(-((origin - ends.max()) // width)), 1) if len(ends) else 0
+        self.venues = list(venues)
+        self.bins = pd.date_range(
+            pd.Timestamp(origin * 1000, tz="UTC").tz_convert(tz),
+            periods=n_bins,
+            freq=pd.Timedelta(microseconds=width),
+        )
+        if not len(starts):  # no sessions: no bins, and nothing to sweep
+            self.matrix = np.zeros((n_venues, 0), dtype=np.int64)
+            self.concurrency = pd.Series(
+                np.zeros(0, dtype=np.int64), index=self.bins, name="sessions"
+            )
+            self.stats = self._venue_stats(codes, starts, ends, n_venues)
+            return
+
+        # a session runs in bin j when it starts before the bin ends and ends
+        # after it starts: (starts in bins <= j) - (ends at or before bin j)
+        first_bin = (starts - origin) // width
+        last_edge = -((origin - ends) // width)  # ceil: ended by that edge
+        size = n_venues * (n_bins + 1)
+        started = np.bincount(codes * (n_bins + 1) + first_bin, minlength=size)
+        ended = np.bincount(codes * (n_bins + 1) + last_edge, minlength=size)
+        started = started.reshape(n_venues, n_bins + 1).cumsum(axis=1)
+        ended = ended.reshape(n_venues, n_bins + 1).cumsum(axis=1)
+        self.matrix = started[:, :n_bins] - ended[:, :n_bins]
+
+        # all venues: the level at each bin's start and the peaks inside it;
+        # only the level after the last point of an instant is ever reached
+        _, times, levels = sweep(np.zeros(len(starts), np.int64), starts, ends)
+        settled = np.append(times[1:] != times[:-1], True)
+        times, levels = times[settled], levels[settled]
+        edges = origin + width * np.arange(n_bins)
+        entering = np.searchsorted(times, edges, side="right") - 1
+        peak = np.where(entering >= 0, levels[np.maximum(entering, 0)], 0)
+        bins = (times - origin) // width
+        inside = bins < n_bins
+        np.maximum.at(peak, bins[inside], levels[inside])
+        self.concurrency = pd.Series(peak, index=self.bins, name="sessions")
+
+        self.stats = self._venue_stats(codes, starts, ends, n_venues)
+
+    def _venue_stats(self, codes, starts, ends, n_venues):
+        keys, times, levels = sweep(codes, starts, ends)
+        # the stretch from each point to the next one of the same venue is
+        # busy while a session runs, idle otherwise
+        same = keys[1:] == keys[:-1]
+        gaps = (times[1:] - times[:-1])[same]
+        venue = keys[:-1][same]
+        busy = levels[:-1][same] > 0
+        hour = 3600e6
+        busy_h = np.bincount(venue[busy], weights=gaps[busy], minlength=n_venues)
+        idle_h = np.bincount(venue[~busy], weights=gaps[~busy], minlength=n_venues)
+        longest = np.zeros(n_venues, np.int64)
+        np.maximum.at(longest, venue[~busy], gaps[~busy])
+        peak = np.zeros(n_venues, np.int64)
+        np.maximum.at(peak, keys, levels)
+        return pd.DataFrame(
+            {
+                "sessions": np.bincount(codes, minlength=n_venues),
+                "busy_h": busy_h / hour,
+                "idle_h": idle_h / hour,
+                "longest_idle_h": longest / hour,
+                "peak_concurrency": peak,
+            },
+            index=pd.Index(self.venues, name="venue"),
+        )
+
+    def frame(self):
+        """``matrix`` as a DataFrame: one row per venue, one column per bin."""
+        return pd.DataFrame(self.matrix, index=self.venues, columns=self.bins)
+
+
+class Schedule:
+    """Timed sessions with interval indexes by venue and by discipline."""
+
+    def __init__(self, sessions, start_col="start_date", end_col="end_date"):
+        sessions = sessions.dropna(subset=[start_col])
+        sessions = sessions.sort_values(start_col, kind="stable", ignore_index=True)
+        # sessions without an end are taken to end as they start
+        sessions[end_col] = sessions[end_col].fillna(sessions[start_col])
+        self.sessions = sessions
+        self.start_col = start_col
+        self.end_col = end_col
+        self.tz = sessions[start_col].dt.tz
+
+        starts = _micros(sessions[start_col])
+        # a session lasts at least 1 µs, so it overlaps the window it starts in
+        ends = np.maximum(_micros(sessions[end_col]), starts + 1)
+        self._starts, self._ends = starts, ends
+        rows = np.arange(len(sessions))
+        medal = (
+            sessions["event_medal"].fillna(0).to_numpy() > 0
+            if "event_medal" in sessions.columns
+            else np.zeros(len(sessions), dtype=bool)
+        )
+
+        self._all = Intervals(starts, ends, rows)
+        self._medals = Intervals(starts[medal], ends[medal], rows[medal])
+        self._by = {}
+        self._medals_by = {}
+        for col in ("venue", "discipline"):
+            if col in sessions.columns:
+                keys = sessions[col].to_numpy()
+                self._by[col] = _grouped(keys, starts, ends, rows)
+                self._medals_by[col] = _grouped(
+                    keys[medal], starts[medal], ends[medal], rows[medal]
+                )
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @property
+    def venues(self):
+        return sorted(self._by.get("venue", {}), key=str)
+
+    @property
+    def disciplines(self):
+        return sorted(self._by.get("discipline", {}), key=str)
+
+    def days(self):
+        """The local calendar days with sessions, in order."""
+        days = self.sessions[self.start_col].dt.normalize().unique()
+        return [day.date() for day in days]
+
+    def timestamp(self, t):
+        """``t`` in microseconds; naive times are local to the schedule."""
+        t = pd.Timestamp(t)
+        if t.tzinfo is None and self.tz is not None:
+            t = t.tz_localize(self.tz)
+        return t.value // 1000
+
+    def _lookup(self, by, whole, venues, disciplines):
+        """The indexes covering a selection, plus the discipline filter left."""
+        if venues is not None:
+            index = by.get("venue", {})
+            return [index[v] for v in venues if v in index], disciplines
+        if disciplines is not None:
+            index = by.get("discipline", {})
+            return [index[d] for d in disciplines if d in index], None
+        return [whole], None
+
+    def _frame(self, rows, disciplines):
+        frame = self.sessions.take(np.sort(np.concatenate([_NO_ROWS, *rows])))
+        if disciplines is not None:
+            frame = frame[frame["discipline"].isin(disciplines)]
+        return frame
+
+    def venue_load(self, disciplines=None, freq="1h"):
+        """``VenueLoad`` of the sessions (of ``disciplines``) in bins of ``freq``."""
+        keep = np.ones(len(self.sessions), dtype=bool)
+        if disciplines is not None:
+            keep = self.sessions["discipline"].isin(disciplines).to_numpy()
+        if "venue" in self.sessions.columns:
+            keep = keep & self.sessions["venue"].notna().to_numpy()
+        codes, venues = pd.factorize(self.sessions["venue"][keep], sort=True)
+        starts, ends = self._starts[keep], self._ends[keep]
+        width = pd.Timedelta(freq).value // 1000
+        # bins start on a local boundary (midnight, the hour, ...)
+        first = pd.Timestamp(int(starts.min()) * 1000 if len(starts) else 0, tz="UTC")
+        origin = first.tz_convert(self.tz).floor(freq).value // 1000
+        return VenueLoad(venues, codes, starts, ends, origin, width, self.tz)
+
+    def between(self, t0, t1, venues=None, disciplines=None):
+        """Sessions overlapping [t0, t1), in start order.
+
+        ``venues`` / ``disciplines`` are lists of names (None: every one).
+        """
+        a, b = self.timestamp(t0), self.timestamp(t1)
+        indexes, rest = self._lookup(self._by, self._all, venues, disciplines)
+        return self._frame([index.overlapping(a, b) for index in indexes], rest)
+
+    def next_medal_sessions(self, t, n=10, venues=None, disciplines=None):
+        """The first ``n`` medal sessions starting at or after ``t``."""
+        a = self.timestamp(t)
+        indexes, rest = self._lookup(self._medals_by, self._medals, venues, disciplines)
+        # with venues and disciplines both given, the venue's next sessions
+        # may be of other disciplines: then take all of its later ones
+        n_each = n if rest is None else len(self._medals)
+        rows = [index.starting_from(a, n_each) for index in indexes]
+        return self._frame(rows, rest).head(n)
+
+
+def load_schedule():
+    """The process-wide Schedule over schedules.csv."""
+    return _shared("schedule", lambda: Schedule(load_table("schedules")))
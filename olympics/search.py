@@ -0,0 +1,80 @@
+"""
+Prefix index for the athlete name search.
+
+Every name is normalised (see ``normalize_name``) and split into tokens; the
+(token, row) pairs are sorted once, so the rows whose name has a token
+starting with a typed term form one contiguous slice found by binary search.
+A query matches a row when each of its terms prefixes one of the row's
+tokens, in any order — "leon mar" and "MARCHAND Leon" both find
+"MARCHAND Leon". Only the best ``k`` rows are returned, so the widget never
+has to carry the full name list.
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from olympics.athletes import normalize_name
+
+# normalised tokens only contain [a-z0-9], which all sort before this
+_TOKEN_END = "\x7f"
+
+
+class NameSearch:
+    """Token-prefix search over a column of names (results are row positions)."""
+
+    def __init__(self, names, popularity=None):
+        self.names = np.asarray(names, dtype=object)
+        self.n_rows = len(self.names)
+        if popularity is None:
+            popularity = np.zeros(self.n_rows)
+        popularity = np.nan_to_num(np.asarray(popularity, dtype=float))
+
+        # tie-break rank: most popular first, then alphabetical
+        labels = pd.Series(self.names).fillna("").astype(str).to_numpy()
+        order = np.lexsort((labels, -popularity))
+        self._rank = np.empty(self.n_rows, dtype=np.int64)
+        self._rank[order] = np.arange(self.n_rows)
+
+        pairs = [
+            (token, row)
+            for row, name in enumerate(self.names)
+            if pd.notna(name)
+            for token in set(normalize_name(name).split())
+        ]
+        pairs.sort()
+        self._tokens = [token for token, _ in pairs]
+        self._rows = np.fromiter((row for _, row in pairs), dtype=np.int64)
+
+    def _prefix(self, term):
+        """Rows with a token starting with ``term``, and those equal to it."""
+        lo = bisect_left(self._tokens, term)
+        hi = bisect_left(self._tokens, term + _TOKEN_END, lo)
+        exact = bisect_right(self._tokens, term, lo, hi)
+        return self._rows[lo:hi], self._rows[lo:exact]
+
+    def search(self, query, k=10, rows=None):
+        """Positions of the best ``k`` names matching ``query``.
+
+        ``rows`` restricts the search to those positions (e.g. the rows
+        left by the sidebar filters); None searches every row. Whole-word
+        matches rank first, then more popular, then alphabetical names. An
+        empty query returns the ``k`` most popular rows.
+        """
+        terms = normalize_name(query).split()
+        candidates = np.arange(self.n_rows) if rows is None else np.asarray(rows)
+        whole_words = np.zeros(len(candidates), dtype=np.int64)
+        for term in terms:
+            prefixed, exact = self._prefix(term)
+            keep = np.isin(candidates, prefixed)
+            candidates, whole_words = candidates[keep], whole_words[keep]
+            whole_words += np.isin(candidates, exact)
+            if len(candidates) == 0:
+                break
+
+        score = self._rank[candidates] - whole_words * self.n_rows
+        if len(candidates) > k:
+            top = np.argpartition(score, k - 1)[:k]
+            candidates, score = candidates[top], score[top]
+        return candidates[np.argsort(score, kind="stable")]
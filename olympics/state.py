@@ -0,0 +1,184 @@
+"""
+Cross-page filter state.
+
+A session keeps only a compact filter specification in ``st.session_state``:
+the selected values of each filter in canonical form (see
+``canonical_selection``; None means "not filtered"). It never holds
+DataFrames. Pages resolve the spec against the shared, process-wide frames
+and their filter indexes on each run, which is a few bitmap operations, so
+the memory an extra session adds does not grow with the size of the data.
+
+Every page reads and writes the same spec, in one vocabulary:
+
+- ``countries``: NOC codes
+- ``continents``: continent names (see ``olympics.data.CONTINENT_NOCS``)
+- ``sports``: discipline names
+- ``medal_types``: "Gold", "Silver", "Bronze"
+- ``genders``: "Male", "Female"
+
+so a selection made on one page is the default of the same filter on every
+other page. Each entry is a selection as in ``olympics.filters``: None
+(everything), a list of values, or "all except" a short list. The spec
+round-trips through the URL query parameters (one repeated parameter per
+filtered dimension), and ``filter_key`` hashes it into a stable key for the
+caches of the aggregates it selects.
+"""
+
+import hashlib
+import json
+
+import streamlit as st
+
+from olympics.filters import (
+    all_except,
+    canonical_selection,
+    canonical_value,
+    excluded,
+    selected_values,
+)
+
+FILTER_SPEC_KEY = "filter_spec"
+
+# the filter dimensions, in the order they appear in the URL
+FILTERS = ("countries", "continents", "sports", "medal_types", "genders")
+
+
+def spec_from_query(query_params):
+    """The filter spec encoded in ``query_params`` (see ``spec_to_query``)."""
+    spec = {}
+    for name in FILTERS:
+        values = query_params.get_all(name)
+        dropped = query_params.get_all(f"{name}_except")
+        if values:
+            spec[name] = sorted(value for value in values if value)
+        elif dropped:
+            spec[name] = all_except(dropped)
+    return spec
+
+
+def spec_to_query(spec):
+    """Query parameters for ``spec``.
+
+    A list becomes one repeated parameter (a single ``""`` when empty) and
+    "all except" a ``<name>_except`` one; unfiltered dimensions are left out.
+    """
+    params = {}
+    for name in FILTERS:
+        selected = spec.get(name)
+        if selected is None:
+            continue
+        dropped = excluded(selected)
+        if dropped is not None:
+            params[f"{name}_except"] = list(dropped)
+        else:
+            params[name] = list(selected) or [""]
+    return params
+
+
+def get_filter_spec(session_state, query_params=None):
+    """The session's filter spec (a copy).
+
+    A session that has not stored one yet starts from the spec in
+    ``query_params``, if given, so a shared URL restores its filters.
+    """
+    if FILTER_SPEC_KEY not in session_state and query_params is not None:
+        session_state[FILTER_SPEC_KEY] = spec_from_query(query_params)
+    return dict(session_state.get(FILTER_SPEC_KEY) or {})
+
+
+def update_filter_spec(session_state, **selections):
+    """Merge ``selections`` into the session's filter spec and return it."""
+    spec = get_filter_spec(session_state)
+    spec.update(selections)
+    session_state[FILTER_SPEC_KEY] = spec
+    return spec
+
+
+def sync_query_params(query_params, spec):
+    """Write ``spec`` to the URL unless it is already there."""
+    params = spec_to_query(spec)
+    current = {name: query_params.get_all(name) for name in query_params}
+    if current != params:
+        query_params.from_dict(params)
+
+
+def filter_key(spec, names=FILTERS):
+    """Stable hash of the ``names`` filters of ``spec``, usable as a cache key.
+
+    Every page hashes the shared spec the same way, so passing the key to
+    ``cached_figure`` serves a selection made on one page from the figures
+    another page already rendered for it.
+    """
+    payload = json.dumps(
+        {name: canonical_value(spec.get(name)) for name in names},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def filter_multiselect(
+    label, name, options, empty_means_all=True, container=None, **kwargs
+):
+    """Sidebar filter for dimension ``name``, shared by every page.
+
+    An "All" checkbox selects every option without listing them; while it is
+    ticked the multiselect picks the values to leave out, so the common
+    states — everything, or all but a few — keep the widget values short.
+    Unticked, the multiselect picks the values to keep. Defaults come from
+    the session's spec, and the spec only changes when the user changes a
+    widget, so values this page does not offer are kept for the pages that
+    do. Returns the selection (see ``olympics.filters``): None, a list of
+    options, or "all except".
+    """
+    container = container or st
+    spec = get_filter_spec(st.session_state, st.query_params)
+    current = spec.get(name)
+    # a keyed widget keeps its value when its options change (e.g. countries
+    # narrowed by continent); a new option set starts again from the spec
+    options_key = hashlib.blake2b(
+        json.dumps(list(options), default=str).encode(), digest_size=4
+    ).hexdigest()
+
+    all_default = current is None or excluded(current) is not None
+    select_all = container.checkbox(
+        "All", value=all_default, key=f"filter_{name}_all_{options_key}"
+    )
+    if select_all:
+        dropped = excluded(current) or []
+        default = [value for value in options if value in set(dropped)]
+        picked = container.multiselect(
+            label,
+            options=options,
+            default=default,
+            key=f"filter_{name}_except_{options_key}",
+            placeholder="All selected · pick values to leave out",
+            **kwargs,
+        )
+        if picked and len(picked) == len(options):
+            selected = []  # every option left out: nothing is selected
+        else:
+            selected = all_except(picked)
+    else:
+        default = [] if all_default else selected_values(current, options)
+        picked = container.multiselect(
+            label,
+            options=options,
+            default=default,
+            key=f"filter_{name}_{options_key}",
+            **kwargs,
+        )
+        if not picked and empty_means_all:
+            selected = None
+        else:
+            selected = canonical_selection(picked, options)
+
+    if select_all != all_default or picked != default:
+        update_filter_spec(st.session_state, **{name: selected})
+        return selected
+    # unchanged: the spec's selection, restricted to this page's options
+    if current is None or excluded(current) is not None:
+        return current
+    if not current and empty_means_all:
+        return None
+    return canonical_selection(default, options)
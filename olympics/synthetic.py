@@ -0,0 +1,840 @@
+"""
+Synthetic Olympics datasets at any scale, for load testing.
+
+``generate(target, scale)`` writes a stand-in for every table in data/ —
+athletes, coaches, technical officials, NOCs, events, venues, schedules,
+teams, medallists, medals, medal totals, the torch route and the
+per-discipline results — with the column names and types of the real
+Parquet copies. ``scale`` multiplies the Paris 2024 row counts (100 gives
+about a million athletes and several million result rows), so it can stand
+in for a future Games or for several Games at once.
+
+Tables are written straight to the layout the loader reads
+(``<target>/.parquet/<table>.parquet`` and the partitioned results
+dataset), so ``OLYMPICS_DATA_DIR=<target>`` runs the dashboard on them
+without any CSV. Every column is built with numpy over integer ids and
+Arrow string kernels, with no per-row Python, and the tables agree with each
+other: medallists are athletes of the medal's discipline and gender, team
+members share their team's country, venues list the disciplines scheduled
+there, and so on.
+
+    python -m olympics.synthetic 100 /tmp/olympics-x100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from olympics.data import CONTINENT_NOCS
+from olympics.results import RESULTS_SCHEMA, with_parsed_values, write_results
+
+# Paris 2024 disciplines: name, results code, events, result type and the
+# size of its teams (0: individual events only)
+DISCIPLINES = [
+    ("3x3 Basketball", "BK3", 2, "POINTS", 4),
+    ("Archery", "ARC", 5, "SETS", 3),
+    ("Artistic Gymnastics", "GAR", 14, "POINTS", 5),
+    ("Artistic Swimming", "SWA", 2, "POINTS", 8),
+    ("Athletics", "ATH", 48, "TIME", 4),
+    ("Badminton", "BDM", 5, "POINTS", 2),
+    ("Basketball", "BKB", 2, "POINTS", 12),
+    ("Beach Volleyball", "VBV", 2, "POINTS", 2),
+    ("Boxing", "BOX", 13, "POINTS", 0),
+    ("Breaking", "BKG", 2, "POINTS", 0),
+    ("Canoe Slalom", "CSL", 6, "TIME", 0),
+    ("Canoe Sprint", "CSP", 10, "TIME", 4),
+    ("Cycling BMX Freestyle", "BMF", 2, "POINTS", 0),
+    ("Cycling BMX Racing", "BMX", 2, "TIME", 0),
+    ("Cycling Mountain Bike", "MTB", 2, "TIME", 0),
+    ("Cycling Road", "CRD", 4, "TIME", 0),
+    ("Cycling Track", "CTR", 12, "TIME", 4),
+    ("Diving", "DIV", 8, "POINTS", 2),
+    ("Equestrian", "EQU", 6, "POINTS", 3),
+    ("Fencing", "FEN", 12, "POINTS", 3),
+    ("Football", "FBL", 2, "POINTS", 18),
+    ("Golf", "GLF", 2, "STROKES", 0),
+    ("Handball", "HBL", 2, "POINTS", 14),
+    ("Hockey", "HOC", 2, "POINTS", 16),
+    ("Judo", "JUD", 15, "POINTS", 6),
+    ("Marathon Swimming", "OWS", 2, "TIME", 0),
+    ("Modern Pentathlon", "MPN", 2, "POINTS", 0),
+    ("Rhythmic Gymnastics", "GRY", 2, "POINTS", 5),
+    ("Rowing", "ROW", 14, "TIME", 4),
+    ("Rugby Sevens", "RU7", 2, "POINTS", 12),
+    ("Sailing", "SAL", 10, "POINTS", 2),
+    ("Shooting", "SHO", 15, "POINTS", 2),
+    ("Skateboarding", "SKB", 4, "POINTS", 0),
+    ("Sport Climbing", "CLB", 4, "POINTS", 0),
+    ("Surfing", "SRF", 2, "POINTS", 0),
+    ("Swimming", "SWM", 35, "TIME", 4),
+    ("Table Tennis", "TTE", 5, "POINTS", 3),
+    ("Taekwondo", "TKW", 8, "POINTS", 0),
+    ("Tennis", "TEN", 5, "SCORE", 2),
+    ("Trampoline Gymnastics", "GTR", 2, "POINTS", 0),
+    ("Triathlon", "TRI", 3, "TIME", 4),
+    ("Volleyball", "VVO", 2, "POINTS", 12),
+    ("Water Polo", "WPO", 2, "POINTS", 13),
+    ("Weightlifting", "WLF", 10, "WEIGHT", 0),
+    ("Wrestling", "WRE", 18, "POINTS", 0),
+]
+# typical result per result type (times in seconds)
+RESULT_SCALE = {
+    "TIME": 120.0,
+    "POINTS": 50.0,
+    "SETS": 3.0,
+    "STROKES": 280.0,
+    "WEIGHT": 200.0,
+    "SCORE": 6.0,
+}
+# result types ranked by the lowest value
+LOWER_IS_BETTER = ["TIME", "STROKES"]
+
+# Paris 2024 row counts that ``scale`` multiplies
+BASE_ROWS = {
+    "athletes": 11113,
+    "coaches": 974,
+    "technical_officials": 1021,
+    "schedules": 3895,
+    "venues": 35,
+    "torch_route": 73,
+}
+# result rows per athlete and per team, on average
+RESULTS_PER_ENTRANT = 2.0
+
+GAMES_START = pd.Timestamp("2024-07-26", tz="UTC")
+GAMES_DAYS = 17
+# schedules.csv gives local (Paris) times
+LOCAL_TZ = "+02:00"
+
+GENDERS = np.array(["Male", "Female"])
+GENDER_CODES = np.array(["M", "W"])
+EVENT_GENDERS = np.array(["Men's", "Women's", "Mixed"])
+MEDALS = ["Gold Medal", "Silver Medal", "Bronze Medal"]
+STAGES = ["Heat 1", "Heat 2", "Quarterfinal", "Semifinal", "Final"]
+VENUE_KINDS = ["Arena", "Stadium", "Centre", "Park", "Hall", "Court", "Dome"]
+STAFF_FUNCTIONS = ["Coach", "Head Coach", "Assistant Coach", "Team Leader"]
+OFFICIAL_FUNCTIONS = ["Judge", "Referee", "Umpire", "Timekeeper", "Scorer"]
+SYLLABLES = np.array(
+    ["ba", "ko", "li", "ma", "ne", "ro", "sa", "ti", "vu", "de", "ga", "hi"]
+    + ["jo", "ku", "lo", "mi", "na", "pe", "ri", "su", "ta", "vo", "ze", "yu"]
+)
+
+
+def _rows(name, scale):
+    return max(1, round(BASE_ROWS[name] * scale))
+
+
+def _strings(values):
+    return pa.array(np.asarray(values, dtype=object), pa.string())
+
+
+def _concat(*parts):
+    """Element-wise concatenation of string arrays and literal strings."""
+    parts = [pa.scalar(p) if isinstance(p, str) else p for p in parts]
+    return pc.binary_join_element_wise(*parts, "")
+
+
+def _number(values, width=0):
+    """Integers as strings, zero-padded to ``width``."""
+    text = pc.cast(pa.array(values), pa.string())
+    return pc.utf8_lpad(text, width, "0") if width else text
+
+
+def _slug(text):
+    return pc.replace_substring_regex(pc.utf8_lower(text), r"[^a-z0-9]+", "-")
+
+
+def _list_strings(offsets, values):
+    """Python-style list literals, "['a', 'b']", of ``values`` split at ``offsets``."""
+    lists = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), values)
+    return _concat("['", pc.binary_join(lists, "', '"), "']")
+
+
+def _timestamps(stamps, tz="UTC"):
+    """numpy datetime64 values as an Arrow timestamp column."""
+    micros = np.asarray(stamps, dtype="datetime64[us]").astype(np.int64)
+    return pa.array(micros).cast(pa.timestamp("us", tz=tz))
+
+
+def _dates(days, tz=None, missing=None):
+    """Days after GAMES_START as timestamps (null where ``missing``)."""
+    start = np.datetime64(GAMES_START.tz_localize(None), "us")
+    stamps = start + (np.asarray(days) * 86400e6).astype("timedelta64[us]")
+    column = _timestamps(stamps, tz)
+    if missing is not None:
+        column = pc.if_else(
+            pa.array(missing), pa.nulls(len(column), column.type), column
+        )
+    return column
+
+
+def _pick(rng, keys, wanted):
+    """Random position in sorted ``keys`` equal to each of ``wanted`` (-1: none)."""
+    lo = np.searchsorted(keys, wanted, "left")
+    hi = np.searchsorted(keys, wanted, "right")
+    pos = lo + (rng.random(len(wanted)) * (hi - lo)).astype(np.int64)
+    return np.where(hi > lo, pos, -1)
+
+
+def _offsets(counts):
+    return np.concatenate([[0], np.cumsum(counts)])
+
+
+def _expand(starts, counts):
+    """``starts[i], starts[i] + 1, ...`` for ``counts[i]`` values, for every i."""
+    offsets = _offsets(counts)
+    within = np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts)
+    return np.repeat(starts, counts) + within
+
+
+def _name_pools():
+    """Surname (three syllables, upper case) and given name (two) pools."""
+    s = SYLLABLES
+    surnames = np.char.add(np.char.add(s[:, None, None], s[None, :, None]), s)
+    given = np.char.add(s[:, None], s[None, :])
+    return (
+        _strings(np.char.upper(surnames.ravel())),
+        _strings(np.char.capitalize(given.ravel())),
+    )
+
+
+class _Games:
+    """Shared vocabularies and the entities every table is drawn from."""
+
+    def __init__(self, scale, seed):
+        self.rng = rng = np.random.default_rng(seed)
+        self.scale = scale
+
+        # disciplines
+        self.disc_name = _strings([d[0] for d in DISCIPLINES])
+        self.disc_code = _strings([d[1] for d in DISCIPLINES])
+        self.disc_result_type = _strings([d[3] for d in DISCIPLINES])
+        self.disc_team_size = np.array([d[4] for d in DISCIPLINES])
+        self.disc_slug = _slug(self.disc_name)
+        n_disc = len(DISCIPLINES)
+
+        # NOCs, weighted so a few countries send most athletes
+        codes = sorted(c for nocs in CONTINENT_NOCS.values() for c in nocs)
+        self.noc_code = _strings(codes)
+        self.noc_country = _concat("Republic of ", self.noc_code)
+        weights = 1 / (rng.permutation(len(codes)) + 5.0)
+        self.noc_weights = weights / weights.sum()
+
+        # events: Paris' count per discipline times scale
+        per_disc = np.array([max(1, round(d[2] * scale)) for d in DISCIPLINES])
+        self.event_disc = np.repeat(np.arange(n_disc), per_disc)
+        n_events = len(self.event_disc)
+        self.event_gender = rng.choice(3, n_events, p=[0.45, 0.45, 0.1])
+        self.event_number = _expand(np.zeros(n_disc, np.int64), per_disc) + 1
+        team_size = self.disc_team_size[self.event_disc]
+        # big-team sports only have team events
+        self.event_is_team = (team_size >= 8) | (
+            (team_size > 0) & (rng.random(n_events) < 0.25)
+        )
+        self.event_name = _concat(
+            _strings(EVENT_GENDERS).take(self.event_gender),
+            " Event ",
+            _number(self.event_number),
+        )
+        gender_code = _strings(["M", "W", "X"]).take(self.event_gender)
+        self.event_gender_code = gender_code
+        self.event_code = _concat(
+            self.disc_code.take(self.event_disc),
+            gender_code,
+            _number(self.event_number, 6),
+        )
+        self.event_type = pc.if_else(pa.array(self.event_is_team), "TEAM", "ATH")
+        self.event_final_day = rng.integers(1, GAMES_DAYS, n_events)
+        self.event_url = _concat(
+            "/en/paris-2024/results/",
+            self.disc_slug.take(self.event_disc),
+            "/",
+            _slug(self.event_name),
+            "/fnl-000100--",
+        )
+
+        self._athletes(rng, n_disc)
+        self._teams()
+        self._venues(rng, n_disc)
+
+    def _athletes(self, rng, n_disc):
+        n = _rows("athletes", self.scale)
+        disc = rng.integers(0, n_disc, n)
+        gender = rng.integers(0, 2, n)
+        country = rng.choice(len(self.noc_code), n, p=self.noc_weights)
+        # sorted by (discipline, gender, country): picks by discipline and
+        # gender are range lookups, and teams are runs of consecutive athletes
+        order = np.lexsort((country, gender, disc))
+        self.ath_disc = disc[order]
+        self.ath_gender = gender[order]
+        self.ath_country = country[order]
+        self.ath_key = self.ath_disc * 2 + self.ath_gender
+        self.ath_code = 1_000_000 + rng.permutation(n)
+        surnames, given = _name_pools()
+        surname = surnames.take(rng.integers(0, len(surnames), n))
+        first = given.take(rng.integers(0, len(given), n))
+        self.ath_name = _concat(surname, " ", first)
+        # medals.csv writes names given name first
+        self.ath_display_name = _concat(first, " ", surname)
+        self.ath_birth_days = -(rng.uniform(16, 40, n) * 365.25)
+
+    def _teams(self):
+        """Runs of ``team size`` athletes of one discipline, gender and country."""
+        group = self.ath_key * len(self.noc_code) + self.ath_country
+        starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        sizes = np.diff(np.r_[starts, len(group)])
+        team_size = self.disc_team_size[self.ath_disc[starts]]
+        n_teams = np.where(team_size > 0, sizes // np.maximum(team_size, 1), 0)
+        group_of_team = np.repeat(np.arange(len(starts)), n_teams)
+        number = _expand(np.zeros(len(starts), np.int64), n_teams)
+        size = team_size[group_of_team]
+        self.team_start = starts[group_of_team] + number * size
+        self.team_size = size
+        self.team_number = number + 1
+        self.team_key = self.ath_key[self.team_start]
+        self.team_country = self.ath_country[self.team_start]
+
+    def _venues(self, rng, n_disc):
+        """Venues and the (venue, discipline) pairs they host."""
+        n = _rows("venues", self.scale)
+        venues = np.arange(n)
+        disciplines = np.arange(n_disc)
+        # every venue has a main discipline and every discipline a venue
+        pairs = np.unique(
+            np.concatenate(
+                [
+                    venues * n_disc + venues % n_disc,
+                    (disciplines % n) * n_disc + disciplines,
+                ]
+            )
+        )
+        self.host_venue, self.host_disc = np.divmod(pairs, n_disc)
+        by_disc = np.lexsort((self.host_venue, self.host_disc))
+        self.host_disc_sorted = self.host_disc[by_disc]
+        self.host_venue_by_disc = self.host_venue[by_disc]
+        self.venue_name = _concat(
+            _strings(VENUE_KINDS).take(venues % len(VENUE_KINDS)),
+            " ",
+            _number(venues // len(VENUE_KINDS) + 1),
+        )
+        self.venue_code = _concat("V", _number(venues, 4))
+
+    def venue_of(self, disc):
+        """A random venue hosting each discipline in ``disc``."""
+        pos = _pick(self.rng, self.host_disc_sorted, disc)
+        return self.host_venue_by_disc[pos]
+
+
+def _athletes_table(g):
+    n = len(g.ath_code)
+    rng = g.rng
+    male = g.ath_gender == 0
+    height = np.where(male, rng.normal(181, 9, n), rng.normal(169, 8, n))
+    weight = np.where(male, rng.normal(79, 12, n), rng.normal(63, 9, n))
+    disciplines = _concat("['", g.disc_name, "']")
+    has_coach = rng.random(n) < 0.28
+    coach = g.ath_name.take(rng.integers(0, n, n))
+    return pa.table(
+        {
+            "code": pa.array(g.ath_code, pa.int64()),
+            "current": pa.array(np.ones(n, bool)),
+            "name": g.ath_name,
+            "gender": _strings(GENDERS).take(g.ath_gender),
+            "function": _constant("Athlete", n),
+            "country_code": g.noc_code.take(g.ath_country),
+            "country": g.noc_country.take(g.ath_country),
+            "country_long": g.noc_country.take(g.ath_country),
+            "height": pa.array(height.round().astype(np.int64)),
+            "weight": pa.array(weight.round().astype(np.int64)),
+            "disciplines": disciplines.take(g.ath_disc),
+            "birth_date": _dates(np.floor(g.ath_birth_days)),
+            "coach": pc.if_else(
+                pa.array(has_coach), coach, pa.scalar(None, pa.string())
+            ),
+        }
+    )
+
+
+def _constant(value, n):
+    return pa.array([value]).take(np.zeros(n, np.int64))
+
+
+def _staff_table(g, name, code_base, functions, category, listed):
+    """coaches / technical_officials: people attached to a discipline."""
+    rng = g.rng
+    n = _rows(name, g.scale)
+    surnames, given = _name_pools()
+    disc = rng.integers(0, len(DISCIPLINES), n)
+    country = rng.choice(len(g.noc_code), n, p=g.noc_weights)
+    names = _concat(
+        surnames.take(rng.integers(0, len(surnames), n)),
+        " ",
+        given.take(rng.integers(0, len(given), n)),
+    )
+    born = _dates(-np.floor(rng.uniform(30, 70, n) * 365.25))
+    country_columns = {
+        "country_code": g.noc_code.take(country),
+        "country": g.noc_country.take(country),
+        "country_long": g.noc_country.take(country),
+    }
+    if listed:
+        country_columns = {
+            col.replace("country", "organisation"): values
+            for col, values in country_columns.items()
+        }
+    columns = {
+        "code": pa.array(code_base + rng.permutation(n), pa.int64()),
+        "current": pa.array(np.ones(n, bool)),
+        "name": names,
+        "gender": _strings(GENDERS).take(rng.integers(0, 2, n)),
+        "function": _strings(functions).take(rng.integers(0, len(functions), n)),
+        "category": _constant(category, n),
+        **country_columns,
+    }
+    if listed:
+        # technical_officials.csv lists disciplines and keeps birth dates as
+        # text, mostly missing
+        columns["disciplines"] = _concat("['", g.disc_name, "']").take(disc)
+        known = rng.random(n) < 0.02
+        columns["birth_date"] = pc.if_else(
+            pa.array(known),
+            pc.strftime(born, "%Y-%m-%d"),
+            pa.scalar(None, pa.string()),
+        )
+    else:
+        events = g.event_name.take(_pick(rng, g.event_disc, disc).clip(0))
+        columns["disciplines"] = g.disc_name.take(disc)
+        columns["events"] = pc.if_else(
+            pa.array(rng.random(n) < 0.43), events, pa.scalar(None, pa.string())
+        )
+        missing = rng.random(n) < 0.04
+        columns["birth_date"] = pc.if_else(
+            pa.array(missing), pa.nulls(n, born.type), born
+        )
+    return pa.table(columns)
+
+
+def _nocs_table(g):
+    n = len(g.noc_code)
+    return pa.table(
+        {
+            "code": g.noc_code,
+            "country": g.noc_country,
+            "country_long": g.noc_country,
+            "tag": _slug(g.noc_country),
+            "note": _constant("P", n),
+        }
+    )
+
+
+def _events_table(g):
+    sport_url = _concat("https://olympics.com/en/paris-2024/sports/", g.disc_slug)
+    return pa.table(
+        {
+            "event": g.event_name,
+            "tag": g.disc_slug.take(g.event_disc),
+            "sport": g.disc_name.take(g.event_disc),
+            "sport_code": g.disc_code.take(g.event_disc),
+            "sport_url": sport_url.take(g.event_disc),
+        }
+    )
+
+
+def _venues_table(g):
+    n = len(g.venue_name)
+    rng = g.rng
+    counts = np.bincount(g.host_venue, minlength=n)
+    sports = _list_strings(_offsets(counts), g.disc_name.take(g.host_disc))
+    first = rng.integers(-2, GAMES_DAYS - 1, n)
+    missing = rng.random(n) < 0.03
+    tag = _slug(g.venue_name)
+    return pa.table(
+        {
+            "venue": g.venue_name,
+            "sports": sports,
+            "date_start": _dates(first + 0.375, "UTC", missing),
+            "date_end": _dates(
+                first + rng.integers(1, GAMES_DAYS, n) + 0.83, "UTC", missing
+            ),
+            "tag": tag,
+            "url": _concat("https://olympics.com/en/paris-2024/venues/", tag),
+        }
+    )
+
+
+def _schedules_table(g):
+    rng = g.rng
+    n_events = len(g.event_disc)
+    n = max(n_events, _rows("schedules", g.scale))
+    # every event gets its medal session plus a share of the rest
+    event = np.sort(np.r_[np.arange(n_events), rng.integers(0, n_events, n - n_events)])
+    is_final = np.r_[event[1:] != event[:-1], True]
+    final_day = g.event_final_day[event]
+    day = np.where(is_final, final_day, rng.integers(-2, final_day + 1))
+    # local start between 08:00 and 22:00 on a quarter hour, stored as UTC
+    local_hours = 8 + rng.integers(0, 56, n) / 4
+    duration = rng.integers(2, 13, n) / 4
+    start = day + (local_hours - 2) / 24
+    order = np.lexsort((start, event))
+    event, is_final, start, duration = (
+        event[order],
+        is_final[order],
+        start[order],
+        duration[order],
+    )
+    disc = g.event_disc[event]
+    venue = g.venue_of(disc)
+    local_day = np.floor(start + 2 / 24).astype(np.int64)
+    day_text = pc.strftime(_dates(local_day), "%Y-%m-%d")
+    phase = _strings(["Round 1", "Quarterfinal", "Semifinal", "Final"])
+    phase = phase.take(np.where(is_final, 3, rng.integers(0, 3, n)))
+    url = _concat(
+        "/en/paris-2024/results/",
+        g.disc_slug.take(disc),
+        "/",
+        _slug(g.event_name.take(event)),
+        "/",
+        _number(np.arange(n), 6),
+    )
+    return pa.table(
+        {
+            "start_date": _dates(start, LOCAL_TZ),
+            "end_date": _dates(start + duration / 24, LOCAL_TZ),
+            "day": day_text,
+            "status": _constant("FINISHED", n),
+            "discipline": g.disc_name.take(disc),
+            "discipline_code": g.disc_code.take(disc),
+            "event": g.event_name.take(event),
+            "event_medal": pa.array(is_final.astype(np.int64)),
+            "phase": _concat(g.event_name.take(event), " ", phase),
+            "gender": g.event_gender_code.take(event),
+            "event_type": g.event_type.take(event),
+            "venue": g.venue_name.take(venue),
+            "venue_code": g.venue_code.take(venue),
+            "location_description": _concat(g.venue_name.take(venue), ", Paris"),
+            "location_code": g.venue_code.take(venue),
+            "url": url,
+        }
+    )
+
+
+def _team_codes(g):
+    disc = g.ath_disc[g.team_start]
+    return _concat(
+        g.disc_code.take(disc),
+        _strings(GENDER_CODES).take(g.ath_gender[g.team_start]),
+        "TEAM",
+        _number(g.team_size),
+        "---",
+        g.noc_code.take(g.team_country),
+        _number(g.team_number, 2),
+    )
+
+
+def _teams_table(g):
+    n = len(g.team_start)
+    rng = g.rng
+    members = _expand(g.team_start, g.team_size)
+    offsets = _offsets(g.team_size)
+    disc = g.ath_disc[g.team_start]
+    team_events = np.flatnonzero(g.event_is_team)
+    event = team_events[_pick(rng, g.event_disc[team_events], disc)]
+    country = g.noc_country.take(g.team_country)
+    return pa.table(
+        {
+            "code": _team_codes(g),
+            "current": pa.array(np.ones(n, bool)),
+            "team": country,
+            "team_gender": _strings(GENDER_CODES).take(g.ath_gender[g.team_start]),
+            "country_code": g.noc_code.take(g.team_country),
+            "country": country,
+            "country_long": country,
+            "discipline": g.disc_name.take(disc),
+            "disciplines_code": g.disc_code.take(disc),
+            "events": g.event_name.take(event),
+            "athletes": _list_strings(offsets, g.ath_name.take(members)),
+            "coaches": pa.nulls(n, pa.string()),
+            "athletes_codes": _list_strings(offsets, _number(g.ath_code[members])),
+            "num_athletes": pa.array(g.team_size.astype(float)),
+            "coaches_codes": pa.nulls(n, pa.string()),
+            "num_coaches": pa.nulls(n, pa.float64()),
+        }
+    )
+
+
+def _medal_winners(g):
+    """Gold, silver and bronze winners of every event.
+
+    Returns the event and medal (0-2) of each medal, and the winning team
+    (-1 for individual medals) or athlete.
+    """
+    rng = g.rng
+    event = np.repeat(np.arange(len(g.event_disc)), 3)
+    medal = np.tile(np.arange(3), len(g.event_disc))
+    disc = g.event_disc[event]
+    gender = g.event_gender[event]
+    # mixed events draw either gender
+    gender = np.where(gender == 2, rng.integers(0, 2, len(event)), gender)
+    key = disc * 2 + gender
+    team = np.where(g.event_is_team[event], _pick(rng, g.team_key, key), -1)
+    athlete = _pick(rng, g.ath_key, key)
+    # at small scales a discipline may lack athletes of a gender
+    won = (team >= 0) | (athlete >= 0)
+    return event[won], medal[won], team[won], athlete[won]
+
+
+def _medals_tables(g):
+    """medals, medallists and medals_total."""
+    event, medal, team, athlete = _medal_winners(g)
+    is_team = team >= 0
+    lead = np.where(is_team, g.team_start[team], athlete)
+    country = g.ath_country[lead]
+    medal_type = _strings(MEDALS).take(medal)
+    medal_date = _dates(g.event_final_day[event])
+    team_codes = _team_codes(g)
+    team_index = pa.array(np.where(is_team, team, 0))
+    n = len(event)
+    medals = pa.table(
+        {
+            "medal_type": medal_type,
+            "medal_code": pa.array(medal + 1.0),
+            "medal_date": medal_date,
+            "name": pc.if_else(
+                pa.array(is_team),
+                g.noc_country.take(country),
+                g.ath_display_name.take(lead),
+            ),
+            "gender": g.event_gender_code.take(event),
+            "discipline": g.disc_name.take(g.event_disc[event]),
+            "event": g.event_name.take(event),
+            "event_type": g.event_type.take(event),
+            "url_event": g.event_url.take(event),
+            "code": pc.if_else(
+                pa.array(is_team),
+                team_codes.take(team_index),
+                _number(g.ath_code[lead]),
+            ),
+            "country_code": g.noc_code.take(country),
+            "country": g.noc_country.take(country),
+            "country_long": g.noc_country.take(country),
+        }
+    )
+
+    # one medallist row per team member
+    counts = np.where(is_team, g.team_size[np.where(is_team, team, 0)], 1)
+    row_medal = np.repeat(np.arange(n), counts)
+    row_athlete = _expand(lead, counts)
+    row_team = pa.array(is_team[row_medal])
+    no_team = pa.scalar(None, pa.string())
+    m_country = g.noc_country.take(country[row_medal])
+    medallists = pa.table(
+        {
+            "medal_date": medal_date.take(row_medal),
+            "medal_type": medal_type.take(row_medal),
+            "medal_code": pa.array(medal[row_medal] + 1.0),
+            "name": g.ath_name.take(row_athlete),
+            "gender": _strings(GENDERS).take(g.ath_gender[row_athlete]),
+            "country_code": g.noc_code.take(country[row_medal]),
+            "country": m_country,
+            "country_long": m_country,
+            "nationality_code": g.noc_code.take(country[row_medal]),
+            "nationality": m_country,
+            "nationality_long": m_country,
+            "team": pc.if_else(row_team, m_country, no_team),
+            "team_gender": pc.if_else(
+                row_team, g.event_gender_code.take(event[row_medal]), no_team
+            ),
+            "discipline": g.disc_name.take(g.event_disc[event[row_medal]]),
+            "event": g.event_name.take(event[row_medal]),
+            "event_type": g.event_type.take(event[row_medal]),
+            "url_event": g.event_url.take(event[row_medal]),
+            "birth_date": _dates(np.floor(g.ath_birth_days[row_athlete])),
+            "code_athlete": pa.array(g.ath_code[row_athlete], pa.int64()),
+            "code_team": pc.if_else(
+                row_team, team_codes.take(team_index.take(row_medal)), no_team
+            ),
+            "is_medallist": pa.array(np.ones(len(row_medal), bool)),
+        }
+    )
+
+    n_nocs = len(g.noc_code)
+    counts = np.bincount(medal * n_nocs + country, minlength=3 * n_nocs)
+    counts = counts.reshape(3, n_nocs)
+    won = np.flatnonzero(counts.sum(axis=0))
+    # ranked by golds, then silvers, then bronzes
+    won = won[np.lexsort((-counts[2, won], -counts[1, won], -counts[0, won]))]
+    medals_total = pa.table(
+        {
+            "country_code": g.noc_code.take(won),
+            "country": g.noc_country.take(won),
+            "country_long": g.noc_country.take(won),
+            **{name: pa.array(counts[i, won]) for i, name in enumerate(MEDALS)},
+            "Total": pa.array(counts[:, won].sum(axis=0)),
+        }
+    )
+    return medals, medallists, medals_total
+
+
+def _torch_route_table(g):
+    n = _rows("torch_route", g.scale)
+    relay_start = (pd.Timestamp("2024-04-16", tz="UTC") - GAMES_START).days
+    day = relay_start + np.arange(n) * (-relay_start / n)
+    title = _concat("Stage ", _number(np.arange(1, n + 1)))
+    tag = _slug(title)
+    return pa.table(
+        {
+            "title": title,
+            "city": _concat("City ", _number(np.arange(1, n + 1))),
+            "date_start": _dates(day, "UTC"),
+            "date_end": _dates(day + 0.5, "UTC"),
+            "tag": tag,
+            "url": _concat(
+                "https://olympics.com/en/paris-2024/olympic-torch-relay/stages/", tag
+            ),
+            "stage_number": pa.array(np.arange(1, n + 1, dtype=float)),
+        }
+    )
+
+
+def _results_table(g):
+    """Result rows of athletes and teams, on RESULTS_SCHEMA plus parsed values."""
+    rng = g.rng
+    n_ath, n_teams = len(g.ath_code), len(g.team_start)
+    entrants = np.r_[
+        np.arange(n_ath), n_ath + np.arange(n_teams)
+    ]  # teams after athletes
+    entries = rng.poisson(RESULTS_PER_ENTRANT - 1, len(entrants)) + 1
+    entrant = np.repeat(entrants, entries)
+    is_team = entrant >= n_ath
+    team = np.where(is_team, entrant - n_ath, 0)
+    lead = np.where(is_team, g.team_start[team], entrant)
+    disc = g.ath_disc[lead]
+    n = len(entrant)
+
+    # an event of the entrant's discipline, of their gender where there is one
+    event_key = g.event_disc * 3 + g.event_gender
+    by_key = np.argsort(event_key, kind="stable")
+    pos = _pick(rng, event_key[by_key], disc * 3 + g.ath_gender[lead])
+    event = np.where(
+        pos >= 0, by_key[pos.clip(0)], _pick(rng, g.event_disc, disc).clip(0)
+    )
+    stage = rng.integers(0, len(STAGES), n)
+
+    result_type = g.disc_result_type.take(disc)
+    typical = pc.index_in(result_type, pa.array(list(RESULT_SCALE)))
+    typical = np.array(list(RESULT_SCALE.values()))[np.asarray(typical)]
+    value = (typical * rng.lognormal(0, 0.1, n)).round(2)
+    lower_better = np.asarray(pc.is_in(result_type, pa.array(LOWER_IS_BETTER)))
+    # rank within (event, stage): best value first
+    heat = event * len(STAGES) + stage
+    order = np.lexsort((np.where(lower_better, value, -value), heat))
+    first = np.r_[True, heat[order][1:] != heat[order][:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    rank = np.empty(n)
+    rank[order] = np.arange(n) - group_start + 1
+    irm = rng.random(n) < 0.01
+
+    team_codes = _team_codes(g)
+    code = pc.if_else(
+        pa.array(is_team),
+        team_codes.take(pa.array(team)) if n_teams else _number(g.ath_code[lead]),
+        _number(g.ath_code[lead]),
+    )
+    country = g.ath_country[lead]
+    event_name = g.event_name.take(event)
+    stage_name = _strings(STAGES).take(stage)
+    day = g.event_final_day[event] - (len(STAGES) - 1 - stage) * 0.5
+    none = pa.scalar(None, pa.string())
+    columns = {
+        "date": _dates(day + rng.uniform(0.3, 0.9, n), "UTC"),
+        "stage_code": _concat(
+            g.event_code.take(event), "-", pc.utf8_upper(_slug(stage_name))
+        ),
+        "event_code": g.event_code.take(event),
+        "event_name": event_name,
+        "event_stage": _concat(event_name, " ", stage_name),
+        "stage": stage_name,
+        "gender": g.event_gender_code.take(event),
+        "discipline_name": g.disc_name.take(disc),
+        "discipline_code": g.disc_code.take(disc),
+        "venue": g.venue_name.take(g.venue_of(disc)),
+        "participant_code": code,
+        "participant_name": pc.if_else(
+            pa.array(is_team), g.noc_country.take(country), g.ath_name.take(lead)
+        ),
+        "participant_type": pc.if_else(pa.array(is_team), "Team", "Person"),
+        "participant_country_code": g.noc_code.take(country),
+        "participant_country": g.noc_country.take(country),
+        "rank": pa.array(rank),
+        "result": pc.cast(pa.array(value), pa.string()),
+        "result_type": result_type,
+        "result_IRM": pc.if_else(pa.array(irm), "DNF", none),
+        "result_WLT": pa.nulls(n, pa.string()),
+        "result_diff": pa.nulls(n, pa.string()),
+        "qualification_mark": pc.if_else(
+            pa.array((rank <= 8) & (stage < len(STAGES) - 1)), "Q", none
+        ),
+        "start_order": _number(rng.integers(1, 11, n)),
+        "bib": _number(rng.integers(1, 1000, n)),
+    }
+    table = pa.table(
+        [columns[field.name].cast(field.type) for field in RESULTS_SCHEMA],
+        schema=RESULTS_SCHEMA,
+    )
+    return with_parsed_values(table)
+
+
+def generate(target, scale=1.0, seed=0):
+    """Write every synthetic table under ``target``; returns their row counts."""
+    parquet_dir = Path(target) / ".parquet"
+    parquet_dir.mkdir(parents=True, exist_ok=True)
+    g = _Games(scale, seed)
+    medals, medallists, medals_total = _medals_tables(g)
+    tables = {
+        "athletes": _athletes_table(g),
+        "coaches": _staff_table(g, "coaches", 2_000_000, STAFF_FUNCTIONS, "C", False),
+        "technical_officials": _staff_table(
+            g, "technical_officials", 3_000_000, OFFICIAL_FUNCTIONS, "J", True
+        ),
+        "nocs": _nocs_table(g),
+        "events": _events_table(g),
+        "venues": _venues_table(g),
+        "schedules": _schedules_table(g),
+        "teams": _teams_table(g),
+        "medals": medals,
+        "medallists": medallists,
+        "medals_total": medals_total,
+        "torch_route": _torch_route_table(g),
+    }
+    for name, table in tables.items():
+        pq.write_table(table, parquet_dir / f"{name}.parquet")
+    results = _results_table(g)
+    write_results(results, parquet_dir)
+    rows = {name: table.num_rows for name, table in tables.items()}
+    rows["results"] = results.num_rows
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("scale", type=float, help="multiple of the Paris 2024 sizes")
+    parser.add_argument("target", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    rows = generate(args.target, args.scale, args.seed)
+    for name, count in rows.items():
+        print(f"{name:20s} {count:12,d}")
+    print(f"written to {args.target} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
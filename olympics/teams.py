@@ -0,0 +1,129 @@
+"""
+Team <-> athlete and team <-> coach graph parsed from teams.csv.
+
+teams.csv lists each team's members as stringified Python lists
+(``athletes_codes``: "['1913366', '1913367']", ``coaches_codes``). The
+lists are parsed once into integer ids — a team is its row in teams.csv,
+athletes and coaches are numbered in code order — and stored as CSR
+adjacency arrays (``indptr`` / ``indices``, as in scipy.sparse):
+team -> athletes, athlete -> teams, team -> coaches and coach -> teams.
+
+A neighbourhood query is then a slice of ``indices``, and the queries over
+many ids at once ("teammates of X": the athletes of X's teams) gather all
+their slices with numpy, with no scan of teams.csv.
+"""
+
+import numpy as np
+import pandas as pd
+
+from olympics.data import _shared, load_table
+
+
+def _parsed(teams, column):
+    """(team row, code) of every code listed in ``column``."""
+    listed = teams[column].astype("str").str.findall(r"'([^']*)'")
+    listed.index = np.arange(len(teams))
+    codes = listed.explode().dropna()
+    return codes.index.to_numpy(), codes.to_numpy(dtype="str")
+
+
+class Adjacency:
+    """CSR adjacency: node i's neighbours are ``indices[indptr[i] : indptr[i + 1]]``."""
+
+    def __init__(self, sources, targets, n_sources):
+        order = np.argsort(sources, kind="stable")
+        self.indices = targets[order].astype(np.int32)
+        counts = np.bincount(sources, minlength=n_sources)
+        self.indptr = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def degree(self):
+        """Number of neighbours of every node."""
+        return np.diff(self.indptr)
+
+    def neighbours(self, nodes):
+        """Neighbours of all ``nodes`` (ids), concatenated in node order."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        offsets = np.cumsum(counts) - counts
+        within = np.arange(counts.sum()) - np.repeat(offsets, counts)
+        return self.indices[np.repeat(starts, counts) + within]
+
+    def transpose(self, n_targets):
+        """The reverse adjacency (targets -> sources)."""
+        sources = np.repeat(np.arange(len(self)), self.degree())
+        return Adjacency(self.indices, sources, n_targets)
+
+
+class TeamGraph:
+    """Teams, athletes and coaches of teams.csv as integer-id adjacency arrays."""
+
+    def __init__(self, teams):
+        self.teams = teams.reset_index(drop=True)
+        n_teams = len(self.teams)
+
+        team_rows, athlete_codes = _parsed(self.teams, "athletes_codes")
+        athlete_ids, athletes = pd.factorize(athlete_codes, sort=True)
+        self.athlete_codes = np.asarray(athletes, dtype=object)
+        self.team_athletes = Adjacency(team_rows, athlete_ids, n_teams)
+        self.athlete_teams = self.team_athletes.transpose(len(self.athlete_codes))
+
+        team_rows, coach_codes = _parsed(self.teams, "coaches_codes")
+        coach_ids, coaches = pd.factorize(coach_codes, sort=True)
+        self.coach_codes = np.asarray(coaches, dtype=object)
+        self.team_coaches = Adjacency(team_rows, coach_ids, n_teams)
+        self.coach_teams = self.team_coaches.transpose(len(self.coach_codes))
+
+    def _ids(self, codes, known):
+        """Integer ids of the ``codes`` found in ``known`` (sorted codes)."""
+        codes = np.atleast_1d(np.asarray(codes, dtype=object)).astype("str")
+        ids = np.searchsorted(known, codes)
+        found = ids < len(known)
+        found[found] = known[ids[found]] == codes[found]
+        return ids[found]
+
+    def athlete_ids(self, codes):
+        return self._ids(codes, self.athlete_codes)
+
+    def coach_ids(self, codes):
+        return self._ids(codes, self.coach_codes)
+
+    def teams_of(self, code):
+        """teams.csv rows of every team the athlete was listed in."""
+        rows = self.athlete_teams.neighbours(self.athlete_ids(code))
+        return self.teams.take(np.sort(rows))
+
+    def teammates(self, code):
+        """Codes of the athletes sharing a team with the athlete (sorted)."""
+        ids = self.athlete_ids(code)
+        mates = np.unique(
+            self.team_athletes.neighbours(self.athlete_teams.neighbours(ids))
+        )
+        return self.athlete_codes[np.setdiff1d(mates, ids)].tolist()
+
+    def athletes_of_coach(self, code):
+        """Codes of the athletes in the teams the coach is listed for (sorted)."""
+        teams = self.coach_teams.neighbours(self.coach_ids(code))
+        athletes = np.unique(self.team_athletes.neighbours(teams))
+        return self.athlete_codes[athletes].tolist()
+
+    def athletes_per_coach(self):
+        """Number of distinct athletes coached, per coach code."""
+        # (coach, athlete) pairs through every team of every coach
+        teams = self.coach_teams.indices
+        coaches = np.repeat(np.arange(len(self.coach_codes)), self.coach_teams.degree())
+        sizes = self.team_athletes.degree()[teams]
+        pairs = np.unique(
+            np.stack([np.repeat(coaches, sizes), self.team_athletes.neighbours(teams)]),
+            axis=1,
+        )
+        counts = np.bincount(pairs[0], minlength=len(self.coach_codes))
+        return pd.Series(counts, index=self.coach_codes, name="athletes")
+
+
+def load_team_graph():
+    """The process-wide TeamGraph over teams.csv."""
+    return _shared("team_graph", lambda: TeamGraph(load_table("teams")))
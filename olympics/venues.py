@@ -0,0 +1,88 @@
+"""
+Venue <-> sport mapping parsed from venues.csv.
+
+venues.csv lists the sports of each venue as a stringified Python list
+("['Cycling Road', 'Athletics']"). The lists are parsed once into an edge
+table — one row per (venue, sport) pair, both as integer codes — and a
+sport -> venues index, so the venues of a sport selection are an index
+lookup on exact names instead of a regex over the strings on every rerun
+(where "Road" would also match "Cycling Road").
+"""
+
+import numpy as np
+import pandas as pd
+
+from olympics.data import _shared, load_table
+from olympics.filters import selected_values
+
+# venues.csv spellings -> the sport names of events.csv (the sidebar's)
+SPORT_ALIASES = {"Trampoline": "Trampoline Gymnastics"}
+
+
+class VenueSports:
+    """Edge table between the venues and the sports they host."""
+
+    def __init__(self, venues, sports_col="sports"):
+        self.venues = venues
+        listed = venues[sports_col].astype("str").str.findall(r"'([^']*)'")
+        # one row per (venue row, sport), in the order the venue lists them
+        pairs = listed.explode().dropna().str.strip().replace(SPORT_ALIASES)
+        venue_rows = venues.index.get_indexer(pairs.index)
+        sport_codes, sports = pd.factorize(pairs.to_numpy(), sort=True)
+        self.sports = list(sports)
+        self.edges = pd.DataFrame(
+            {
+                "venue": venue_rows.astype(np.int32),
+                "sport": sport_codes.astype(np.int32),
+            }
+        )
+
+        # sport code -> venue rows: edges grouped by sport (CSR offsets)
+        order = np.argsort(sport_codes, kind="stable")
+        self._venue_rows = venue_rows[order]
+        self._offsets = np.searchsorted(
+            sport_codes[order], np.arange(len(self.sports) + 1)
+        )
+        self._codes = {sport: i for i, sport in enumerate(self.sports)}
+
+        # each venue's first listed sport, and all of them as display text
+        first = pd.Series(self.sports, dtype="str").take(sport_codes)
+        first.index = venue_rows
+        first = first[~first.index.duplicated()]
+        self.main_sport = first.reindex(range(len(venues))).to_numpy()
+        self.sport_names = (
+            pairs.groupby(venue_rows, sort=False)
+            .agg(", ".join)
+            .reindex(range(len(venues)))
+            .to_numpy()
+        )
+
+    def venue_rows(self, selected):
+        """Row positions of the venues hosting a sport of the selection.
+
+        ``selected`` is None (every venue), a list of sport names or "all
+        except" (see ``olympics.filters``).
+        """
+        if selected is None:
+            return np.arange(len(self.venues))
+        sports = selected_values(selected, self.sports)
+        rows = [
+            self._venue_rows[self._offsets[c] : self._offsets[c + 1]]
+            for c in (self._codes[sport] for sport in sports)
+        ]
+        return np.unique(np.concatenate([np.empty(0, np.intp), *rows]))
+
+    def filter(self, selected):
+        """The venues hosting a sport of the selection."""
+        return self.venues.take(self.venue_rows(selected))
+
+    def frame(self):
+        """The venues with their main sport and sport names attached."""
+        return self.venues.assign(
+            main_sport=self.main_sport, sport_names=self.sport_names
+        )
+
+
+def load_venue_sports():
+    """The process-wide VenueSports over venues.csv."""
+    return _shared("venue_sports", lambda: VenueSports(load_table("venues")))
@@ -1,22 +1,49 @@
+from itertools import cycle
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from pathlib import Path
+
+from olympics.cube import MEDAL_TYPES, load_medal_cube
+from olympics.data import data_version, load_table
+from olympics.figures import cached_figure
+from olympics.filters import FilterIndex, selected_values
+from olympics.profiling import (
+    profiler_panel,
+    span,
+    start_fragment_run,
+    start_run,
+)
+from olympics.refresh import refresh_data
+from olympics.results import discipline_codes, results_cache
+from olympics.schedule import load_schedule
+from olympics.venues import load_venue_sports
+from olympics.state import (
+    filter_key,
+    filter_multiselect,
+    get_filter_spec,
+    sync_query_params,
+)
+
+start_run("Sports Events")
+
+# refresh the data files that changed (results: only their disciplines);
+# ``version`` keys the caches and figures built from the other tables
+with span("load.refresh"):
+    refresh_data()
+    version = data_version("events", "venue_sports", "medal_cube", "schedule")
 
 # ===============================
 # Data loading
 # ===============================
 
 
-@st.cache_data
-@st.cache_data
-def load_data():
-    base_dir = Path(__file__).resolve().parents[1]
-    data_dir = base_dir / "data"
-
-    events = pd.read_csv(data_dir / "events.csv")
-    medallists = pd.read_csv(data_dir / "medallists.csv")
-    venues = pd.read_csv(data_dir / "venues.csv")
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    """Shared, read-only frames (venues joined with coordinates once)."""
+    events = load_table("events")
+    # venues with their parsed sports (main sport, names), row for row
+    venues = load_venue_sports().frame()
 
     # Try to load coordinates; if missing, just continue without them
     # Hard-coded coordinates for main Paris 2024 venues
@@ -69,65 +96,70 @@ def load_data():
     # merge into venues
     venues = venues.merge(coord_df, on="venue", how="left")
 
-    return events, medallists, venues
+    return events, venues
+
 
+with span("load"):
+    events, venues = load_data(version)
 
-events, medallists, venues = load_data()
 
-# Parse venue date ranges
-venues["date_start"] = pd.to_datetime(venues["date_start"], errors="coerce")
-venues["date_end"] = pd.to_datetime(venues["date_end"], errors="coerce")
+@st.cache_resource(max_entries=1)
+def load_filter_indexes(version):
+    """Bitmap index over the events' sport column."""
+    return FilterIndex(events, ["sport"])
+
+
+with span("load.indexes"):
+    events_index = load_filter_indexes(version)
+    # medal counts by NOC code x discipline x medal type (shared by all pages)
+    medal_cube = load_medal_cube()
+    # timed sessions of schedules.csv, indexed by venue and discipline
+    schedule = load_schedule()
+    # venue <-> sport edges of venues.csv, indexed by sport
+    venue_sports = load_venue_sports()
+    # one colour per sport, the same in the session Gantt and the venue map
+    sport_colors = dict(zip(venue_sports.sports, cycle(px.colors.qualitative.Alphabet)))
 
 # ===============================
-# Sidebar – Global Filters
+# Sidebar – Global Filters (shared with the other pages)
 # ===============================
 
 with st.sidebar:
     st.markdown("## 🌍 Global Filters")
 
     # Sport options from events
-    sport_options = sorted(events["sport"].dropna().unique())
-    selected_sports = st.multiselect(
-        "🏅 Sport",
-        options=sport_options,
-        default=sport_options,
-    )
+    sport_options = events_index.options["sport"]
+    selected_sports = filter_multiselect("🏅 Sport", "sports", sport_options)
 
-    # Medal type options from medallists
-    medal_type_options = sorted(medallists["medal_type"].dropna().unique())
-    selected_medal_types = st.multiselect(
-        "🥇 Medal type",
-        options=medal_type_options,
-        default=medal_type_options,
+    # Medal type options from the medal cube
+    medal_type_options = [m for m in MEDAL_TYPES if m in medal_cube.medal_types]
+    selected_medal_types = filter_multiselect(
+        "🥇 Medal type", "medal_types", medal_type_options
     )
 
-# Filter events by sport
-filtered_events = events.copy()
-if selected_sports:
-    filtered_events = filtered_events[filtered_events["sport"].isin(selected_sports)]
+filter_spec = get_filter_spec(st.session_state)
+sync_query_params(st.query_params, filter_spec)
 
-# Filter medals by sport (discipline) and medal type
-filtered_medals = medallists.copy()
-if "is_medallist" in filtered_medals.columns:
-    filtered_medals = filtered_medals[filtered_medals["is_medallist"] == True]
+# Filter events by sport; each selection is None ("All", the filter is
+# skipped), a list or "all except" (see olympics.filters)
+with span("filter.events"):
+    filtered_events = events_index.filter({"sport": selected_sports})
 
-if selected_sports:
-    filtered_medals = filtered_medals[
-        filtered_medals["discipline"].isin(selected_sports)
-    ]
+# Medals per sport (discipline) for the sport and medal-type selection
+with span("aggregate.sport_totals"):
+    medals_by_sport = medal_cube.sport_totals(
+        sports=selected_sports, medal_types=selected_medal_types
+    )
 
-if selected_medal_types:
-    filtered_medals = filtered_medals[
-        filtered_medals["medal_type"].isin(selected_medal_types)
-    ]
+sport_inputs = {"data": version, "filters": filter_key(filter_spec, ("sports",))}
+medal_inputs = {
+    "data": version,
+    "filters": filter_key(filter_spec, ("sports", "medal_types")),
+}
 
-# Filter venues by sport list string
-filtered_venues = venues.copy()
-if selected_sports:
-    pattern = "|".join(selected_sports)
-    filtered_venues = filtered_venues[
-        filtered_venues["sports"].str.contains(pattern, regex=True)
-    ]
+# Venues hosting a selected sport, looked up in the sport -> venues index
+with span("filter.venues"):
+    filtered_venues = venues.take(venue_sports.venue_rows(selected_sports))
 
 # ===============================
 # Page title
@@ -146,36 +178,140 @@ Interactive exploration of Olympic sports, event schedules, medal outcomes, and
 st.markdown("---")
 
 # ===============================
-# Event Schedule (Gantt via venues)
+# Event Schedule (session Gantt)
 # ===============================
 
 st.subheader("Event Schedule by Venue")
 
-if filtered_venues.empty:
-    st.info("No venues match the current filters.")
-else:
-    df_sched = filtered_venues.copy()
 
-    # Color by main sport (first element in sports list)
-    df_sched["main_sport"] = (
-        df_sched["sports"].str.strip("[]").str.split(",").str[0].str.strip(" '\"")
+@st.fragment
+def session_schedule(disciplines, sport_inputs):
+    """Session Gantt for a window of days; moving it reruns only this part."""
+    start_fragment_run("Sports Events")
+    days = schedule.days()
+    first, last = st.select_slider(
+        "Days",
+        options=days,
+        value=(days[0], days[0]),
+        format_func=lambda day: day.strftime("%a %d %b"),
     )
+    # only the window's sessions reach the chart, found in the interval indexes
+    t0 = pd.Timestamp(first)
+    t1 = pd.Timestamp(last) + pd.Timedelta(days=1)
+    with span("filter.schedule"):
+        sessions = schedule.between(t0, t1, disciplines=disciplines)
+
+    if sessions.empty:
+        st.info("No sessions match the current filters on these days.")
+    else:
+
+        def build_schedule():
+            fig = px.timeline(
+                sessions,
+                x_start="start_date",
+                x_end="end_date",
+                y="venue",
+                color="discipline",
+                color_discrete_map=sport_colors,
+                hover_data=["event", "phase", "status"],
+            )
+            fig.update_yaxes(autorange="reversed")
+            fig.update_layout(
+                xaxis_title="Time",
+                yaxis_title="Venue",
+                height=max(400, 26 * sessions["venue"].nunique() + 150),
+            )
+            return fig
+
+        with span("render.schedule"):
+            fig_sched = cached_figure(
+                "events.schedule",
+                build_schedule,
+                **sport_inputs,
+                first=str(first),
+                last=str(last),
+            )
+            st.plotly_chart(fig_sched, use_container_width=True)
+
+    with span("aggregate.next_medals"):
+        upcoming = schedule.next_medal_sessions(t0, n=10, disciplines=disciplines)
+    if not upcoming.empty:
+        st.caption(f"Next medal sessions from {first.strftime('%a %d %b')}")
+        st.dataframe(
+            upcoming[["start_date", "discipline", "event", "phase", "venue"]],
+            hide_index=True,
+            use_container_width=True,
+        )
 
-    fig_sched = px.timeline(
-        df_sched,
-        x_start="date_start",
-        x_end="date_end",
-        y="venue",
-        color="main_sport",
-        hover_data=["sports"],
-    )
-    fig_sched.update_yaxes(autorange="reversed")
-    fig_sched.update_layout(
-        xaxis_title="Date",
-        yaxis_title="Venue",
-        height=500,
-    )
-    st.plotly_chart(fig_sched, use_container_width=True)
+
+# the disciplines of the sport selection, None for every session
+if selected_sports is None:
+    schedule_sports = None
+else:
+    schedule_sports = selected_values(selected_sports, sport_options)
+
+session_schedule(schedule_sports, sport_inputs)
+
+# ===============================
+# Venue Load (sweep line over the sessions)
+# ===============================
+
+st.subheader("Venue Load")
+
+# venues in the heatmap, busiest first
+VENUE_LOAD_ROWS = 40
+
+
+@st.cache_data(max_entries=32)
+def venue_load(disciplines, version):
+    """Hourly sessions per venue, concurrency and per-venue gaps for a selection."""
+    load = schedule.venue_load(disciplines)
+    busiest = load.stats["busy_h"].nlargest(VENUE_LOAD_ROWS).index
+    return load.frame().loc[busiest], load.concurrency, load.stats
+
+
+with span("aggregate.venue_load"):
+    occupancy, concurrency, venue_stats = venue_load(schedule_sports, version)
+
+if occupancy.empty:
+    st.info("No sessions match the current filters.")
+else:
+
+    def build_occupancy():
+        fig = px.imshow(
+            occupancy,
+            aspect="auto",
+            color_continuous_scale="YlOrRd",
+            labels={"x": "Hour", "y": "Venue", "color": "Sessions"},
+        )
+        fig.update_layout(height=max(400, 18 * len(occupancy) + 150))
+        return fig
+
+    def build_concurrency():
+        fig = px.area(
+            concurrency.rename_axis("hour").reset_index(),
+            x="hour",
+            y="sessions",
+            title="Peak sessions running at once (all venues)",
+        )
+        fig.update_layout(height=300, xaxis_title="", yaxis_title="Sessions")
+        return fig
+
+    with span("render.venue_load"):
+        fig_occupancy = cached_figure(
+            "events.venue_load", build_occupancy, **sport_inputs
+        )
+        st.plotly_chart(fig_occupancy, use_container_width=True)
+        fig_concurrency = cached_figure(
+            "events.concurrency", build_concurrency, **sport_inputs
+        )
+        st.plotly_chart(fig_concurrency, use_container_width=True)
+
+    with st.expander("Busy hours, idle gaps and peak concurrency per venue"):
+        st.dataframe(
+            venue_stats.sort_values("busy_h", ascending=False).round(1),
+            use_container_width=True,
+        )
 
 # ===============================
 # Medal Count by Sport (Treemap)
@@ -183,25 +319,30 @@ else:
 
 st.subheader("Medal Count by Sport")
 
-if filtered_medals.empty:
+if medals_by_sport.empty:
     st.info("No medal data available for the current filters.")
 else:
-    medals_by_sport = (
-        filtered_medals.groupby("discipline")["medal_type"]
-        .count()
-        .reset_index()
-        .rename(columns={"discipline": "sport", "medal_type": "total_medals"})
-    )
 
-    fig_treemap = px.treemap(
-        medals_by_sport,
-        path=["sport"],
-        values="total_medals",
-        color="total_medals",
-        color_continuous_scale="Blues",
-    )
-    fig_treemap.update_layout(margin=dict(t=40, l=10, r=10, b=10))
-    st.plotly_chart(fig_treemap, use_container_width=True)
+    def build_medal_treemap():
+        medals_frame = medals_by_sport.rename_axis("sport").reset_index(
+            name="total_medals"
+        )
+
+        fig = px.treemap(
+            medals_frame,
+            path=["sport"],
+            values="total_medals",
+            color="total_medals",
+            color_continuous_scale="Blues",
+        )
+        fig.update_layout(margin=dict(t=40, l=10, r=10, b=10))
+        return fig
+
+    with span("render.medal_treemap"):
+        fig_treemap = cached_figure(
+            "events.medal_treemap", build_medal_treemap, **medal_inputs
+        )
+        st.plotly_chart(fig_treemap, use_container_width=True)
 
 # ===============================
 # Venue Map (Scatter Mapbox)
@@ -222,17 +363,88 @@ if not coord_ok or filtered_venues_map.empty:
         "has latitude/longitude for each venue and the names match venues.csv."
     )
 else:
-    fig_map = px.scatter_mapbox(
-        filtered_venues_map,
-        lat="latitude",
-        lon="longitude",
-        hover_name="venue",
-        hover_data=["sports"],
-        zoom=4,
-        height=600,
+
+    def build_venue_map():
+        fig = px.scatter_mapbox(
+            filtered_venues_map,
+            lat="latitude",
+            lon="longitude",
+            hover_name="venue",
+            hover_data=["sport_names"],
+            color="main_sport",
+            color_discrete_map=sport_colors,
+            zoom=4,
+            height=600,
+        )
+        fig.update_layout(
+            mapbox_style="carto-positron",
+            margin=dict(t=20, l=0, r=0, b=0),
+        )
+        return fig
+
+    with span("render.venue_map"):
+        fig_map = cached_figure("events.venue_map", build_venue_map, **sport_inputs)
+        st.plotly_chart(fig_map, use_container_width=True)
+
+# ===============================
+# Results by Discipline (read on demand)
+# ===============================
+
+st.subheader("Results by Discipline")
+
+
+@st.fragment
+def discipline_results(sports):
+    """Results table; picking a discipline or event reruns only this part."""
+    start_fragment_run("Sports Events")
+    results = results_cache()
+    result_codes = discipline_codes()
+    # only the sports selected in the sidebar are offered, and a discipline's
+    # results are read only once it is picked here
+    result_sports = [s for s in sports if s in result_codes]
+    result_sport = st.selectbox(
+        "Discipline",
+        options=result_sports,
+        index=None,
+        placeholder="Pick a discipline to load its results…",
     )
-    fig_map.update_layout(
-        mapbox_style="carto-positron",
-        margin=dict(t=20, l=0, r=0, b=0),
+
+    if result_sport:
+        with span("load.results"):
+            df_results = results.get(result_codes[result_sport])
+        event_options = sorted(df_results["event_name"].dropna().unique())
+        result_event = st.selectbox("Event", options=event_options)
+        with span("filter.results"):
+            df_event = df_results[df_results["event_name"] == result_event].sort_values(
+                ["date", "rank"]
+            )
+        st.dataframe(
+            df_event[
+                [
+                    "stage",
+                    "rank",
+                    "participant_name",
+                    "participant_country_code",
+                    "result",
+                    "result_value",
+                    "result_unit",
+                    "result_IRM",
+                ]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    cache_stats = results.stats()
+    st.caption(
+        f"Results cache: {len(cache_stats['cached'])} disciplines in memory "
+        f"({cache_stats['bytes_used'] / 2**20:.1f} of "
+        f"{cache_stats['budget_bytes'] / 2**20:.0f} MB) · "
+        f"{cache_stats['hits']} hits · {cache_stats['misses']} misses · "
+        f"{cache_stats['evictions']} evictions"
     )
-    st.plotly_chart(fig_map, use_container_width=True)
+
+
+discipline_results(selected_values(selected_sports, sport_options))
+
+profiler_panel()
@@ -1,187 +1,201 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime
-from pathlib import Path
+
+from olympics.athletes import load_athlete_master
+from olympics.cube import MEDAL_TYPES
+from olympics.data import data_version, load_athletes, load_tables
+from olympics.distributions import group_summaries, summary_figure
+from olympics.figures import cached_figure
+from olympics.filters import FilterIndex, map_selection, selected_values
+from olympics.profiling import (
+    profiler_panel,
+    span,
+    start_fragment_run,
+    start_run,
+)
+from olympics.refresh import refresh_data
+from olympics.search import NameSearch
+from olympics.state import (
+    filter_key,
+    filter_multiselect,
+    get_filter_spec,
+    sync_query_params,
+)
+from olympics.teams import load_team_graph
+
+start_run("Athlete Performance")
+
+# reload the data files that changed; ``version`` keys the caches below
+with span("load.refresh"):
+    refresh_data()
+    version = data_version(
+        "athletes",
+        "athletes+derived",
+        "athlete_master",
+        "coaches",
+        "medals",
+        "medallists",
+        "nocs",
+        "teams",
+    )
 
 # ===============================
 # Data loading
 # ===============================
 
 
-@st.cache_data
-def load_data():
-    base_dir = Path(__file__).resolve().parents[1]
-    data_dir = base_dir / "data"
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    """Shared, read-only frames; athletes already carry age/country/continent."""
+    # nocs: code,country,country_long,tag,note
+    coaches, teams, medals, medallists, nocs = load_tables(
+        "coaches", "teams", "medals", "medallists", "nocs"
+    )
+    # athlete master: one row per athlete code, joined across all tables
+    master = load_athlete_master()
+    try:
+        athletes = load_athletes()
+    except FileNotFoundError:
+        # no athletes.csv: use the athletes known from medals, teams and results
+        athletes = master.frame
+    return athletes, coaches, teams, medals, medallists, nocs, master
+
+
+with span("load"):
+    loaded = load_data(version)
+    athletes_geo, coaches, teams, medals, medallists, nocs, athlete_master = loaded
+
+
+@st.cache_resource(max_entries=1)
+def load_filter_indexes(version):
+    """Bitmap indexes over the athlete filters and the medallist filters."""
+    return (
+        FilterIndex(athletes_geo, ["continent", "country_code", "sport", "gender"]),
+        FilterIndex(
+            medallists,
+            ["is_medallist", "country_code", "discipline", "medal_type", "gender"],
+        ),
+    )
 
-    athletes = pd.read_csv(data_dir / "athletes.csv")
-    coaches = pd.read_csv(data_dir / "coaches.csv")
-    teams = pd.read_csv(data_dir / "teams.csv")
-    medals = pd.read_csv(data_dir / "medals.csv")
-    medallists = pd.read_csv(data_dir / "medallists.csv")
-    nocs = pd.read_csv(data_dir / "nocs.csv")  # code,country,country_long,tag,note
-    return athletes, coaches, teams, medals, medallists, nocs
 
+with span("load.indexes"):
+    athletes_index, medallists_index = load_filter_indexes(version)
+    # team <-> athlete adjacency of teams.csv, for the profile card
+    team_graph = load_team_graph()
 
-athletes, coaches, teams, medals, medallists, nocs = load_data()
 
-# ===============================
-# Derived fields
-# ===============================
+@st.cache_resource(max_entries=1)
+def load_countries(version):
+    """NOC code -> country name and continent, for the country filter."""
+    countries = athletes_geo.dropna(subset=["country_code"])
+    countries = countries.drop_duplicates("country_code").set_index("country_code")
+    return countries["country"], countries["continent"]
 
-# Age from birth_date
-if "birth_date" in athletes.columns:
-    reference_date = pd.Timestamp("2024-07-26")  # Paris 2024 opening day [web:1]
-    athletes["birth_date"] = pd.to_datetime(
-        athletes["birth_date"], format="%Y-%m-%d", errors="coerce"
-    )
-    athletes["age"] = (reference_date - athletes["birth_date"]).dt.days // 365
-else:
-    athletes["age"] = pd.NA
-
-# Build athletes_geo with country + continent using NOCs
-athletes_geo = athletes.copy()
-if not nocs.empty and "country_code" in athletes_geo.columns and "code" in nocs.columns:
-    nocs_tmp = nocs.rename(columns={"code": "country_code"})
-    if "country_long" in nocs_tmp.columns:
-        nocs_tmp = nocs_tmp.rename(columns={"country_long": "country"})
-    else:
-        nocs_tmp = nocs_tmp.rename(columns={"country": "country"})
-
-    # simple continent mapping (extend later if you like)
-    noc_to_continent = {
-        "ALG": "Africa",
-        "EGY": "Africa",
-        "KEN": "Africa",
-        "RSA": "Africa",
-        "NGR": "Africa",
-        "NIG": "Africa",
-        "USA": "Americas",
-        "CAN": "Americas",
-        "MEX": "Americas",
-        "BRA": "Americas",
-        "ARG": "Americas",
-        "CHI": "Americas",
-        "COL": "Americas",
-        "CHN": "Asia",
-        "JPN": "Asia",
-        "KOR": "Asia",
-        "IND": "Asia",
-        "INA": "Asia",
-        "AUS": "Oceania",
-        "NZL": "Oceania",
-        "FRA": "Europe",
-        "GER": "Europe",
-        "GBR": "Europe",
-        "ESP": "Europe",
-        "ITA": "Europe",
-        "NED": "Europe",
-        "SWE": "Europe",
-        "DEN": "Europe",
-        "NOR": "Europe",
-        "SUI": "Europe",
-    }
-    nocs_tmp["continent"] = (
-        nocs_tmp["country_code"].map(noc_to_continent).fillna("Other")
-    )
 
-    athletes_geo = athletes_geo.merge(
-        nocs_tmp[["country_code", "country", "continent"]],
-        on="country_code",
-        how="left",
-    )
+country_names, country_continents = load_countries(version)
 
-if "country" not in athletes_geo.columns:
-    if "country" in athletes.columns:
-        athletes_geo["country"] = athletes["country"]
-    else:
-        athletes_geo["country"] = athletes_geo.get("country_code", "Unknown")
+# athletes offered by the name search at a time
+SEARCH_RESULTS = 20
+# teammates named on the profile card
+TEAMMATES_SHOWN = 12
 
-if "continent" not in athletes_geo.columns:
-    athletes_geo["continent"] = "Other"
-# ensure unique column names on athletes_geo
-athletes_geo = athletes_geo.loc[:, ~athletes_geo.columns.duplicated()]
+
+@st.cache_resource(max_entries=1)
+def load_name_search(version):
+    """Prefix index over athlete names; medal winners rank first."""
+    medals_won = athlete_master.frame.set_index("code")["total_medals"]
+    codes = athletes_geo["code"].astype("str")
+    return NameSearch(athletes_geo["name"], codes.map(medals_won).fillna(0))
+
+
+name_search = load_name_search(version)
 
 # ===============================
-# 🌍 Global Filters (sidebar)
+# 🌍 Global Filters (sidebar, shared with the other pages)
 # ===============================
 
 with st.sidebar:
     st.markdown("## 🌍 Global Filters")
 
     # Continent
-    cont_options = sorted(athletes_geo["continent"].dropna().unique())
-    selected_continents = st.multiselect(
-        "🌐 Continent",
-        options=cont_options,
-        default=cont_options,
-    )
-
-    # Country
-    country_options = sorted(athletes_geo["country"].dropna().unique())
-    selected_countries = st.multiselect(
+    cont_options = athletes_index.options["continent"]
+    selected_continents = filter_multiselect("🌐 Continent", "continents", cont_options)
+
+    # Country (NOC codes, restricted by the selected continents)
+    country_options = athletes_index.options["country_code"]
+    if selected_continents is not None:
+        kept = set(selected_values(selected_continents, cont_options))
+        country_options = [c for c in country_options if country_continents[c] in kept]
+    selected_countries = filter_multiselect(
         "🏳️ Country",
-        options=country_options,
-        default=country_options,
+        "countries",
+        country_options,
+        format_func=lambda code: country_names.get(code, code),
     )
 
-    # Sport
-    sport_options = (
-        sorted(athletes["sport"].dropna().unique())
-        if "sport" in athletes.columns
-        else []
-    )
-    selected_sports = st.multiselect(
-        "🏅 Sport",
-        options=sport_options,
-        default=sport_options,
-    )
-
-    # Medal types (from medallists)
-    medal_type_options = (
-        sorted(medallists["medal_type"].dropna().unique())
-        if "medal_type" in medallists.columns
-        else []
-    )
-    selected_medal_types = st.multiselect(
-        "🥇 Medal Types",
-        options=medal_type_options,
-        default=medal_type_options,
+    # Sport (athletes.csv, else the medallists' disciplines)
+    sport_options = athletes_index.options.get("sport") or medallists_index.options.get(
+        "discipline", []
     )
+    selected_sports = filter_multiselect("🏅 Sport", "sports", sport_options)
 
-# Apply filters to athletes / medallists
-filtered_athletes = athletes_geo.copy()
+    # Gender
+    gender_options = athletes_index.options.get("gender", [])
+    selected_genders = filter_multiselect("👥 Gender", "genders", gender_options)
 
-
-if selected_continents:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes["continent"].isin(selected_continents)
-    ]
-if selected_countries:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes["country"].isin(selected_countries)
-    ]
-if selected_sports and "sport" in filtered_athletes.columns:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes["sport"].isin(selected_sports)
+    # Medal types (from medallists: "Gold Medal", ...)
+    medal_type_options = [
+        m
+        for m in MEDAL_TYPES
+        if f"{m} Medal" in medallists_index.options.get("medal_type", [])
     ]
+    selected_medal_types = filter_multiselect(
+        "🥇 Medal Types", "medal_types", medal_type_options
+    )
 
-filtered_medals = medallists.copy()
-if "is_medallist" in filtered_medals.columns:
-    filtered_medals = filtered_medals[filtered_medals["is_medallist"] == 1]
-if selected_countries and "country" in filtered_medals.columns:
-    filtered_medals = filtered_medals[
-        filtered_medals["country"].isin(selected_countries)
-    ]
-if selected_sports and "discipline" in filtered_medals.columns:
-    filtered_medals = filtered_medals[
-        filtered_medals["discipline"].isin(selected_sports)
-    ]
-if selected_medal_types:
-    filtered_medals = filtered_medals[
-        filtered_medals["medal_type"].isin(selected_medal_types)
-    ]
-filtered_athletes = filtered_athletes.loc[:, ~filtered_athletes.columns.duplicated()]
+filter_spec = get_filter_spec(st.session_state)
+sync_query_params(st.query_params, filter_spec)
+
+# Apply filters to athletes / medallists; each selection is None ("All",
+# the filter is skipped), a list or "all except" (see olympics.filters)
+countries = selected_countries
+if selected_continents is not None:
+    countries = selected_values(selected_countries, country_options)
+athlete_selection = {
+    "continent": selected_continents,
+    "country_code": countries,
+    "gender": selected_genders,
+}
+if "sport" in athletes_index.codes:
+    athlete_selection["sport"] = selected_sports
+with span("filter.athletes"):
+    filtered_athletes = athletes_index.filter(athlete_selection)
+
+medal_selection = {}
+if "is_medallist" in medallists_index.codes:
+    medal_selection["is_medallist"] = [True]
+if "country_code" in medallists_index.codes:
+    medal_selection["country_code"] = countries
+if "discipline" in medallists_index.codes:
+    medal_selection["discipline"] = selected_sports
+if "gender" in medallists_index.codes:
+    medal_selection["gender"] = selected_genders
+medal_selection["medal_type"] = map_selection(
+    selected_medal_types, lambda medal: f"{medal} Medal"
+)
+with span("filter.medallists"):
+    filtered_medals = medallists_index.filter(medal_selection)
+
+athlete_filters = ("continents", "countries", "sports", "genders")
+athlete_inputs = {
+    "data": version,
+    "filters": filter_key(filter_spec, athlete_filters),
+}
+medal_inputs = {
+    "data": version,
+    "filters": filter_key(filter_spec, athlete_filters + ("medal_types",)),
+}
 
 # ===============================
 # Page title
@@ -207,95 +221,133 @@ st.markdown("---")
 
 st.subheader("Athlete Detailed Profile")
 
-athlete_name = st.selectbox(
-    "Select an athlete",
-    options=sorted(filtered_athletes["name"].dropna().unique()),
-    index=None,
-    placeholder="Start typing a name…",
-)
 
-if athlete_name:
-    a = filtered_athletes[filtered_athletes["name"] == athlete_name].iloc[0]
-
-    # Coaches from athletes.coach
-    coach_names = None
-    if (
-        "coach" in filtered_athletes.columns
-        and pd.notna(a.get("coach", None))
-        and str(a["coach"]).strip()
-    ):
-        coach_names = str(a["coach"]).strip()
-    if not coach_names:
-        coach_names = "N/A"
-
-    # Sports & disciplines
-    sports = (
-        ", ".join(sorted({str(a["sport"])}))
-        if "sport" in filtered_athletes.columns
-        else "N/A"
+@st.fragment
+def athlete_profile(selection):
+    """Search box and profile card; typing or picking reruns only this part."""
+    start_fragment_run("Athlete Performance")
+    # only the best matches within the sidebar filters reach the widget
+    athlete_query = st.text_input(
+        "Search athletes",
+        placeholder="Type a name, e.g. Leon Marchand or MARCHAND…",
     )
-    if "disciplines" in filtered_athletes.columns and pd.notna(a["disciplines"]):
-        disciplines = ", ".join(str(a["disciplines"]).split(";"))
-    else:
-        disciplines = "N/A"
-
-    # Country / NOC via nocs
-    noc = a.get("country_code", None)
-    country_display = a.get("country", None)
-    if noc and "code" in nocs.columns:
-        match = nocs[nocs["code"] == noc]
-        if not match.empty:
-            country_display = match["country_long"].iloc[0]
-    country_display = country_display or noc or "N/A"
-    flag = ""
-
-    col_img, col_main = st.columns([1, 2])
-
-    with col_img:
-        img_col = None
-        for c in ["image_url", "photo", "profile_image"]:
-            if c in filtered_athletes.columns:
-                img_col = c
-                break
-
-        if img_col and pd.notna(a[img_col]):
-            st.image(a[img_col], use_column_width=True)
+    with span("filter.search"):
+        athlete_rows = name_search.search(
+            athlete_query, k=SEARCH_RESULTS, rows=athletes_index.rows(selection)
+        )
+    athlete_row = st.selectbox(
+        "Select an athlete",
+        options=athlete_rows.tolist(),
+        format_func=lambda row: (
+            f"{athletes_geo['name'].iat[row]} ({athletes_geo['country_code'].iat[row]})"
+        ),
+        index=None,
+        placeholder=f"{len(athlete_rows)} best matches…",
+    )
+
+    if athlete_row is not None:
+        # hash lookup in the athlete master instead of scanning athletes / nocs
+        with span("aggregate.profile"):
+            a = athlete_master.get(athletes_geo["code"].iat[athlete_row])
+
+        # Coaches from athletes.coach
+        coach_names = None
+        if pd.notna(a.get("coach", None)) and str(a["coach"]).strip():
+            coach_names = str(a["coach"]).strip()
+        if not coach_names:
+            coach_names = "N/A"
+
+        # Sports & disciplines
+        sports = str(a["sport"]) if pd.notna(a.get("sport", None)) else "N/A"
+        if pd.notna(a.get("disciplines", None)):
+            disciplines = ", ".join(str(a["disciplines"]).split("; "))
         else:
+            disciplines = "N/A"
+
+        # team memberships and teammates from the team graph
+        with span("aggregate.teams"):
+            member_of = team_graph.teams_of(a["code"])
+            teammates = team_graph.teammates(a["code"])
+        labels = (
+            member_of["discipline"].astype("str")
+            + " "
+            + member_of["events"].astype("str")
+        )
+        teams_display = "; ".join(labels.unique()) or "N/A"
+        mates = []
+        for code in teammates[:TEAMMATES_SHOWN]:
+            mate = athlete_master.get(code)
+            mates.append(mate["name"] if mate and pd.notna(mate["name"]) else code)
+        if len(teammates) > TEAMMATES_SHOWN:
+            mates.append(f"+{len(teammates) - TEAMMATES_SHOWN} more")
+
+        # Country / NOC (country_long is resolved in the master)
+        noc = a.get("country_code", None)
+        country_display = a.get("country_long", None)
+        if pd.isna(country_display):
+            country_display = a.get("country", None)
+        if pd.isna(country_display):
+            country_display = noc if pd.notna(noc) else "N/A"
+        flag = ""
+
+        col_img, col_main = st.columns([1, 2])
+
+        with col_img:
+            img_col = None
+            for c in ["image_url", "photo", "profile_image"]:
+                if c in a:
+                    img_col = c
+                    break
+
+            if img_col and pd.notna(a[img_col]):
+                st.image(a[img_col], use_column_width=True)
+            else:
+                st.markdown(
+                    """
+                    <div style="
+                        width:100%;
+                        aspect-ratio:3/4;
+                        border-radius:12px;
+                        background:linear-gradient(135deg,#1f77b4,#ff7f0e);
+                        display:flex;
+                        align-items:center;
+                        justify-content:center;
+                        color:white;
+                        font-size:32px;
+                        font-weight:700;
+                    ">
+                        ATH
+                    </div>
+                    """,
+                    unsafe_allow_html=True,
+                )
+
+        with col_main:
+            st.markdown(f"### {a['name']}")
+            st.markdown(f"**Country / NOC:** {country_display} {flag}  (`{noc}`)")
+            if "gender" in a:
+                st.markdown(f"**Gender:** {a['gender']}")
+            height_val = a.get("height", "N/A")
+            weight_val = a.get("weight", "N/A")
             st.markdown(
-                """
-                <div style="
-                    width:100%;
-                    aspect-ratio:3/4;
-                    border-radius:12px;
-                    background:linear-gradient(135deg,#1f77b4,#ff7f0e);
-                    display:flex;
-                    align-items:center;
-                    justify-content:center;
-                    color:white;
-                    font-size:32px;
-                    font-weight:700;
-                ">
-                    ATH
-                </div>
-                """,
-                unsafe_allow_html=True,
+                f"**Height:** {height_val} cm &nbsp;&nbsp; **Weight:** {weight_val} kg"
             )
-
-    with col_main:
-        st.markdown(f"### {a['name']}")
-        st.markdown(f"**Country / NOC:** {country_display} {flag}  (`{noc}`)")
-        if "gender" in a:
-            st.markdown(f"**Gender:** {a['gender']}")
-        height_val = a.get("height", "N/A")
-        weight_val = a.get("weight", "N/A")
-        st.markdown(
-            f"**Height:** {height_val} cm &nbsp;&nbsp; **Weight:** {weight_val} kg"
-        )
-        if "age" in a and pd.notna(a["age"]):
-            st.markdown(f"**Age (at Paris 2024):** {int(a['age'])} years")
-        st.markdown(f"**Coach(s):** {coach_names}")
-        st.markdown(f"**Sport(s):** {sports}")
-        st.markdown(f"**Discipline(s):** {disciplines}")
+            if "age" in a and pd.notna(a["age"]):
+                st.markdown(f"**Age (at Paris 2024):** {int(a['age'])} years")
+            st.markdown(f"**Coach(s):** {coach_names}")
+            st.markdown(f"**Sport(s):** {sports}")
+            st.markdown(f"**Discipline(s):** {disciplines}")
+            st.markdown(f"**Team(s):** {teams_display}")
+            if mates:
+                st.markdown(f"**Teammates:** {', '.join(mates)}")
+            if "total_medals" in a:
+                st.markdown(
+                    f"**Medals:** 🥇 {a['gold']} &nbsp; 🥈 {a['silver']} &nbsp; "
+                    f"🥉 {a['bronze']} &nbsp; ({a['n_results']} results recorded)"
+                )
+
+
+athlete_profile(athlete_selection)
 
 # ===============================
 # Athlete Age Distribution
@@ -303,44 +355,96 @@ if athlete_name:
 
 st.subheader("Athlete Age Distribution")
 
-df_age = filtered_athletes.dropna(subset=["age"]).copy()
+# above this many athletes only the server-side summaries are drawn
+RAW_POINTS_LIMIT = 1000
 
-plot_type = st.radio("Plot type", ["Violin", "Box"], horizontal=True)
-group_by = st.selectbox("Group age by", ["Sport", "Gender", "All athletes"])
 
-if df_age.empty:
-    st.info("No valid age information available to plot age distribution.")
-else:
-    if group_by == "Sport" and "sport" in df_age.columns:
-        x_col = "sport"
-    elif group_by == "Gender" and "gender" in df_age.columns:
-        x_col = "gender"
+@st.cache_data(max_entries=64)
+def age_summaries(selection, x_col, version):
+    """Per-group age statistics for one filter state (see group_summaries)."""
+    df = athletes_index.filter(selection)
+    return group_summaries(df.dropna(subset=["age"]), "age", x_col)
+
+
+@st.fragment
+def age_distribution(filtered_athletes, athlete_selection, athlete_inputs):
+    """Age violin / box chart; its own controls rerun only this fragment."""
+    start_fragment_run("Athlete Performance")
+    df_age = filtered_athletes.dropna(subset=["age"])
+
+    plot_type = st.radio("Plot type", ["Violin", "Box"], horizontal=True)
+    group_by = st.selectbox("Group age by", ["Sport", "Gender", "All athletes"])
+    raw_points = st.toggle(
+        "Show every athlete as a point",
+        value=False,
+        disabled=len(df_age) > RAW_POINTS_LIMIT,
+        help=f"Available for selections of up to {RAW_POINTS_LIMIT:,} athletes; "
+        "larger ones are drawn from precomputed quartiles and density curves.",
+    )
+
+    if df_age.empty:
+        st.info("No valid age information available to plot age distribution.")
     else:
-        x_col = None
-
-    if plot_type == "Violin":
-        if x_col:
-            fig_age = px.violin(
-                df_age,
-                x=x_col,
-                y="age",
-                color=x_col,
-                box=True,
-                points="all",
-                height=500,
-            )
+        if group_by == "Sport" and "sport" in df_age.columns:
+            x_col = "sport"
+        elif group_by == "Gender" and "gender" in df_age.columns:
+            x_col = "gender"
         else:
-            fig_age = px.violin(df_age, y="age", box=True, points="all", height=400)
-    else:
-        if x_col:
-            fig_age = px.box(
-                df_age, x=x_col, y="age", color=x_col, points="all", height=500
+            x_col = None
+        height = 500 if x_col else 400
+
+        summary_mode = not raw_points or len(df_age) > RAW_POINTS_LIMIT
+
+        def build_age_chart():
+            if summary_mode:
+                # quartiles, whiskers, KDE and a capped outlier sample per group
+                with span("aggregate.age_summaries"):
+                    summaries = age_summaries(athlete_selection, x_col, version)
+                fig = summary_figure(summaries, plot_type, height)
+            elif plot_type == "Violin":
+                if x_col:
+                    fig = px.violin(
+                        df_age,
+                        x=x_col,
+                        y="age",
+                        color=x_col,
+                        box=True,
+                        points="all",
+                        height=height,
+                    )
+                else:
+                    fig = px.violin(
+                        df_age, y="age", box=True, points="all", height=height
+                    )
+            else:
+                if x_col:
+                    fig = px.box(
+                        df_age,
+                        x=x_col,
+                        y="age",
+                        color=x_col,
+                        points="all",
+                        height=height,
+                    )
+                else:
+                    fig = px.box(df_age, y="age", points="all", height=height)
+
+            fig.update_layout(xaxis_title="", yaxis_title="Age (years)")
+            return fig
+
+        with span("render.age"):
+            fig_age = cached_figure(
+                "athletes.age",
+                build_age_chart,
+                **athlete_inputs,
+                plot_type=plot_type,
+                x_col=x_col,
+                summary=summary_mode,
             )
-        else:
-            fig_age = px.box(df_age, y="age", points="all", height=400)
+            st.plotly_chart(fig_age, use_container_width=True)
 
-    fig_age.update_layout(xaxis_title="", yaxis_title="Age (years)")
-    st.plotly_chart(fig_age, use_container_width=True)
+
+age_distribution(filtered_athletes, athlete_selection, athlete_inputs)
 
 # ===============================
 # Gender Distribution by Region
@@ -348,52 +452,76 @@ else:
 
 st.subheader("Gender Distribution by Region")
 
-scope = st.radio("Scope", ["Continent", "Country"], horizontal=True)
-
-if scope == "Continent":
-    cont_options = sorted(filtered_athletes["continent"].dropna().unique())
-    selected_cont = (
-        st.selectbox("Select continent", cont_options) if cont_options else None
-    )
-    df_g = (
-        filtered_athletes[filtered_athletes["continent"] == selected_cont]
-        if selected_cont
-        else filtered_athletes
-    )
-else:
-    country_options = sorted(filtered_athletes["country"].dropna().unique())
-    ctry = st.selectbox("Select country", country_options) if country_options else None
-    df_g = (
-        filtered_athletes[filtered_athletes["country"] == ctry]
-        if ctry
-        else filtered_athletes
-    )
-
-if not df_g.empty and "gender" in df_g.columns:
-    gender_counts = df_g["gender"].value_counts().reset_index()
-    gender_counts.columns = ["gender", "count"]
 
-    chart_type = st.radio("Chart type", ["Pie", "Bar"], horizontal=True)
+@st.fragment
+def gender_distribution(filtered_athletes, athlete_inputs):
+    """Gender pie / bar for one continent or country, rerun on its own."""
+    start_fragment_run("Athlete Performance")
+    scope = st.radio("Scope", ["Continent", "Country"], horizontal=True)
 
-    if chart_type == "Pie":
-        fig_gender = px.pie(
-            gender_counts,
-            names="gender",
-            values="count",
-            hole=0.3,
+    if scope == "Continent":
+        cont_options = sorted(filtered_athletes["continent"].dropna().unique())
+        selected_cont = (
+            st.selectbox("Select continent", cont_options) if cont_options else None
+        )
+        df_g = (
+            filtered_athletes[filtered_athletes["continent"] == selected_cont]
+            if selected_cont
+            else filtered_athletes
         )
     else:
-        fig_gender = px.bar(
-            gender_counts,
-            x="gender",
-            y="count",
-            text="count",
+        country_options = sorted(filtered_athletes["country"].dropna().unique())
+        ctry = (
+            st.selectbox("Select country", country_options) if country_options else None
+        )
+        df_g = (
+            filtered_athletes[filtered_athletes["country"] == ctry]
+            if ctry
+            else filtered_athletes
         )
-        fig_gender.update_layout(yaxis_title="Number of athletes")
 
-    st.plotly_chart(fig_gender, use_container_width=True)
-else:
-    st.info("No gender data available for the selected filter.")
+    if not df_g.empty and "gender" in df_g.columns:
+        chart_type = st.radio("Chart type", ["Pie", "Bar"], horizontal=True)
+
+        def build_gender_chart():
+            with span("aggregate.gender_counts"):
+                # a categorical column also counts the genders with no rows
+                gender_counts = df_g["gender"].value_counts()
+                gender_counts = gender_counts[gender_counts > 0].reset_index()
+            gender_counts.columns = ["gender", "count"]
+
+            if chart_type == "Pie":
+                fig = px.pie(
+                    gender_counts,
+                    names="gender",
+                    values="count",
+                    hole=0.3,
+                )
+            else:
+                fig = px.bar(
+                    gender_counts,
+                    x="gender",
+                    y="count",
+                    text="count",
+                )
+                fig.update_layout(yaxis_title="Number of athletes")
+            return fig
+
+        with span("render.gender"):
+            fig_gender = cached_figure(
+                "athletes.gender",
+                build_gender_chart,
+                **athlete_inputs,
+                scope=scope,
+                region=selected_cont if scope == "Continent" else ctry,
+                chart_type=chart_type,
+            )
+            st.plotly_chart(fig_gender, use_container_width=True)
+    else:
+        st.info("No gender data available for the selected filter.")
+
+
+gender_distribution(filtered_athletes, athlete_inputs)
 
 # ===============================
 # Top Athletes by Total Medals
@@ -401,34 +529,44 @@ else:
 
 st.subheader("Top Athletes by Total Medals")
 
-df_medals = filtered_medals.copy()
+df_medals = filtered_medals
 
 if not df_medals.empty:
-    medals_per_athlete = (
-        df_medals.groupby("name")["medal_type"]
-        .count()
-        .reset_index()
-        .rename(columns={"medal_type": "total_medals"})
-    )
 
-    top_medals = medals_per_athlete.sort_values("total_medals", ascending=False).head(
-        10
-    )
+    def build_top_athletes():
+        with span("aggregate.medals_per_athlete"):
+            medals_per_athlete = (
+                df_medals.groupby("name")["medal_type"]
+                .count()
+                .reset_index()
+                .rename(columns={"medal_type": "total_medals"})
+            )
 
-    fig_top = px.bar(
-        top_medals,
-        x="name",
-        y="total_medals",
-        text="total_medals",
-    )
-    fig_top.update_traces(textposition="outside")
-    fig_top.update_layout(
-        xaxis_title="Athlete",
-        yaxis_title="Total medals",
-        xaxis_tickangle=-40,
-        showlegend=False,
-    )
+        top_medals = medals_per_athlete.sort_values(
+            "total_medals", ascending=False
+        ).head(10)
 
-    st.plotly_chart(fig_top, use_container_width=True)
+        fig = px.bar(
+            top_medals,
+            x="name",
+            y="total_medals",
+            text="total_medals",
+        )
+        fig.update_traces(textposition="outside")
+        fig.update_layout(
+            xaxis_title="Athlete",
+            yaxis_title="Total medals",
+            xaxis_tickangle=-40,
+            showlegend=False,
+        )
+        return fig
+
+    with span("render.top_medals"):
+        fig_top = cached_figure(
+            "athletes.top_medals", build_top_athletes, **medal_inputs
+        )
+        st.plotly_chart(fig_top, use_container_width=True)
 else:
     st.info("No medalist records available to plot top athletes.")
+
+profiler_panel()
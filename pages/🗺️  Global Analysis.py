@@ -6,20 +6,48 @@ import numpy as np
 import plotly.express as px
 import warnings
 
+from olympics.data import data_version, load_table
+from olympics.cube import MEDAL_TYPES, MedalCube, load_medal_cube
+from olympics.figures import cached_figure
+from olympics.filters import selected_values
+from olympics.profiling import profiler_panel, span, start_run
+from olympics.refresh import refresh_data
+from olympics.state import (
+    filter_key,
+    filter_multiselect,
+    get_filter_spec,
+    sync_query_params,
+)
+
 warnings.filterwarnings("ignore")
 
 st.set_page_config(page_title="Global Analysis", page_icon="🗺️", layout="wide")
+start_run("Global Analysis")
+
+# every chart here is a slice of the medal cube, labelled with the NOC names
+with span("load.refresh"):
+    refresh_data()
+    version = data_version("medals", "medal_cube", "nocs")
+
 
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    """The medal cube plus the country name and continent of each NOC code.
 
-@st.cache_data
-@st.cache_data
-def load_data():
-    """Load medals + nocs, fallback to sample if files missing."""
+    The real medals come from the process-wide cube shared with the
+    Dashboard (``olympics.cube.load_medal_cube``), keyed by NOC code; the
+    names only label the charts. Falls back to a sample cube if the files
+    are missing, and also returns which of the two was used ("data" /
+    "sample").
+    """
     try:
-        medals = pd.read_csv("../data/medals.csv")
-        nocs = pd.read_csv("../data/nocs.csv")  # uses the true continent from Kaggle
-    except Exception:
+        cube = load_medal_cube()
+        nocs = load_table("nocs")
+        source = "data"
+    except FileNotFoundError:
+        source = "sample"
         np.random.seed(42)
+        codes = "USA CHN FRA GBR JPN AUS GER ITA ESP CAN KOR NED".split()
         countries = [
             "USA",
             "China",
@@ -46,113 +74,128 @@ def load_data():
             "Archery",
             "Badminton",
         ]
+        # same columns as medals.csv
         medals = pd.DataFrame(
             {
-                "medal_id": range(1, 601),
-                "country": np.random.choice(countries, 600),
-                "sport": np.random.choice(sports, 600),
+                "country_code": np.random.choice(codes, 600),
+                "discipline": np.random.choice(sports, 600),
                 "medal_type": np.random.choice(
                     ["Gold", "Silver", "Bronze"], 600, p=[0.3, 0.35, 0.35]
                 ),
             }
         )
-        # deterministic, correct continent mapping for the sample
-        nocs = pd.DataFrame(
-            {
-                "country": countries,
-                "continent": [
-                    "Americas",  # USA
-                    "Asia",  # China
-                    "Europe",  # France
-                    "Europe",  # GB
-                    "Asia",  # Japan
-                    "Oceania",  # Australia
-                    "Europe",  # Germany
-                    "Europe",  # Italy
-                    "Europe",  # Spain
-                    "Americas",  # Canada
-                    "Asia",  # Korea
-                    "Europe",  # Netherlands
-                ],
-            }
-        )
-    return medals, nocs
-
-
-medals, nocs = (
-    load_data()
-)  # medals: country, sport, medal_type; nocs: country, continent
+        cube = MedalCube.from_medals(medals)
+        nocs = pd.DataFrame({"code": codes, "country": countries})
+
+    # the countries with medals, by NOC code (the code when a name is missing)
+    codes = pd.Index(cube.countries, name="country_code")
+    names = nocs.drop_duplicates("code").set_index("code")["country"].astype("str")
+    country_names = names.reindex(codes).fillna(codes.to_series())
+    country_continents = pd.Series(cube.continents, index=codes)
+    return cube, country_names, country_continents, source
+
+
+with span("load"):
+    medal_cube, country_names, country_continents, data_source = load_data(version)
+
+# countries with their own node in the sunburst / treemap; the rest of each
+# continent is collapsed into "Other" so the figures stay small
+HIERARCHY_TOP_COUNTRIES = 30
+
+# NOC codes that differ from the ISO 3166 alpha-3 codes of the world map
+NOC_TO_ISO = {
+    "GER": "DEU",
+    "NED": "NLD",
+    "SUI": "CHE",
+    "POR": "PRT",
+    "GRE": "GRC",
+    "DEN": "DNK",
+    "CRO": "HRV",
+    "SLO": "SVN",
+    "RSA": "ZAF",
+    "ALG": "DZA",
+    "BUL": "BGR",
+    "CHI": "CHL",
+    "INA": "IDN",
+    "IRI": "IRN",
+    "MAS": "MYS",
+    "PHI": "PHL",
+    "TPE": "TWN",
+    "KSA": "SAU",
+    "UAE": "ARE",
+    "GUA": "GTM",
+    "PUR": "PRI",
+    "ZAM": "ZMB",
+    "MGL": "MNG",
+    "LAT": "LVA",
+    "FIJ": "FJI",
+}
 
 # -------------------------------------------------------------------
-# GLOBAL FILTERS (use same names as app.py sidebar state)
+# GLOBAL FILTERS (shared with the other pages through the filter spec)
 # -------------------------------------------------------------------
 st.sidebar.title("🌍 Global Filters")
 st.sidebar.markdown("---")
 
-all_countries = sorted(medals["country"].unique())
-all_sports = sorted(medals["sport"].unique())
-all_continents = sorted(nocs["continent"].unique())
-
-# Read defaults from session_state if present, else use full lists
-default_countries = st.session_state.get("countries", all_countries)
-default_sports = st.session_state.get("sports", all_sports)
-default_medals = st.session_state.get("medals", ["Gold", "Silver", "Bronze"])
+all_countries = list(country_names.index)
+all_sports = list(medal_cube.sports)
+all_continents = sorted(country_continents.dropna().unique())
 
 # Continent filter
-selected_continents = st.sidebar.multiselect(
-    "🌎 Continent",
-    options=all_continents,
-    default=all_continents,
-    key="continent_global",
+selected_continents = filter_multiselect(
+    "🌎 Continent", "continents", all_continents, container=st.sidebar
 )
 
 # Restrict countries by selected continents
-if selected_continents:
-    allowed_countries = nocs[nocs["continent"].isin(selected_continents)][
-        "country"
-    ].unique()
-    allowed_countries = sorted(list(allowed_countries))
-else:
+if selected_continents is None:
     allowed_countries = all_countries
+else:
+    kept = selected_values(selected_continents, all_continents)
+    allowed_countries = list(country_continents.index[country_continents.isin(kept)])
 
-selected_countries = st.sidebar.multiselect(
+selected_countries = filter_multiselect(
     "🏳️ Country",
-    options=allowed_countries,
-    default=[c for c in default_countries if c in allowed_countries]
-    or allowed_countries,
-    key="countries_global",
+    "countries",
+    allowed_countries,
+    format_func=country_names.get,
+    container=st.sidebar,
 )
 
-selected_sports = st.sidebar.multiselect(
-    "🏅 Sport",
-    options=all_sports,
-    default=default_sports,
-    key="sports_global",
+selected_sports = filter_multiselect(
+    "🏅 Sport", "sports", all_sports, container=st.sidebar
 )
 
 st.sidebar.markdown("---")
 st.sidebar.subheader("🎖 Medal Types")
-selected_medal_types = st.sidebar.multiselect(
-    "Select medal types",
-    options=["Gold", "Silver", "Bronze"],
-    default=default_medals,
-    key="medaltypes_global",
+selected_medal_types = filter_multiselect(
+    "Select medal types", "medal_types", MEDAL_TYPES, container=st.sidebar
 )
 
+filter_spec = get_filter_spec(st.session_state)
+sync_query_params(st.query_params, filter_spec)
+
 st.sidebar.markdown("---")
-st.sidebar.info("Filters update all visualizations on this page.")
+st.sidebar.info("Filters apply to every page and are kept in the URL.")
 
 # -------------------------------------------------------------------
 # APPLY FILTERS
 # -------------------------------------------------------------------
-filtered_medals = medals[
-    medals["country"].isin(selected_countries)
-    & medals["sport"].isin(selected_sports)
-    & medals["medal_type"].isin(selected_medal_types)
-].copy()
-
-# Attach continent ONCE here – guarantees column exists
-filtered_medals = filtered_medals.merge(nocs, on="country", how="left")
+# every chart below is a slice of the medal cube for this selection; "All"
+# skips a filter and the cube is keyed by NOC code, like the country filter
+if selected_continents is not None:
+    selected_countries = selected_values(selected_countries, allowed_countries)
+selection = {
+    "countries": selected_countries,
+    "sports": selected_sports,
+    "medal_types": selected_medal_types,
+}
+chart_inputs = {
+    "source": data_source,
+    "data": version,
+    "filters": filter_key(
+        filter_spec, ("continents", "countries", "sports", "medal_types")
+    ),
+}
 
 # -------------------------------------------------------------------
 # PAGE TITLE
@@ -170,8 +213,11 @@ st.markdown(
 )
 st.markdown("---")
 
-if filtered_medals.empty:
+with span("aggregate.total"):
+    total_medals = medal_cube.total(**selection)
+if total_medals == 0:
     st.warning("No data for the current filter selection.")
+    profiler_panel()
     st.stop()
 
 # -------------------------------------------------------------------
@@ -179,41 +225,33 @@ if filtered_medals.empty:
 # -------------------------------------------------------------------
 st.subheader("🌍 World Medal Map")
 
-country_totals = (
-    filtered_medals.groupby("country")["medal_type"]
-    .count()
-    .reset_index(name="total_medals")
-)
 
-# Simple mapping for demo; adjust to your NOC/ISO mapping if needed
-name_to_iso = {
-    "USA": "USA",
-    "United States": "USA",
-    "China": "CHN",
-    "France": "FRA",
-    "GB": "GBR",
-    "Great Britain": "GBR",
-    "Japan": "JPN",
-    "Australia": "AUS",
-    "Germany": "DEU",
-    "Italy": "ITA",
-    "Spain": "ESP",
-    "Canada": "CAN",
-    "Korea": "KOR",
-    "Netherlands": "NLD",
-}
-country_totals["iso_alpha"] = country_totals["country"].map(name_to_iso)
-
-fig_world = px.choropleth(
-    country_totals,
-    locations="iso_alpha",
-    color="total_medals",
-    hover_name="country",
-    color_continuous_scale="Viridis",
-    title="Total Medals by Country",
-)
-fig_world.update_layout(height=500, margin=dict(l=0, r=0, t=60, b=0))
-st.plotly_chart(fig_world, use_container_width=True)
+def build_world_map():
+    with span("aggregate.country_totals"):
+        country_totals = (
+            medal_cube.country_totals(**selection)
+            .rename_axis("country_code")
+            .reset_index(name="total_medals")
+        )
+    codes = country_totals["country_code"]
+    country_totals["country"] = codes.map(country_names)
+    country_totals["iso_alpha"] = codes.map(NOC_TO_ISO).fillna(codes)
+
+    fig = px.choropleth(
+        country_totals,
+        locations="iso_alpha",
+        color="total_medals",
+        hover_name="country",
+        color_continuous_scale="Viridis",
+        title="Total Medals by Country",
+    )
+    fig.update_layout(height=500, margin=dict(l=0, r=0, t=60, b=0))
+    return fig
+
+
+with span("render.world_map"):
+    fig_world = cached_figure("global.world_map", build_world_map, **chart_inputs)
+    st.plotly_chart(fig_world, use_container_width=True)
 
 st.markdown("---")
 
@@ -223,38 +261,43 @@ st.markdown("---")
 # -------------------------------------------------------------------
 st.subheader("📊 Medal Hierarchy by Continent")
 
-# Aggregate counts for hierarchy
-hierarchy_df = (
-    filtered_medals.groupby(["continent", "country", "sport", "medal_type"])
-    .size()
-    .reset_index(name="count")
-)
 
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("#### ☀️ Sunburst")
-    fig_sunburst = px.sunburst(
+def build_hierarchy(kind):
+    # Aggregate counts for hierarchy (top countries + "Other" per continent)
+    with span("aggregate.hierarchy"):
+        hierarchy_df = medal_cube.hierarchy(top_n=HIERARCHY_TOP_COUNTRIES, **selection)
+        # NOC codes -> names ("Other" is kept as it is)
+        countries = hierarchy_df["country"]
+        hierarchy_df["country"] = countries.map(country_names).fillna(countries)
+    chart = px.sunburst if kind == "sunburst" else px.treemap
+    fig = chart(
         hierarchy_df,
         path=["continent", "country", "sport", "medal_type"],
         values="count",
         color="count",
         color_continuous_scale="RdYlGn",
     )
-    fig_sunburst.update_layout(height=450)
-    st.plotly_chart(fig_sunburst, use_container_width=True)
+    fig.update_layout(height=450)
+    return fig
+
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.markdown("#### ☀️ Sunburst")
+    with span("render.sunburst"):
+        fig_sunburst = cached_figure(
+            "global.sunburst", lambda: build_hierarchy("sunburst"), **chart_inputs
+        )
+        st.plotly_chart(fig_sunburst, use_container_width=True)
 
 with col2:
     st.markdown("#### 🧩 Treemap")
-    fig_treemap = px.treemap(
-        hierarchy_df,
-        path=["continent", "country", "sport", "medal_type"],
-        values="count",
-        color="count",
-        color_continuous_scale="RdYlGn",
-    )
-    fig_treemap.update_layout(height=450)
-    st.plotly_chart(fig_treemap, use_container_width=True)
+    with span("render.treemap"):
+        fig_treemap = cached_figure(
+            "global.treemap", lambda: build_hierarchy("treemap"), **chart_inputs
+        )
+        st.plotly_chart(fig_treemap, use_container_width=True)
 
 st.markdown("---")
 
@@ -263,57 +306,60 @@ st.markdown("---")
 # -------------------------------------------------------------------
 st.subheader("🌎 Continent vs. Medals")
 
-continent_medals = filtered_medals.pivot_table(
-    index="continent",
-    columns="medal_type",
-    values="medal_id" if "medal_id" in filtered_medals.columns else "country",
-    aggfunc="count",
-    fill_value=0,
-).reset_index()
-
-# Ensure all medal columns exist
-for m in ["Gold", "Silver", "Bronze"]:
-    if m not in continent_medals.columns:
-        continent_medals[m] = 0
-
-fig_continent = px.bar(
-    continent_medals,
-    x="continent",
-    y=["Gold", "Silver", "Bronze"],
-    barmode="group",
-    color_discrete_map={"Gold": "#FFD700", "Silver": "#C0C0C0", "Bronze": "#CD7F32"},
-    title="Gold, Silver, Bronze Medals by Continent",
-)
-fig_continent.update_layout(
-    height=450, xaxis_title="Continent", yaxis_title="Medal Count"
-)
-st.plotly_chart(fig_continent, use_container_width=True)
+
+def build_continent_bars():
+    with span("aggregate.continent_medals"):
+        continent_medals = medal_cube.continent_medals(**selection)
+
+    # Ensure all medal columns exist
+    for m in ["Gold", "Silver", "Bronze"]:
+        if m not in continent_medals.columns:
+            continent_medals[m] = 0
+
+    fig = px.bar(
+        continent_medals,
+        x="continent",
+        y=["Gold", "Silver", "Bronze"],
+        barmode="group",
+        color_discrete_map={
+            "Gold": "#FFD700",
+            "Silver": "#C0C0C0",
+            "Bronze": "#CD7F32",
+        },
+        title="Gold, Silver, Bronze Medals by Continent",
+    )
+    fig.update_layout(height=450, xaxis_title="Continent", yaxis_title="Medal Count")
+    return fig
+
+
+with span("render.continent_bars"):
+    fig_continent = cached_figure(
+        "global.continent_bars", build_continent_bars, **chart_inputs
+    )
+    st.plotly_chart(fig_continent, use_container_width=True)
 
 st.markdown("---")
 
 # -------------------------------------------------------------------
 # 4. COUNTRY VS MEDALS (Top 20, Grouped Bar)
 # -------------------------------------------------------------------
-selected_countries = st.session_state.get("countries", list(medals["country"].unique()))
-selected_sports = st.session_state.get("sports", list(medals["sport"].unique()))
-medal_types = st.session_state.get("medals", ["Gold", "Silver", "Bronze"])
+with span("aggregate.top_countries"):
+    medal_by_country = medal_cube.top_countries(20, **selection)
 
-filtered_medals = medals[
-    (medals["country"].isin(selected_countries))
-    & (medals["sport"].isin(selected_sports))
-    & (medals["medal_type"].isin(medal_types))
-]
-filtered_medals = filtered_medals.merge(nocs, on="country", how="left")
+if len(medal_by_country) > 0:
+    st.subheader("📊 Medals by Country")
 
+    def build_top_countries():
+        return px.bar(
+            x=medal_by_country.index.map(country_names),
+            y=medal_by_country.values,
+            color=medal_by_country.values,
+            labels={"x": "Country", "y": "Number of Medals"},
+            title="Top 20 Countries by Medals",
+        )
 
-if len(filtered_medals) > 0:
-    st.subheader("📊 Medals by Country")
-    medal_by_country = filtered_medals["country"].value_counts().head(20)
-    fig = px.bar(
-        x=medal_by_country.index,
-        y=medal_by_country.values,
-        color=medal_by_country.values,
-        labels={"x": "Country", "y": "Number of Medals"},
-        title="Top 20 Countries by Medals",
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    with span("render.top_countries"):
+        fig = cached_figure("global.top_countries", build_top_countries, **chart_inputs)
+        st.plotly_chart(fig, use_container_width=True)
+
+profiler_panel()
@@ -0,0 +1,15 @@
+import pandas as pd
+
+from olympics.athletes import _identity
+
+
+def test_gender_codes_map_to_the_filter_vocabulary():
+    results = pd.DataFrame(
+        {
+            "participant_code": ["1", "2", "3", "4"],
+            "gender": pd.Categorical(["M", "W", "O", None]),
+        }
+    )
+    identity = _identity(results, code="participant_code")
+    assert identity["gender"].tolist()[:2] == ["Male", "Female"]
+    assert identity["gender"].iloc[2:].isna().all()
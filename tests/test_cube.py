@@ -0,0 +1,36 @@
+import pandas as pd
+
+from olympics.cube import MedalCube
+
+
+def _cube():
+    # twelve countries with one bronze each, and Z with one gold
+    countries = [chr(ord("A") + i) for i in range(12)] + ["Z"]
+    return MedalCube(
+        pd.DataFrame(
+            {
+                "country": countries,
+                "sport": "Judo",
+                "medal_type": ["Bronze"] * 12 + ["Gold"],
+                "continent": "Europe",
+            }
+        )
+    )
+
+
+def test_medal_table_cutoff_breaks_ties_by_medals_then_name():
+    cube = _cube()
+    table = cube.medal_table(3)
+    assert table.index.tolist() == ["Z", "A", "B"]
+    assert table.equals(cube.medal_table().head(3))
+
+
+def test_top_countries_cutoff_breaks_ties_by_name():
+    assert _cube().top_countries(3).index.tolist() == ["A", "B", "C"]
+    assert len(_cube().top_countries(20)) == 13
+
+
+def test_hierarchy_keeps_the_top_countries():
+    frame = _cube().hierarchy(top_n=2)
+    assert sorted(frame["country"].unique()) == ["A", "B", "Other"]
+    assert frame["count"].sum() == 13
@@ -0,0 +1,31 @@
+import threading
+import time
+
+from olympics.data import _shared, data_version, invalidate
+
+
+def test_hit_does_not_wait_for_another_build():
+    _shared("test.built", lambda: "built")
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(0.5)
+        return "slow"
+
+    thread = threading.Thread(target=_shared, args=("test.slow", slow))
+    thread.start()
+    started.wait()
+    t0 = time.perf_counter()
+    assert _shared("test.built", lambda: "rebuilt") == "built"
+    assert time.perf_counter() - t0 < 0.1
+    thread.join()
+    assert _shared("test.slow", lambda: "rebuilt") == "slow"
+
+
+def test_invalidate_drops_dependents():
+    _shared("test.derived", lambda: _shared("test.source", lambda: 1) + 1)
+    version = data_version("test.derived")
+    assert invalidate(["test.source"]) == {"test.source", "test.derived"}
+    assert data_version("test.derived") != version
+    assert _shared("test.derived", lambda: 3) == 3
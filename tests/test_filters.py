@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from olympics.filters import FilterIndex, all_except
+
+
+def _index():
+    frame = pd.DataFrame(
+        {
+            "gender": ["Male", None, "Female", "X", None],
+            "country": ["FRA", "USA", "FRA", "GER", "USA"],
+        }
+    )
+    return FilterIndex(frame, ["gender", "country"])
+
+
+def test_all_except_keeps_rows_without_a_value():
+    index = _index()
+    assert index.rows({"gender": all_except(["X"])}).tolist() == [0, 1, 2, 4]
+    assert len(index.filter({"gender": {"except": []}})) == 5
+
+
+def test_list_selection_matches_listed_values_only():
+    index = _index()
+    assert index.rows({"gender": ["Male", "Female"]}).tolist() == [0, 2]
+    assert index.rows({"gender": ["Male", "Female", "X"]}).tolist() == [0, 2, 3]
+    assert index.rows({"gender": []}).tolist() == []
+
+
+def test_columns_combine():
+    index = _index()
+    selection = {"gender": all_except(["Female"]), "country": ["FRA", "USA"]}
+    assert index.rows(selection).tolist() == [0, 1, 4]
+
+
+def _mask(frame, col, selected):
+    """The pandas boolean mask a selection of ``col`` stands for."""
+    if isinstance(selected, dict):
+        return ~frame[col].isin(selected["except"])
+    return frame[col].isin(selected)
+
+
+@pytest.mark.parametrize(
+    "selection",
+    [
+        {"country": ["FRA"]},
+        {"country": ["FRA", "USA", "GER"]},
+        {"country": ["FRA", "USA", "GER", "ITA", "ESP"]},
+        {"country": ["NOT A COUNTRY"]},
+        {"country": []},
+        {"country": all_except(["USA"])},
+        {"country": all_except(["USA", "NOT A COUNTRY"])},
+        {"sport": ["Judo"], "country": all_except(["FRA"])},
+        {"sport": all_except(["Judo"]), "gender": ["Female"]},
+        {"sport": None, "gender": ["Male", "Female"]},
+    ],
+)
+def test_filter_matches_pandas_masks(selection):
+    rng = np.random.default_rng(0)
+    n = 1003  # not a multiple of 8: the last bitmap byte is partial
+    frame = pd.DataFrame(
+        {
+            "country": rng.choice(["FRA", "USA", "GER", "ITA", "ESP", None], n),
+            "sport": rng.choice(["Judo", "Rowing", "Fencing"], n),
+            "gender": rng.choice(["Male", "Female", None], n),
+        }
+    )
+    index = FilterIndex(frame, ["country", "sport", "gender"])
+    mask = pd.Series(True, index=frame.index)
+    for col, selected in selection.items():
+        if selected is not None:
+            mask &= _mask(frame, col, selected)
+    pd.testing.assert_frame_equal(index.filter(selection), frame[mask])
@@ -0,0 +1,104 @@
+import importlib
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+DATA = Path(__file__).resolve().parents[1] / "data"
+RESULT_FILES = ["Marathon Swimming.csv", "Trampoline Gymnastics.csv"]
+
+
+@pytest.fixture
+def olympics_modules(tmp_path, monkeypatch):
+    """Fresh olympics modules over a small copy of data/ in ``tmp_path``.
+
+    DATA_DIR is read at import, so the modules are imported again with
+    OLYMPICS_DATA_DIR set, and the process's own modules are restored after.
+    """
+    (tmp_path / "results").mkdir()
+    for name in ["medals.csv", "nocs.csv"]:
+        shutil.copy(DATA / name, tmp_path / name)
+    for name in RESULT_FILES:
+        shutil.copy(DATA / "results" / name, tmp_path / "results" / name)
+    monkeypatch.setenv("OLYMPICS_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("OLYMPICS_REFRESH_SECONDS", "0")
+
+    saved = {k: v for k, v in sys.modules.items() if k.split(".")[0] == "olympics"}
+    for name in saved:
+        del sys.modules[name]
+    try:
+        yield {
+            name: importlib.import_module(f"olympics.{name}")
+            for name in ("data", "cube", "refresh", "results")
+        }
+    finally:
+        for name in [k for k in sys.modules if k.split(".")[0] == "olympics"]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+def _rewrite(path, drop_last=False, mtime_step=2):
+    """Rewrite ``path`` (without its last line) and move its mtime forward."""
+    lines = path.read_bytes().splitlines(True)
+    path.write_bytes(b"".join(lines[:-1] if drop_last else lines))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_step * 10**9))
+
+
+def test_refresh_invalidates_only_what_changed(olympics_modules, tmp_path):
+    data, cube, refresh, results = (
+        olympics_modules[name] for name in ("data", "cube", "refresh", "results")
+    )
+    assert refresh.refresh_data(force=True) is None  # first check: the baseline
+
+    results.ingest_results()
+    manifest = results.read_manifest()
+    codes = {name: manifest[name]["codes"] for name in RESULT_FILES}
+    cache = results.results_cache()
+    for file_codes in codes.values():
+        for code in file_codes:
+            cache.get(code)
+    cube.load_medal_cube()
+    data.load_table("nocs")
+    versions = data.data_version("medals", "medal_cube", "nocs")
+
+    # touched, same content: nothing to refresh
+    _rewrite(tmp_path / "results" / RESULT_FILES[0])
+    assert refresh.refresh_data(force=True) is None
+    assert data.data_version("medals", "medal_cube", "nocs") == versions
+
+    # one table: it and the values built from it, nothing else
+    _rewrite(tmp_path / "medals.csv", drop_last=True)
+    summary = refresh.refresh_data(force=True)
+    assert summary["tables"] == ["medals"]
+    assert summary["results"] == []
+    assert {"medals", "medal_cube"} <= set(summary["dropped"])
+    assert "nocs" not in summary["dropped"]
+    assert data.data_version("nocs") == versions[2:]
+    assert data.data_version("medals", "medal_cube") != versions[:2]
+    assert sorted(cache.stats()["cached"]) == sorted(sum(codes.values(), []))
+
+    # one results file: only its disciplines leave the results cache
+    _rewrite(tmp_path / "results" / RESULT_FILES[0], drop_last=True)
+    summary = refresh.refresh_data(force=True)
+    assert summary["tables"] == []
+    assert summary["results"] == codes[RESULT_FILES[0]]
+    assert cache.stats()["cached"] == codes[RESULT_FILES[1]]
+
+
+def test_new_process_updates_a_stale_dataset(olympics_modules, tmp_path):
+    data, results, refresh = (
+        olympics_modules[name] for name in ("data", "results", "refresh")
+    )
+    results.ingest_results()
+    path = tmp_path / "results" / RESULT_FILES[0]
+    _rewrite(path, drop_last=True)  # changed while no process was running
+
+    refresh.refresh_data(force=True)
+    entry = results.read_manifest()[RESULT_FILES[0]]
+    assert entry["hash"] == data.file_state(path)["hash"]
+    code = entry["codes"][0]
+    rows = results.results_cache().get(code)
+    assert len(rows) == len(path.read_bytes().splitlines()) - 1
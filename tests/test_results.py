@@ -0,0 +1,43 @@
+import pyarrow as pa
+import pytest
+
+from olympics.results import parse_result_values
+
+# raw result, result type, IRM code -> value, unit
+CASES = [
+    ("47.28", "TIME", None, 47.28, "seconds"),
+    ("1:59.82", "TIME", None, 119.82, "seconds"),
+    ("2:50:31", "TIME", None, 10231.0, "seconds"),
+    ("8.03", "DISTANCE", None, 8.03, "metres"),
+    ("8796", "POINTS", None, 8796.0, "points"),
+    ("-3", "SCORE", None, -3.0, "points"),
+    ("12", None, None, 12.0, "points"),
+    ("3:10.61", "TIME", "DQ", None, "seconds"),
+    (None, "IRM", "DNS", None, None),
+    ("21", "IRM_POINTS", "DNF", 21.0, "points"),
+    ("", "TIME", None, None, "seconds"),
+    ("", "POINTS", None, None, "points"),
+    ("6-4", "SETS", None, None, "sets"),
+    ("1:2", "UNKNOWN", None, None, None),
+]
+
+
+@pytest.mark.parametrize("result, result_type, irm, value, unit", CASES)
+def test_parse_result_values(result, result_type, irm, value, unit):
+    values, units = parse_result_values(
+        pa.array([result], pa.string()),
+        pa.array([result_type], pa.string()),
+        pa.array([irm], pa.string()),
+    )
+    assert values.to_pylist()[0] == pytest.approx(value)
+    assert units.to_pylist()[0] == unit
+
+
+def test_parse_result_values_is_row_aligned():
+    results, types, irms, expected, _ = zip(*CASES)
+    values, _ = parse_result_values(
+        pa.array(results, pa.string()),
+        pa.array(types, pa.string()),
+        pa.array(irms, pa.string()),
+    )
+    assert values.to_pylist() == pytest.approx(list(expected))
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from olympics.schedule import Schedule
+
+
+def _sessions():
+    starts = pd.to_datetime(
+        ["2024-07-27T10:00:00+02:00", "2024-07-27T10:30:00+02:00"], utc=True
+    ).tz_convert("Europe/Paris")
+    return pd.DataFrame(
+        {
+            "start_date": starts,
+            "end_date": starts + pd.Timedelta("1h"),
+            "discipline": ["Archery", "Fencing"],
+            "venue": ["Invalides", "Grand Palais"],
+            "event_medal": [0, 1],
+        }
+    )
+
+
+def test_venue_load():
+    load = Schedule(_sessions()).venue_load()
+    assert load.frame().shape == (2, 2)
+    assert load.concurrency.tolist() == [2, 1]
+    assert load.stats["sessions"].tolist() == [1, 1]
+
+
+def test_venue_load_without_sessions():
+    load = Schedule(_sessions()).venue_load(disciplines=[])
+    assert load.frame().empty
+    assert load.concurrency.empty
+    assert load.stats.empty
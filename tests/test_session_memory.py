@@ -0,0 +1,54 @@
+"""Sessions of the Dashboard hold a filter spec, not copies of the data."""
+
+import gc
+import pickle
+import random
+import statistics
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+DASHBOARD = ROOT / "🥇 Dashboard.py"
+
+SESSIONS = 8
+MAX_STATE_BYTES = 64 * 1024
+# an AppTest session with its widget tree and rendered figures takes about
+# 110 KB; a per-session copy of a table would take several MB
+MAX_GROWTH_BYTES = 512 * 1024
+
+
+def _session(rng):
+    at = AppTest.from_file(str(DASHBOARD), default_timeout=300).run()
+    for label in ("🏆 Country (NOC code)", "⚽ Sport / Discipline"):
+        widget = next(w for w in at.multiselect if w.label == label)
+        widget.set_value(rng.sample(widget.options, rng.randint(1, 5)))
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+
+def test_session_memory_stays_bounded(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    rng = random.Random(0)
+    # warm the process-wide caches so they do not count against the sessions
+    _session(rng)
+
+    sessions, heap = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(SESSIONS):
+            sessions.append(_session(rng))
+            gc.collect()
+            heap.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+
+    for at in sessions:
+        state = pickle.dumps(at.session_state.to_dict(), pickle.HIGHEST_PROTOCOL)
+        assert len(state) < MAX_STATE_BYTES
+    # the median step: a one-off allocation of a process-wide cache during
+    # one session is not held per session
+    growth = statistics.median(b - a for a, b in zip(heap, heap[1:]))
+    assert growth < MAX_GROWTH_BYTES, f"{growth / 1024:.0f} KB per session"
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from olympics.teams import TeamGraph
+
+
+def _graph():
+    # athletes 1-5 and coaches C1-C3 over four teams (row = team id)
+    return TeamGraph(
+        pd.DataFrame(
+            {
+                "team": ["FRA relay", "FRA pair", "USA relay", "Empty"],
+                "athletes_codes": [
+                    "['1', '2', '3']",
+                    "['3', '4']",
+                    "['5']",
+                    None,
+                ],
+                "coaches_codes": ["['C1']", "['C1', 'C2']", "['C3']", "[]"],
+            }
+        )
+    )
+
+
+def test_teams_of():
+    graph = _graph()
+    assert graph.teams_of("3")["team"].tolist() == ["FRA relay", "FRA pair"]
+    assert graph.teams_of("5")["team"].tolist() == ["USA relay"]
+    assert graph.teams_of("unknown").empty
+
+
+def test_teammates():
+    graph = _graph()
+    assert graph.teammates("3") == ["1", "2", "4"]
+    assert graph.teammates("4") == ["3"]
+    assert graph.teammates("5") == []
+    assert graph.teammates("unknown") == []
+
+
+def test_athletes_of_coach():
+    graph = _graph()
+    assert graph.athletes_of_coach("C1") == ["1", "2", "3", "4"]
+    assert graph.athletes_of_coach("C2") == ["3", "4"]
+    assert graph.athletes_of_coach("unknown") == []
+
+
+def test_athletes_per_coach():
+    counts = _graph().athletes_per_coach()
+    assert counts.to_dict() == {"C1": 4, "C2": 2, "C3": 1}
@@ -9,6 +9,19 @@ import numpy as np
 import plotly.express as px
 import warnings
 
+from olympics.cube import MedalCube, load_medal_cube
+from olympics.data import continent_of, data_version, load_table
+from olympics.figures import cached_figure
+from olympics.filters import FilterIndex, selected_values
+from olympics.profiling import profiler_panel, span, start_run
+from olympics.refresh import refresh_data
+from olympics.state import (
+    filter_key,
+    filter_multiselect,
+    get_filter_spec,
+    sync_query_params,
+)
+
 warnings.filterwarnings("ignore")
 
 st.set_page_config(
@@ -17,24 +30,40 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+start_run("Dashboard")
+
+# the KPIs and medal charts come from the medal cube, the filters from athletes
+# and events
+with span("load.refresh"):
+    refresh_data()
+    version = data_version("athletes", "nocs", "events", "medals", "medal_cube")
 
 
 # --------------------------------------------------
 # DATA LOADING
 # --------------------------------------------------
-@st.cache_data
-def load_data():
-    """Load Paris 2024 Olympics dataset from ./data; fallback to sample."""
-    try:
-        athletes = pd.read_csv("data/athletes.csv")
-        nocs = pd.read_csv("data/nocs.csv")  # code, country, ...
-        events = pd.read_csv("data/events.csv")
-        medals_total = pd.read_csv(
-            "data/medals_total.csv"
-        )  # country_code, country, Gold Medal, ...
-        return athletes, nocs, events, medals_total
-    except Exception:
-        return generate_sample_data()
+# medals: one row per medal (medal_type, country_code, discipline, ...)
+DATA_TABLES = ("athletes", "nocs", "events", "medals")
+
+
+@st.cache_resource(max_entries=1)
+def load_data(version):
+    """Load Paris 2024 Olympics dataset from ./data; fallback to sample.
+
+    Cached as a shared resource: reruns reuse the same frames without copying,
+    so nothing below may modify them in place. Each table missing from ./data
+    is taken from the sample on its own (the shipped data has no
+    athletes.csv, and the medals must still be the real ones); also returns
+    the names of the sampled tables.
+    """
+    frames, sampled = [], []
+    for i, name in enumerate(DATA_TABLES):
+        try:
+            frames.append(load_table(name))
+        except FileNotFoundError:
+            frames.append(generate_sample_data()[i])
+            sampled.append(name)
+    return tuple(frames), tuple(sampled)
 
 
 @st.cache_data
@@ -110,30 +139,30 @@ def generate_sample_data():
         }
     )
 
-    medals_total = pd.DataFrame(
+    # one row per medal, like medals.csv
+    n_medals = 520
+    medals = pd.DataFrame(
         {
-            "country_code": codes,
-            "country": country_names,
-            "country_long": country_names,
-            "Gold Medal": np.random.randint(0, 50, len(codes)),
-            "Silver Medal": np.random.randint(0, 40, len(codes)),
-            "Bronze Medal": np.random.randint(0, 35, len(codes)),
-            "Total": np.random.randint(10, 120, len(codes)),
+            "medal_type": np.random.choice(
+                ["Gold Medal", "Silver Medal", "Bronze Medal"], n_medals
+            ),
+            "country_code": np.random.choice(codes, n_medals),
+            "discipline": np.random.choice(sports, n_medals),
         }
     )
 
-    return athletes, nocs, events, medals_total
+    return athletes, nocs, events, medals
 
 
 # Load data
-athletes, nocs, events, medals_total = load_data()
+with span("load"):
+    (athletes, nocs, events, medals), sampled = load_data(version)
 
 # --------------------------------------------------
 # COLUMN HARMONISATION
 # --------------------------------------------------
-# common NOC code column
-nocs["noc_code"] = nocs["code"]
-medals_total["noc_code"] = medals_total["country_code"]
+# NOC code column in nocs.csv
+noc_col = "code"
 
 # NOC column in athletes.csv
 ath_noc_col = "country_code"  # from your dataset
@@ -146,36 +175,68 @@ elif "discipline" in events.columns:
 else:
     sport_col = "sport"  # fallback
 
+
+@st.cache_resource(max_entries=1)
+def load_filter_indexes(version):
+    """Bitmap indexes over the athletes' NOC / sport and the events' sport."""
+    return (
+        FilterIndex(athletes, [ath_noc_col, sport_col]),
+        FilterIndex(events, [sport_col]),
+    )
+
+
+@st.cache_resource(max_entries=1)
+def load_dashboard_cube(version):
+    """NOC code x discipline x medal-type counts, built once per process."""
+    if "medals" not in sampled:
+        return load_medal_cube()
+    return MedalCube.from_medals(medals)
+
+
+with span("load.indexes"):
+    athletes_index, events_index = load_filter_indexes(version)
+    medal_cube = load_dashboard_cube(version)
+
 # --------------------------------------------------
 # GLOBAL FILTERS
 # --------------------------------------------------
 st.sidebar.title("🌍 Global Filters")
 st.sidebar.markdown("---")
 
-all_nocs = sorted(nocs["noc_code"].unique())
-all_sports = sorted(events[sport_col].unique())
+all_nocs = sorted(nocs[noc_col].unique())
+noc_names = nocs.drop_duplicates(noc_col).set_index(noc_col)["country"]
+all_sports = events_index.options[sport_col]
+noc_continents = dict(zip(all_nocs, continent_of(pd.Series(all_nocs))))
+all_continents = sorted(set(noc_continents.values()))
+
+# shared with the other pages through the session's filter spec; each is a
+# selection: None (all), a list, or "all except" (see olympics.filters)
+selected_continents = filter_multiselect(
+    "🌐 Continent", "continents", all_continents, container=st.sidebar
+)
 
-if "filters_initialized" not in st.session_state:
-    st.session_state.selected_nocs = all_nocs  # start with ALL codes
-    st.session_state.selected_sports = all_sports  # start with ALL sports
-    st.session_state.filters_initialized = True
+# restrict countries by the selected continents
+if selected_continents is None:
+    allowed_nocs = all_nocs
+else:
+    kept = set(selected_values(selected_continents, all_continents))
+    allowed_nocs = [c for c in all_nocs if noc_continents[c] in kept]
 
-selected_nocs = st.sidebar.multiselect(
-    "🏆 Country (NOC code)",
-    options=all_nocs,
-    default=st.session_state.selected_nocs,
-    key="noc_filter",
+selected_nocs = filter_multiselect(
+    "🏆 Country (NOC code)", "countries", allowed_nocs, container=st.sidebar
 )
 
-selected_sports = st.sidebar.multiselect(
+# an empty country selection means "all countries"; an empty sport one, none
+selected_sports = filter_multiselect(
     "⚽ Sport / Discipline",
-    options=all_sports,
-    default=st.session_state.selected_sports,
-    key="sport_filter",
+    "sports",
+    all_sports,
+    empty_means_all=False,
+    container=st.sidebar,
 )
 
-st.session_state.selected_nocs = selected_nocs
-st.session_state.selected_sports = selected_sports
+filter_spec = get_filter_spec(st.session_state)
+sync_query_params(st.query_params, filter_spec)
 
 st.sidebar.markdown("---")
 
@@ -183,32 +244,27 @@ st.sidebar.markdown("---")
 # --------------------------------------------------
 # FILTERING LOGIC
 # --------------------------------------------------
-def apply_filters():
-    final_nocs = selected_nocs if selected_nocs else all_nocs
-
-    fa = athletes[athletes[ath_noc_col].isin(final_nocs)].copy()
-    if sport_col in fa.columns:
-        fa = fa[fa[sport_col].isin(selected_sports)]
-
-    fe = events[events[sport_col].isin(selected_sports)].copy()
-
-    fm = medals_total[medals_total["noc_code"].isin(final_nocs)].copy()
+def apply_filters(nocs_selected, sports_selected):
+    """Restrict the shared frames to a selection (None skips that filter)."""
+    athlete_selection = {ath_noc_col: nocs_selected}
+    if sport_col in athletes.columns:
+        athlete_selection[sport_col] = sports_selected
+    with span("filter"):
+        fa = athletes_index.filter(athlete_selection)
+        fe = events_index.filter({sport_col: sports_selected})
+
+    # medals per country for the selection, from the medal cube (sport-aware)
+    with span("aggregate.medal_table"):
+        fm = medal_cube.medal_table(countries=nocs_selected, sports=sports_selected)
 
     return fa, fe, fm
 
 
-filtered_athletes, filtered_events, filtered_medals = apply_filters()
-
-# share for other pages
-st.session_state.filtered_athletes = filtered_athletes
-st.session_state.filtered_events = filtered_events
-st.session_state.filtered_medals = filtered_medals
-st.session_state.raw_data = {
-    "athletes": athletes,
-    "nocs": nocs,
-    "events": events,
-    "medals_total": medals_total,
-}
+if selected_continents is not None:
+    selected_nocs = selected_values(selected_nocs, allowed_nocs)
+filtered_athletes, filtered_events, medal_table = apply_filters(
+    selected_nocs, selected_sports
+)
 
 # --------------------------------------------------
 # HEADER
@@ -233,76 +289,107 @@ st.markdown("---")
 # --------------------------------------------------
 st.markdown("## 📊 Key Performance Indicators")
 
-kpi_cols = st.columns(5)
-with kpi_cols[0]:
-    total_athletes = len(filtered_athletes)
-    st.metric("👥 Total Athletes", f"{total_athletes:,}", delta=f"of {len(athletes):,}")
-
-with kpi_cols[1]:
-    total_countries = filtered_medals["country"].nunique()
-    st.metric("🌍 Total Countries", f"{total_countries:,}", delta=f"of {len(nocs):,}")
-
-with kpi_cols[2]:
-    total_sports = filtered_events[sport_col].nunique()
-    st.metric(
-        "⚽ Total Sports",
-        total_sports,
-        delta=f"of {events[sport_col].nunique()}",
-    )
-
-with kpi_cols[3]:
-    total_medals_awarded = filtered_medals["Total"].sum()
-    st.metric("🏅 Total Medals", f"{int(total_medals_awarded):,}", delta="awarded")
-
-with kpi_cols[4]:
-    num_events = len(filtered_events)
-    st.metric("🎯 Number of Events", f"{num_events:,}", delta="total competitions")
+with span("render.kpis"):
+    kpi_cols = st.columns(5)
+    with kpi_cols[0]:
+        total_athletes = len(filtered_athletes)
+        st.metric(
+            "👥 Total Athletes", f"{total_athletes:,}", delta=f"of {len(athletes):,}"
+        )
+
+    with kpi_cols[1]:
+        # countries with at least one medal in the selection
+        total_countries = len(medal_table)
+        st.metric(
+            "🌍 Total Countries", f"{total_countries:,}", delta=f"of {len(nocs):,}"
+        )
+
+    with kpi_cols[2]:
+        total_sports = filtered_events[sport_col].nunique()
+        st.metric(
+            "⚽ Total Sports",
+            total_sports,
+            delta=f"of {events[sport_col].nunique()}",
+        )
+
+    with kpi_cols[3]:
+        total_medals_awarded = medal_table["Total"].sum()
+        st.metric("🏅 Total Medals", f"{int(total_medals_awarded):,}", delta="awarded")
+
+    with kpi_cols[4]:
+        num_events = len(filtered_events)
+        st.metric("🎯 Number of Events", f"{num_events:,}", delta="total competitions")
 
 st.markdown("---")
 
 # --------------------------------------------------
 # VISUALISATIONS
 # --------------------------------------------------
+# the medal charts depend on the country and sport filters (and the source)
+chart_inputs = {
+    "source": sampled,
+    "data": version,
+    "filters": filter_key(filter_spec, ("continents", "countries", "sports")),
+}
+
 viz_cols = st.columns([2, 1.2])
 
 with viz_cols[0]:
     st.markdown("### 🏅 Global Medal Distribution")
-    medal_totals = filtered_medals[["Gold Medal", "Silver Medal", "Bronze Medal"]].sum()
-
-    fig_pie = px.pie(
-        values=[
-            medal_totals.get("Gold Medal", 0),
-            medal_totals.get("Silver Medal", 0),
-            medal_totals.get("Bronze Medal", 0),
-        ],
-        names=["Gold", "Silver", "Bronze"],
-        hole=0.45,
-        color_discrete_map={
-            "Gold": "#FFD700",
-            "Silver": "#C0C0C0",
-            "Bronze": "#CD7F32",
-        },
-        title="Gold : Silver : Bronze Distribution",
-    )
-    fig_pie.update_layout(height=450, showlegend=True)
-    st.plotly_chart(fig_pie, use_container_width=True)
+
+    def build_medal_pie():
+        medal_totals = medal_table.sum()
+        fig = px.pie(
+            values=[
+                medal_totals.get("Gold", 0),
+                medal_totals.get("Silver", 0),
+                medal_totals.get("Bronze", 0),
+            ],
+            names=["Gold", "Silver", "Bronze"],
+            hole=0.45,
+            color_discrete_map={
+                "Gold": "#FFD700",
+                "Silver": "#C0C0C0",
+                "Bronze": "#CD7F32",
+            },
+            title="Gold : Silver : Bronze Distribution",
+        )
+        fig.update_layout(height=450, showlegend=True)
+        return fig
+
+    with span("render.medal_pie"):
+        fig_pie = cached_figure("dashboard.medal_pie", build_medal_pie, **chart_inputs)
+        st.plotly_chart(fig_pie, use_container_width=True)
 
 with viz_cols[1]:
     st.markdown("### 🥇 Top 10 Medal Standings")
-    tmp = filtered_medals.sort_values("Total", ascending=False).head(10)
-    top_10 = tmp[["country", "Total"]].copy()
-    top_10.columns = ["Country", "Total"]
-
-    fig_bar = px.bar(
-        top_10,
-        x="Total",
-        y="Country",
-        orientation="h",
-        color="Total",
-        color_continuous_scale="Viridis_r",
-        title="Top 10 Countries",
-    )
-    fig_bar.update_layout(height=450, showlegend=False, xaxis_title="Total Medals")
-    st.plotly_chart(fig_bar, use_container_width=True)
+
+    def build_top_10():
+        # the medal table is already ranked; show country names for the codes
+        top = medal_table.head(10)
+        top_10 = pd.DataFrame(
+            {
+                "Country": [noc_names.get(code, code) for code in top.index],
+                "Total": top["Total"].to_numpy(),
+            }
+        )
+
+        fig = px.bar(
+            top_10,
+            x="Total",
+            y="Country",
+            orientation="h",
+            color="Total",
+            color_continuous_scale="Viridis_r",
+            title="Top 10 Countries",
+        )
+        fig.update_layout(height=450, showlegend=False, xaxis_title="Total Medals")
+        return fig
+
+    with span("render.top_10"):
+        fig_bar = cached_figure("dashboard.top_10", build_top_10, **chart_inputs)
+        st.plotly_chart(fig_bar, use_container_width=True)
 
 st.markdown("---")
+
+profiler_panel()